@@ -1,18 +1,35 @@
 """
 Analysis modules for statistical calculations, model fitting, and trend detection.
+
+Submodules are imported on first use of one of their names, so importing
+the package itself does not load numpy, pandas, scipy or statsmodels.
 """
 
-from .bur_surge_analysis import (
-    linear_trend_analysis,
-    fdr_correction
-)
+from utils.lazy import lazy_exports
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    'linear_trend_analysis': 'bur_surge_analysis',
+    'linear_trend_analysis_batch': 'bur_surge_analysis',
+    'trend_model_comparison_batch': 'bur_surge_analysis',
+    'hac_trend_analysis_batch': 'bur_surge_analysis',
+    'phrase_trend_stats': 'bur_surge_analysis',
+    'fdr_correction': 'bur_surge_analysis',
+    'phrase_variation_stats': 'bur_variation_analysis',
+    'phrase_variation_stats_batch': 'bur_variation_analysis',
+    'surge_null_distribution': 'bur_null_models',
+    'grouped_bootstrap_means': 'bur_bootstrap',
+    'sharded_phrase_trend_stats': 'bur_sharding',
+    'sharded_fdr_correction': 'bur_sharding',
+    'window_trend_scan': 'bur_window_trends',
+    'phrase_sufficient_stats': 'bur_artist_trends',
+    'grouped_trend_estimates': 'bur_artist_trends',
+    'single_changepoint_batch': 'bur_changepoints',
+    'multiple_changepoints_batch': 'bur_changepoints',
+    'sensitivity_sweep': 'bur_sensitivity',
+    'rank_trend_batch': 'bur_rank_trends'
+}
 
-from .bur_variation_analysis import (
-    phrase_variation_stats
-)
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'linear_trend_analysis',
-    'fdr_correction',
-    'phrase_variation_stats'
-]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
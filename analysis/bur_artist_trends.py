@@ -0,0 +1,183 @@
+"""
+BUR Artist Trends - Pooled and Random-Slope Estimates per Performer
+
+Estimates each performer's BUR trend across their phrases instead of
+counting phrases whose own trend test passes FDR.
+
+Every phrase is reduced once to its sufficient statistics for a regression
+of BUR on position (n, Σx, Σy, Σx², Σxy, Σy²). Artist-level models are then
+built from per-artist sums of those statistics (np.bincount over artist
+codes), never from the raw BUR values:
+
+- Pooled slope: one common slope with a separate intercept per phrase
+  (the within-phrase least-squares estimator), tested with a t-test on
+  N - k - 1 degrees of freedom
+- Random slope: phrase slopes vary around the performer's mean slope with
+  between-phrase variance τ². Each phrase slope is weighted by
+  1 / (sampling variance + τ²); τ² is the DerSimonian-Laird moment estimate
+
+Refitting after a filter change (minimum phrase length, a subset of solos)
+only repeats the per-artist sums over the stored per-phrase statistics.
+"""
+
+import numpy as np
+from utils.config import MIN_BUR_VALUES, CONFIDENCE_LEVEL, LINEAR_REGRESSION_PARAMS
+from utils.profiling import profiled
+from .segments import segment_lengths, segment_positions, segment_sum
+
+# Everything phrase_sufficient_stats depends on besides the phrase itself;
+# bump stage_version when the per-phrase statistics change
+SUFFICIENT_STATS_PARAMS = {
+    'stage_version': 1
+}
+
+# Per-phrase sums returned by phrase_sufficient_stats besides n
+SUFFICIENT_STATS = ('sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'sum_yy')
+
+
+@profiled(rows=lambda result: len(result['n']))
+def phrase_sufficient_stats(values, offsets):
+    """
+    Sufficient statistics of every phrase for a regression of BUR on position.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1; phrase i is
+                 values[offsets[i]:offsets[i + 1]]
+
+    Returns:
+        Dictionary of per-phrase arrays:
+            - n: Number of BUR values
+            - sum_x, sum_xx: Sum of positions (0..n-1) and of their squares
+            - sum_y, sum_yy: Sum of BUR values and of their squares
+            - sum_xy: Sum of position times BUR value
+
+    Note:
+        Sums of several phrases are again sufficient statistics, so any
+        grouping of phrases can be fitted from these arrays alone.
+    """
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    x = segment_positions(offsets).astype(float)
+    return {
+        'n': segment_lengths(offsets),
+        'sum_x': segment_sum(x, offsets),
+        'sum_y': segment_sum(y, offsets),
+        'sum_xx': segment_sum(x * x, offsets),
+        'sum_xy': segment_sum(x * y, offsets),
+        'sum_yy': segment_sum(y * y, offsets)
+    }
+
+
+def _phrase_fits(stats):
+    """Per-phrase centered sums, OLS slope and slope sampling variance from sufficient statistics."""
+    n = np.asarray(stats['n'], dtype=float)
+    sum_x, sum_y = np.asarray(stats['sum_x']), np.asarray(stats['sum_y'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sxx = stats['sum_xx'] - sum_x * sum_x / n
+        sxy = stats['sum_xy'] - sum_x * sum_y / n
+        syy = np.maximum(stats['sum_yy'] - sum_y * sum_y / n, 0.0)
+        slope = sxy / sxx
+        rss = np.maximum(syy - slope * sxy, 0.0)
+        slope_var = rss / (n - LINEAR_REGRESSION_PARAMS) / sxx
+    return sxx, sxy, syy, slope, slope_var
+
+
+@profiled(rows=lambda result: len(result['n_phrases']))
+def grouped_trend_estimates(stats, group_code, n_groups, mask=None, min_values=MIN_BUR_VALUES):
+    """
+    Pooled and random-slope BUR trends per group (e.g. per artist) from phrase sufficient statistics.
+
+    Args:
+        stats: Per-phrase arrays from phrase_sufficient_stats
+        group_code: Group code (0..n_groups-1) of every phrase, e.g. phrase_artist_codes
+        n_groups: Number of groups
+        mask: Optional boolean array selecting the phrases to include
+        min_values: Skip phrases shorter than this (default from config: 6)
+
+    Returns:
+        Dictionary of per-group arrays (NaN where a group has too few phrases):
+            - n_phrases, n_values: Phrases and BUR values included
+            - pooled_slope, pooled_std_err, pooled_p_value: Common within-phrase
+              slope (phrase-specific intercepts), two-tailed t-test on
+              n_values - n_phrases - 1 degrees of freedom
+            - slope, std_err, ci_lower, ci_upper, p_value: Random-slope mean
+              slope with a normal-theory CI and two-tailed z-test
+            - tau2: Between-phrase slope variance (DerSimonian-Laird, ≥ 0;
+              NaN with fewer than two phrases)
+            - q_statistic, i2: Cochran's Q of the phrase slopes and the share
+              of their spread attributed to between-phrase variation
+            - direction: 'increase', 'decrease', or 'none' from the
+              random-slope estimate
+
+    Note:
+        - The pooled slope is one weighted reduction per group:
+          Σ Sxy / Σ Sxx over centered per-phrase sums
+        - The random-slope fit needs three passes over the phrases (fixed
+          weights, Cochran's Q, random-effects weights), each one np.bincount
+        - Phrases whose fit is exact (zero residual variance) enter the
+          pooled slope but not the random-slope fit, which would give them
+          infinite weight
+    """
+    from scipy import special
+
+    group_code = np.asarray(group_code, dtype=np.int64)
+    sxx, sxy, syy, slope, slope_var = _phrase_fits(stats)
+    n = np.asarray(stats['n'])
+    usable = (n >= max(min_values, LINEAR_REGRESSION_PARAMS + 1)) & (sxx > 0)
+    if mask is not None:
+        usable &= np.asarray(mask, dtype=bool)
+
+    def total(weights, selected=usable):
+        return np.bincount(group_code[selected], weights=weights[selected], minlength=n_groups)
+
+    n_phrases = np.bincount(group_code[usable], minlength=n_groups)
+    n_values = total(n.astype(float)).astype(np.int64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Common slope with one intercept per phrase
+        group_sxx, group_sxy, group_syy = total(sxx), total(sxy), total(syy)
+        pooled_slope = group_sxy / group_sxx
+        pooled_dof = n_values - n_phrases - 1
+        pooled_rss = np.maximum(group_syy - pooled_slope * group_sxy, 0.0)
+        pooled_std_err = np.sqrt(pooled_rss / pooled_dof / group_sxx)
+        pooled_p_value = 2 * special.stdtr(pooled_dof, -np.abs(pooled_slope / pooled_std_err))
+
+        # Random slopes: fixed-effect weights, then Cochran's Q and τ²
+        weighted = usable & (slope_var > 0)
+        k = np.bincount(group_code[weighted], minlength=n_groups)
+        weight = 1 / slope_var
+        sum_w = total(weight, weighted)
+        sum_w2 = total(weight * weight, weighted)
+        fixed_slope = total(weight * slope, weighted) / sum_w
+        deviation = slope - fixed_slope[group_code]
+        q_statistic = total(weight * deviation * deviation, weighted)
+        tau2 = np.where(k >= 2, np.maximum(0.0, (q_statistic - (k - 1)) / (sum_w - sum_w2 / sum_w)), np.nan)
+        i2 = np.where(k >= 2, np.maximum(0.0, (q_statistic - (k - 1)) / q_statistic), np.nan)
+
+        re_weight = 1 / (slope_var + np.nan_to_num(tau2)[group_code])
+        sum_re = total(re_weight, weighted)
+        re_slope = total(re_weight * slope, weighted) / sum_re
+        std_err = 1 / np.sqrt(sum_re)
+        z_critical = special.ndtri(1 - (1 - CONFIDENCE_LEVEL) / 2)
+        p_value = 2 * special.ndtr(-np.abs(re_slope / std_err))
+
+    direction = np.where(re_slope > 0, 'increase', np.where(re_slope < 0, 'decrease', 'none'))
+    q_statistic = np.where(k >= 1, q_statistic, np.nan)
+
+    return {
+        'n_phrases': n_phrases,
+        'n_values': n_values,
+        'pooled_slope': pooled_slope,
+        'pooled_std_err': pooled_std_err,
+        'pooled_p_value': pooled_p_value,
+        'slope': re_slope,
+        'std_err': std_err,
+        'ci_lower': re_slope - z_critical * std_err,
+        'ci_upper': re_slope + z_critical * std_err,
+        'p_value': p_value,
+        'tau2': tau2,
+        'q_statistic': q_statistic,
+        'i2': i2,
+        'direction': direction
+    }
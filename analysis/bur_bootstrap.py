@@ -0,0 +1,107 @@
+"""
+BUR Bootstrap - Per-Artist Confidence Intervals
+
+Percentile bootstrap confidence intervals for per-artist summaries of
+per-phrase statistics (significant-increase rates, mean phrase std, ...).
+Phrases are resampled with replacement within each artist, so an artist
+with few phrases gets a correspondingly wide interval.
+
+Resamples are drawn as index matrices over the precomputed per-phrase
+values - no trend is refit - and processed in chunks sized to a memory
+limit. Results depend only on the seed, not on the chunk size.
+"""
+
+import numpy as np
+from utils.config import CONFIDENCE_LEVEL
+from utils.profiling import profiled
+
+# Default number of bootstrap resamples
+DEFAULT_RESAMPLES = 10000
+
+# Upper bound on the working memory of one chunk of resamples (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+@profiled(rows=lambda result: int(result['n'].sum()))
+def grouped_bootstrap_means(stats, group_code, n_groups=None, n_resamples=DEFAULT_RESAMPLES, seed=0,
+                            confidence=CONFIDENCE_LEVEL, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Bootstrap confidence intervals for per-group means of per-phrase statistics.
+
+    Args:
+        stats: Per-phrase values, shape (n_phrases,) or (n_phrases, n_stats);
+               use 0/1 indicators to get rates
+        group_code: Integer group (artist) code for each phrase
+        n_groups: Number of groups (default: group_code.max() + 1)
+        n_resamples: Number of bootstrap resamples (default: 10000)
+        seed: Random seed; same seed = same intervals
+        confidence: Confidence level of the intervals (default from config: 0.95)
+        max_bytes: Memory limit for one chunk of resamples (default: 256 MiB)
+
+    Returns:
+        Dictionary containing:
+            - n: Phrase count per group
+            - mean: Observed mean per group (NaN for empty groups)
+            - ci_lower, ci_upper: Percentile interval bounds per group
+        Each has shape (n_groups,) or (n_groups, n_stats) to match stats
+
+    Note:
+        - Each resample redraws every group's phrases with replacement,
+          keeping the group sizes fixed
+        - All statistics share the same resampled phrases, so their
+          intervals can be compared directly
+        - Inputs are taken as fixed per phrase; e.g. FDR decisions are not
+          redone per resample
+    """
+    stats = np.asarray(stats, dtype=float)
+    squeeze = stats.ndim == 1
+    if squeeze:
+        stats = stats[:, None]
+    group_code = np.asarray(group_code, dtype=np.int64)
+    if n_groups is None:
+        n_groups = int(group_code.max()) + 1 if len(group_code) else 0
+    n_stats = stats.shape[1]
+
+    # Lay phrases out group by group so each group is one contiguous segment
+    order = np.argsort(group_code, kind='stable')
+    sorted_stats = stats[order]
+    counts = np.bincount(group_code, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    present = np.flatnonzero(counts)
+    slot_start = starts[group_code[order]]
+    slot_count = counts[group_code[order]]
+    n_slots = len(order)
+
+    mean = np.full((n_groups, n_stats), np.nan)
+    ci_lower = np.full((n_groups, n_stats), np.nan)
+    ci_upper = np.full((n_groups, n_stats), np.nan)
+
+    if n_slots:
+        with np.errstate(invalid='ignore'):
+            mean[present] = np.add.reduceat(sorted_stats, starts[present], axis=0) / counts[present][:, None]
+
+        # Uniform draws, indices and gathered values for one resample
+        bytes_per_resample = n_slots * (8 + 8 + 8 * n_stats)
+        chunk_size = int(max(1, min(n_resamples, max_bytes // bytes_per_resample)))
+
+        # Consecutive draws from one generator equal a single large draw,
+        # so the chunk size does not change the resamples
+        rng = np.random.default_rng(seed)
+        boot_means = np.empty((n_resamples, len(present), n_stats))
+        for start in range(0, n_resamples, chunk_size):
+            size = min(chunk_size, n_resamples - start)
+            index = slot_start + (rng.random((size, n_slots)) * slot_count).astype(np.int64)
+            sums = np.add.reduceat(sorted_stats[index], starts[present], axis=1)
+            boot_means[start:start + size] = sums / counts[present][:, None]
+
+        tail = (1 - confidence) / 2
+        ci_lower[present], ci_upper[present] = np.quantile(boot_means, [tail, 1 - tail], axis=0)
+
+    if squeeze:
+        mean, ci_lower, ci_upper = mean[:, 0], ci_lower[:, 0], ci_upper[:, 0]
+    return {
+        'n': counts,
+        'mean': mean,
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper
+    }
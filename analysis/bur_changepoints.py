@@ -0,0 +1,228 @@
+"""
+BUR Changepoints - Where a Surge Begins
+
+Splits each phrase into segments, each with its own linear trend
+(piecewise linear) or its own mean level (mean shift), to locate the
+position where the BUR trend changes.
+
+- Single break: the split minimizing the total residual sum of squares,
+  with the slopes and means on either side and a likelihood-ratio
+  statistic against the unsplit phrase
+- Multiple breaks: exact penalized segmentation (the optimum PELT finds)
+  with a BIC penalty per added segment
+
+Phrases of equal length are stacked (see segments.segment_rows_by_length)
+and their prefix sums taken row-wise, so every candidate segment costs
+O(1) and each length is searched in one pass over all of its phrases.
+"""
+
+import numpy as np
+from utils.config import CHANGEPOINT_MIN_SEGMENT, LINEAR_REGRESSION_PARAMS
+from utils.profiling import profiled
+from .segments import segment_lengths, segment_rows_by_length
+
+# Segment models: a line per segment, or a constant level per segment
+CHANGEPOINT_MODELS = ('linear', 'mean')
+
+# Parameters fitted per segment for each model
+_SEGMENT_PARAMS = {'linear': LINEAR_REGRESSION_PARAMS, 'mean': 1}
+
+
+def _check_model(model):
+    if model not in CHANGEPOINT_MODELS:
+        raise ValueError(f"model must be one of {CHANGEPOINT_MODELS}, got {model!r}")
+
+
+def _row_prefix(rows):
+    """
+    Row-wise prefix sums of y, x*y and y^2 with a leading zero column.
+
+    BUR values are centred on their row mean first, which keeps the sums
+    small and the segment differences accurate.
+    """
+    y = rows - rows.mean(axis=1, keepdims=True)
+    x = np.arange(rows.shape[1], dtype=float)
+    prefix = []
+    for terms in (y, x * y, y * y):
+        out = np.zeros((rows.shape[0], rows.shape[1] + 1))
+        np.cumsum(terms, axis=1, out=out[:, 1:])
+        prefix.append(out)
+    return prefix
+
+
+def _segment_fits(prefix, starts, ends):
+    """
+    Fits of segments rows[:, starts:ends] from row prefix sums.
+
+    starts and ends are integer arrays (or scalars) of the same shape; the
+    result arrays have shape (n_rows,) + that shape.
+
+    Returns:
+        Tuple of (sum_y, slope, rss_linear, rss_mean) over the centred values
+    """
+    prefix_y, prefix_xy, prefix_yy = prefix
+    starts, ends = np.broadcast_arrays(starts, ends)
+    width = (ends - starts).astype(float)
+    sum_y = prefix_y[:, ends] - prefix_y[:, starts]
+    sum_xy = prefix_xy[:, ends] - prefix_xy[:, starts]
+    sum_yy = prefix_yy[:, ends] - prefix_yy[:, starts]
+
+    # Positions a, a+1, ..., b-1: closed-form sum and squared deviations
+    sum_x = (starts + ends - 1) * width / 2
+    ssx = width * (width ** 2 - 1) / 12
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ssy = np.maximum(sum_yy - sum_y * sum_y / width, 0.0)
+        ssxy = sum_xy - sum_x * sum_y / width
+        slope = ssxy / ssx
+        rss_linear = np.maximum(ssy - slope * ssxy, 0.0)
+    return sum_y, slope, rss_linear, ssy
+
+
+@profiled(rows=lambda result: len(result['break_position']))
+def single_changepoint_batch(values, offsets, model='linear', min_segment=CHANGEPOINT_MIN_SEGMENT):
+    """
+    Best single split of every phrase into two segments.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        model: 'linear' (a line per segment, default) or 'mean' (a level per segment)
+        min_segment: Fewest BUR values per segment (default from config: 3)
+
+    Returns:
+        Dictionary of per-phrase arrays (-1 / NaN for phrases shorter than
+        2 * min_segment):
+            - break_position: Position of the first value after the break
+            - pre_slope, post_slope: Least-squares slope of each segment
+            - pre_mean, post_mean: Mean BUR of each segment
+            - lr_statistic: n * ln(RSS unsplit / RSS split), the Gaussian
+              likelihood-ratio statistic against one segment of the same model
+
+    Note:
+        - Every split with min_segment values on both sides is tried; ties
+          go to the earliest break
+        - The break is chosen to maximize lr_statistic, so it does not follow
+          a chi-squared distribution; compare it across phrases or with the
+          BIC penalty used by multiple_changepoints_batch
+    """
+    _check_model(model)
+    values = np.asarray(values, dtype=float)
+    lengths = segment_lengths(offsets)
+    n_phrases = len(lengths)
+    results = {
+        'break_position': np.full(n_phrases, -1, dtype=np.int64),
+        **{key: np.full(n_phrases, np.nan) for key in
+           ('pre_slope', 'post_slope', 'pre_mean', 'post_mean', 'lr_statistic')}
+    }
+    rss_index = 2 if model == 'linear' else 3
+
+    for phrase_index, rows in segment_rows_by_length(values, offsets, min_length=2 * min_segment):
+        n = rows.shape[1]
+        prefix = _row_prefix(rows)
+        breaks = np.arange(min_segment, n - min_segment + 1)
+        pre = _segment_fits(prefix, 0, breaks)
+        post = _segment_fits(prefix, breaks, n)
+        best = np.argmin(pre[rss_index] + post[rss_index], axis=1)
+        rows_at = np.arange(len(rows))
+        rss_split = pre[rss_index][rows_at, best] + post[rss_index][rows_at, best]
+        rss_whole = _segment_fits(prefix, 0, n)[rss_index]
+
+        position = breaks[best]
+        row_mean = rows.mean(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            results['lr_statistic'][phrase_index] = n * np.log(rss_whole / rss_split)
+        results['break_position'][phrase_index] = position
+        results['pre_slope'][phrase_index] = pre[1][rows_at, best]
+        results['post_slope'][phrase_index] = post[1][rows_at, best]
+        results['pre_mean'][phrase_index] = row_mean + pre[0][rows_at, best] / position
+        results['post_mean'][phrase_index] = row_mean + post[0][rows_at, best] / (n - position)
+
+    return results
+
+
+def _noise_variance(rows):
+    """
+    Robust per-row noise variance from first differences.
+
+    (MAD of the differences / 0.6745)^2 / 2: a level shift or a change in
+    slope moves only a few differences, so breaks barely inflate it.
+    """
+    diffs = np.diff(rows, axis=1)
+    mad = np.median(np.abs(diffs - np.median(diffs, axis=1, keepdims=True)), axis=1)
+    variance = (mad / 0.6745) ** 2 / 2
+    # Fall back to the plain difference variance when over half the differences are equal
+    fallback = np.mean(diffs * diffs, axis=1) / 2
+    return np.maximum(np.where(variance > 0, variance, fallback), np.finfo(float).tiny)
+
+
+@profiled(rows=lambda result: len(result['n_breaks']))
+def multiple_changepoints_batch(values, offsets, model='linear', penalty=None,
+                                min_segment=CHANGEPOINT_MIN_SEGMENT):
+    """
+    Penalized segmentation of every phrase into any number of segments.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        model: 'linear' (a line per segment, default) or 'mean' (a level per segment)
+        penalty: Cost of each added segment in units of the noise variance
+                 (default: BIC, (segment parameters + 1) * ln(n))
+        min_segment: Fewest BUR values per segment (default from config: 3)
+
+    Returns:
+        Dictionary with:
+            - n_breaks: Number of breaks per phrase (0 below 2 * min_segment)
+            - breaks: Flat array of break positions (first value after each
+              break), ascending within each phrase
+            - break_offsets: Phrase i's breaks are breaks[break_offsets[i]:break_offsets[i + 1]]
+
+    Note:
+        - Minimizes Σ RSS(segment) / σ² + penalty * (segments - 1), where σ²
+          is a robust noise variance from the phrase's first differences
+        - Solved exactly by dynamic programming over segment ends (the
+          optimum PELT finds); phrases of one length run as one array, so
+          the Python loop is over positions, not phrases
+    """
+    _check_model(model)
+    values = np.asarray(values, dtype=float)
+    lengths = segment_lengths(offsets)
+    n_phrases = len(lengths)
+    rss_index = 2 if model == 'linear' else 3
+    found_phrases, found_breaks = [], []
+
+    for phrase_index, rows in segment_rows_by_length(values, offsets, min_length=2 * min_segment):
+        n_rows, n = rows.shape
+        prefix = _row_prefix(rows)
+        noise = _noise_variance(rows)[:, None]
+        beta = penalty if penalty is not None else (_SEGMENT_PARAMS[model] + 1) * np.log(n)
+
+        # best[:, t]: cheapest segmentation of the first t values; last[:, t]: start of its last segment
+        best = np.full((n_rows, n + 1), np.inf)
+        best[:, 0] = -beta
+        last = np.zeros((n_rows, n + 1), dtype=np.int64)
+        for end in range(min_segment, n + 1):
+            starts = np.r_[0, np.arange(min_segment, end - min_segment + 1)]
+            cost = best[:, starts] + _segment_fits(prefix, starts, end)[rss_index] / noise + beta
+            choice = np.argmin(cost, axis=1)
+            best[:, end] = cost[np.arange(n_rows), choice]
+            last[:, end] = starts[choice]
+
+        # Walk back from the end; every segment start after 0 is a break
+        row = np.arange(n_rows)
+        position = np.full(n_rows, n)
+        while len(row):
+            position = last[row, position]
+            has_break = position > 0
+            found_phrases.append(phrase_index[row[has_break]])
+            found_breaks.append(position[has_break])
+            row, position = row[has_break], position[has_break]
+
+    found_phrases = np.concatenate(found_phrases) if found_phrases else np.zeros(0, dtype=np.int64)
+    found_breaks = np.concatenate(found_breaks) if found_breaks else np.zeros(0, dtype=np.int64)
+    order = np.lexsort((found_breaks, found_phrases))
+    n_breaks = np.bincount(found_phrases, minlength=n_phrases)
+    return {
+        'n_breaks': n_breaks,
+        'breaks': found_breaks[order],
+        'break_offsets': np.r_[0, np.cumsum(n_breaks)].astype(np.int64)
+    }
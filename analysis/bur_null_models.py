@@ -0,0 +1,269 @@
+"""
+BUR Null Models - Randomized Surge Rates
+
+Builds null distributions for the surge analysis by shuffling BUR order
+within each phrase and rerunning the trend test on every shuffle. Shuffling
+keeps each phrase's values (and so its mean and variance) but destroys any
+relation to position, giving the significant-increase rate expected by chance.
+
+Shuffles are drawn in blocks sized to a memory budget, each with its own
+child of a SeedSequence seeded with (seed, block size), so results depend
+only on the seed and block size - not on the number of worker processes.
+Workers read the corpus from shared memory.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from utils.config import MIN_BUR_VALUES, FDR_ALPHA
+from utils.profiling import profiled
+from .bur_surge_analysis import trend_moments, trend_correlation, trend_p_value, fdr_correction
+from .segments import segment_index, segment_lengths
+
+# Default number of within-phrase shuffles
+DEFAULT_PERMUTATIONS = 1000
+
+# Upper bound on the working memory of one block of shuffles (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+# Working bytes per shuffled value: sort key, permutation, shuffled value and
+# its product with the position deviation
+SHUFFLE_BYTES_PER_VALUE = 32
+
+# Per-process corpus state, set by _init_worker (or directly when running inline)
+_worker_state = {}
+
+
+def fdr_reject_rows(p_values, alpha=FDR_ALPHA):
+    """
+    Benjamini-Hochberg rejections for each row of a p-value matrix.
+
+    Args:
+        p_values: 2D array, one row per family of tests
+        alpha: Desired false discovery rate (default from config: 0.05)
+
+    Returns:
+        Boolean array of the same shape (True = reject)
+
+    Note:
+        Same decision rule as multipletests(method='fdr_bh'): reject the k
+        smallest p-values, where k is the largest rank with p_(k) <= alpha*k/m.
+    """
+    p_values = np.atleast_2d(p_values)
+    m = p_values.shape[1]
+    order = np.argsort(p_values, axis=1, kind='stable')
+    p_sorted = np.take_along_axis(p_values, order, axis=1)
+    below = p_sorted <= alpha * np.arange(1, m + 1) / m
+
+    # Number of rejections per row = position of the last rank meeting the bound
+    any_below = below.any(axis=1)
+    n_reject = np.where(any_below, m - np.argmax(below[:, ::-1], axis=1), 0)
+
+    reject = np.zeros_like(below)
+    reject_sorted = np.arange(m) < n_reject[:, None]
+    np.put_along_axis(reject, order, reject_sorted, axis=1)
+    return reject
+
+
+def _init_worker(specs):
+    """Attach the shared corpus arrays and precompute shuffle-invariant moments."""
+    blocks = {}
+    arrays = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        blocks[name] = block
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    _worker_state.clear()
+    _worker_state['shm'] = blocks
+    _prepare_state(arrays)
+
+
+def _prepare_state(arrays):
+    values = arrays['values']
+    offsets = arrays['offsets']
+    moments = trend_moments(values, offsets)
+    seg = segment_index(offsets)
+
+    _worker_state.update({
+        'values': values,
+        'offsets': offsets,
+        'artist_code': arrays['artist_code'],
+        'seg': seg,
+        # Position deviations do not change under shuffling; neither do ssxm and ssym
+        'dx': np.arange(len(values)) - offsets[:-1][seg] - moments['xmean'][seg],
+        'n': moments['n'],
+        'ssxm': moments['ssxm'],
+        'ssym': moments['ssym']
+    })
+
+
+def _run_block(task):
+    """Shuffle the corpus for one block of permutations and count significant increases."""
+    seed_seq, n_shuffles, alpha, correction, n_artists = task
+    state = _worker_state
+    values, offsets, seg = state['values'], state['offsets'], state['seg']
+    rng = np.random.default_rng(seed_seq)
+
+    # Sorting phrase index + uniform noise permutes values within each phrase only
+    keys = seg + rng.random((n_shuffles, len(values)))
+    shuffled = values[np.argsort(keys, axis=1)]
+
+    ssxym = np.add.reduceat(state['dx'] * shuffled, offsets[:-1], axis=1) / state['n']
+    r = trend_correlation(state['ssxm'], ssxym, state['ssym'])
+    p_values = trend_p_value(r, state['n'])
+
+    if correction == 'fdr_bh':
+        significant = fdr_reject_rows(p_values, alpha)
+    else:
+        significant = p_values < alpha
+    sig_increase = significant & (ssxym > 0)
+
+    # Per-artist counts for every shuffle in one bincount over (shuffle, artist) cells
+    cells = np.arange(n_shuffles)[:, None] * n_artists + state['artist_code']
+    artist_counts = np.bincount(cells.ravel(), weights=sig_increase.ravel(), minlength=n_shuffles * n_artists)
+    return sig_increase.sum(axis=1), artist_counts.reshape(n_shuffles, n_artists).astype(np.int64)
+
+
+def null_block_size(n_values, n_permutations, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Shuffles per block so that one block's working arrays fit in max_bytes.
+
+    Args:
+        n_values: BUR values in the (filtered) corpus
+        n_permutations: Total number of shuffles
+        max_bytes: Memory limit for one block (default: 256 MiB)
+
+    Returns:
+        Block size between 1 and n_permutations
+    """
+    per_shuffle = max(n_values, 1) * SHUFFLE_BYTES_PER_VALUE
+    return int(max(1, min(n_permutations, max_bytes // per_shuffle)))
+
+
+def _share_arrays(arrays):
+    """Copy arrays into new shared memory blocks; returns (blocks, specs for workers)."""
+    blocks = {}
+    specs = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks[name] = block
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+@profiled(rows=lambda result: result['n_phrases'])
+def surge_null_distribution(values, offsets, artist_code, n_permutations=DEFAULT_PERMUTATIONS,
+                            seed=0, n_workers=None, alpha=FDR_ALPHA, correction='fdr_bh',
+                            min_values=MIN_BUR_VALUES, block_size=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Null distribution of significant-increase rates from within-phrase shuffles.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        artist_code: Integer artist code for each phrase
+        n_permutations: Number of shuffles of the whole corpus (default: 1000)
+        seed: Seed for the random streams; same seed = same result
+        n_workers: Worker processes (default: os.cpu_count(); 1 = run inline)
+        alpha: Significance threshold (default from config: 0.05)
+        correction: 'fdr_bh' for Benjamini-Hochberg, or None for raw p < alpha
+        min_values: Phrases shorter than this are left out (default from config: 6)
+        block_size: Shuffles per task (default: from max_bytes, see
+                    null_block_size); changing it changes the random streams
+        max_bytes: Memory limit for one block per worker (default: 256 MiB)
+
+    Returns:
+        Dictionary containing:
+            - n_phrases: Number of phrases tested
+            - observed_rate: Fraction of phrases with a significant increase
+            - null_rates: Rate for each shuffle (length n_permutations)
+            - p_value: Empirical p-value, (1 + #null >= observed) / (1 + n_permutations)
+            - artist_phrases: Phrase count per artist code
+            - observed_artist_rates: Per-artist significant-increase rate
+            - null_artist_rates: Per-artist rates, shape (n_permutations, n_artists)
+            - artist_p_values: Empirical p-value per artist
+            - block_size: Shuffles per block (pass it back to reproduce the
+              result with a different max_bytes)
+
+    Note:
+        - Shuffling leaves each phrase's mean and variance unchanged, so only
+          the position cross-moment is recomputed per shuffle
+        - The observed rate uses the same trend test on the unshuffled data
+    """
+    values = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    artist_code = np.asarray(artist_code, dtype=np.int64)
+
+    # Keep only phrases long enough to test, packed back to back
+    lengths = segment_lengths(offsets)
+    keep = lengths >= min_values
+    values = values[np.repeat(keep, lengths)]
+    offsets = np.concatenate([[0], np.cumsum(lengths[keep])]).astype(np.int64)
+    artist_code = artist_code[keep]
+    n_phrases = int(keep.sum())
+    n_artists = int(artist_code.max()) + 1 if n_phrases else 0
+
+    # Observed rates from the unshuffled corpus
+    moments = trend_moments(values, offsets)
+    r = trend_correlation(moments['ssxm'], moments['ssxym'], moments['ssym'])
+    p_observed = trend_p_value(r, moments['n'])
+    if correction == 'fdr_bh':
+        significant, _ = fdr_correction(p_observed, alpha=alpha)
+        significant = np.asarray(significant, dtype=bool)
+    else:
+        significant = p_observed < alpha
+    observed_increase = significant & (moments['ssxym'] > 0)
+    artist_phrases = np.bincount(artist_code, minlength=n_artists)
+    observed_artist = np.bincount(artist_code, weights=observed_increase, minlength=n_artists)
+
+    # One independent random stream per block, regardless of worker count;
+    # the block size is part of the seed, since it decides which draws a block makes
+    if block_size is None:
+        block_size = null_block_size(len(values), n_permutations, max_bytes)
+    n_blocks = -(-n_permutations // block_size)
+    children = np.random.SeedSequence([seed, block_size]).spawn(n_blocks)
+    sizes = [min(block_size, n_permutations - i * block_size) for i in range(n_blocks)]
+    tasks = [(child, size, alpha, correction, n_artists) for child, size in zip(children, sizes)]
+
+    arrays = {'values': values, 'offsets': offsets, 'artist_code': artist_code}
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or n_blocks <= 1:
+        _worker_state.clear()
+        _prepare_state(arrays)
+        block_results = [_run_block(task) for task in tasks]
+        _worker_state.clear()
+    else:
+        blocks, specs = _share_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(specs,)) as pool:
+                block_results = list(pool.map(_run_block, tasks))
+        finally:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+
+    null_counts = np.concatenate([counts for counts, _ in block_results])
+    null_artist_counts = np.concatenate([counts for _, counts in block_results])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed_rate = observed_increase.sum() / n_phrases
+        null_rates = null_counts / n_phrases
+        observed_artist_rates = observed_artist / artist_phrases
+        null_artist_rates = null_artist_counts / artist_phrases
+
+    return {
+        'n_phrases': n_phrases,
+        'observed_rate': observed_rate,
+        'null_rates': null_rates,
+        'p_value': (1 + np.sum(null_counts >= observed_increase.sum())) / (1 + n_permutations),
+        'artist_phrases': artist_phrases,
+        'observed_artist_rates': observed_artist_rates,
+        'null_artist_rates': null_artist_rates,
+        'artist_p_values': (1 + np.sum(null_artist_counts >= observed_artist, axis=0)) / (1 + n_permutations),
+        'block_size': block_size
+    }
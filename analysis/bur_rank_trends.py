@@ -0,0 +1,164 @@
+"""
+BUR Rank Trends - Theil-Sen Slopes and Rank-Based Trend Tests
+
+Outlier-resistant alternatives to the OLS surge test: the Theil-Sen slope
+(median of all pairwise slopes), the Mann-Kendall test (Kendall's tau of
+BUR against position) and Spearman's rank correlation.
+
+Phrases of equal length are stacked (see segments.segment_rows_by_length),
+so the n(n-1)/2 pairwise differences of a whole stack are one array
+operation. Stacks are processed in blocks of at most RANK_BLOCK_PAIRS
+pairwise values to bound memory.
+"""
+
+import numpy as np
+from utils.config import MIN_BUR_VALUES, CONFIDENCE_LEVEL
+from utils.profiling import profiled
+from .bur_surge_analysis import trend_correlation, trend_p_value
+from .segments import segment_lengths, segment_rows_by_length
+
+# Everything rank_trend_batch depends on besides the phrase itself;
+# bump stage_version when the per-phrase statistics change
+RANK_TREND_PARAMS = {
+    'stage_version': 1,
+    'MIN_BUR_VALUES': MIN_BUR_VALUES,
+    'CONFIDENCE_LEVEL': CONFIDENCE_LEVEL
+}
+
+# Pairwise slopes held in memory at once (8 bytes each)
+RANK_BLOCK_PAIRS = 1 << 22
+
+
+def _tie_runs(sorted_rows):
+    """
+    Runs of equal values in each row of a row-sorted array.
+
+    Returns:
+        Tuple of (run_row, run_start, run_length): the row, first column and
+        length of every run, in row-major order
+    """
+    n_rows, n = sorted_rows.shape
+    starts = np.ones((n_rows, n), dtype=bool)
+    starts[:, 1:] = sorted_rows[:, 1:] != sorted_rows[:, :-1]
+    flat_starts = np.flatnonzero(starts)
+    run_length = np.diff(np.append(flat_starts, n_rows * n))
+    # A run never crosses a row end, since every row starts a run
+    return flat_starts // n, flat_starts % n, run_length
+
+
+def _rank_block(rows, confidence_level):
+    """Rank trend statistics for a block of equal-length phrases."""
+    from scipy import special
+
+    n_rows, n = rows.shape
+    first, second = np.triu_indices(n, 1)
+    n_pairs = len(first)
+
+    # Pairwise slopes (y_j - y_i) / (j - i), sorted per row
+    differences = rows[:, second] - rows[:, first]
+    mk_s = np.sign(differences).sum(axis=1)
+    slopes = np.sort(differences / (second - first), axis=1)
+    theil_slope = (slopes[:, (n_pairs - 1) // 2] + slopes[:, n_pairs // 2]) / 2
+    del differences
+
+    # Ties in BUR (positions never tie)
+    sorted_rows = np.sort(rows, axis=1)
+    run_row, run_start, run_length = _tie_runs(sorted_rows)
+    t = run_length.astype(float)
+    tie_variance = np.bincount(run_row, weights=t * (t - 1) * (2 * t + 5), minlength=n_rows)
+    tied_pairs = np.bincount(run_row, weights=t * (t - 1) / 2, minlength=n_rows)
+
+    # Mann-Kendall variance of S with the tie correction (as scipy.stats.kendalltau)
+    m = n * (n - 1.0)
+    s_variance = (m * (2 * n + 5) - tie_variance) / 18
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kendall_tau = mk_s / np.sqrt(n_pairs) / np.sqrt(n_pairs - tied_pairs)
+        mk_p_value = 2 * special.ndtr(-np.abs(mk_s / np.sqrt(s_variance)))
+
+    # Theil-Sen CI from the order statistics of the slopes (as scipy.stats.theilslopes)
+    z = special.ndtri((1 - confidence_level) / 2)
+    sigma = np.sqrt(s_variance)
+    upper_index = np.minimum(np.round((n_pairs - z * sigma) / 2).astype(np.int64), n_pairs - 1)
+    lower_index = np.maximum(np.round((n_pairs + z * sigma) / 2).astype(np.int64) - 1, 0)
+    row_index = np.arange(n_rows)
+
+    # Spearman: Pearson correlation of position with the average ranks of BUR
+    run_rank = run_start + (t + 1) / 2
+    ranks = np.empty((n_rows, n))
+    order = np.argsort(rows, axis=1, kind='stable')
+    np.put_along_axis(ranks, order, np.repeat(run_rank, run_length).reshape(n_rows, n), axis=1)
+    x = np.arange(n, dtype=float) - (n - 1) / 2
+    dy = ranks - (n + 1) / 2
+    ssxm = np.full(n_rows, np.mean(x * x))
+    ssxym = np.mean(x * dy, axis=1)
+    ssym = np.mean(dy * dy, axis=1)
+    spearman_rho = trend_correlation(ssxm, ssxym, ssym)
+
+    return {
+        'theil_slope': theil_slope,
+        'theil_intercept': np.median(rows, axis=1) - theil_slope * (n - 1) / 2,
+        'theil_ci_lower': slopes[row_index, lower_index],
+        'theil_ci_upper': slopes[row_index, upper_index],
+        'mk_s': mk_s,
+        'kendall_tau': kendall_tau,
+        'mk_p_value': mk_p_value,
+        'spearman_rho': spearman_rho,
+        'spearman_p_value': trend_p_value(spearman_rho, np.full(n_rows, n))
+    }
+
+
+@profiled(rows=lambda result: len(result['n_values']))
+def rank_trend_batch(values, offsets, min_values=MIN_BUR_VALUES, confidence_level=CONFIDENCE_LEVEL,
+                     block_pairs=RANK_BLOCK_PAIRS):
+    """
+    Theil-Sen slope, Mann-Kendall and Spearman trend tests for every phrase.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        min_values: Phrases shorter than this get NaN statistics (default from config: 6)
+        confidence_level: Theil-Sen slope CI level (default from config: 0.95)
+        block_pairs: Most pairwise slopes held in memory at once
+
+    Returns:
+        Dictionary of per-phrase arrays:
+            - n_values: Number of BUR values
+            - theil_slope, theil_intercept: Median pairwise slope, and
+              median(BUR) - slope * median(position)
+            - theil_ci_lower, theil_ci_upper: Slope CI from Kendall's tau
+            - mk_s: Mann-Kendall S (concordant minus discordant pairs)
+            - kendall_tau, mk_p_value: Kendall's tau-b of BUR against position
+              and the two-tailed normal-approximation p-value (tie-corrected
+              variance, no continuity correction)
+            - spearman_rho, spearman_p_value: Spearman correlation (average
+              ranks for ties) with the t-test on n-2 degrees of freedom
+            - direction: Sign of theil_slope as 'increase', 'decrease' or 'none'
+
+    Note:
+        - Matches scipy.stats.theilslopes (method='separate'), kendalltau
+          (method='asymptotic') and spearmanr to floating-point rounding
+        - The Mann-Kendall p-value is an asymptotic approximation; for the
+          shortest phrases it is conservative relative to the exact test
+    """
+    values = np.asarray(values, dtype=float)
+    n_values = segment_lengths(offsets)
+    n_phrases = len(n_values)
+    results = {key: np.full(n_phrases, np.nan) for key in (
+        'theil_slope', 'theil_intercept', 'theil_ci_lower', 'theil_ci_upper', 'mk_s',
+        'kendall_tau', 'mk_p_value', 'spearman_rho', 'spearman_p_value'
+    )}
+
+    for phrase_index, rows in segment_rows_by_length(values, offsets, min_length=max(min_values, 3)):
+        n = rows.shape[1]
+        block_rows = max(1, block_pairs // (n * (n - 1) // 2))
+        for start in range(0, len(rows), block_rows):
+            block = _rank_block(rows[start:start + block_rows], confidence_level)
+            for key, column in block.items():
+                results[key][phrase_index[start:start + block_rows]] = column
+
+    slope = results['theil_slope']
+    return {
+        'n_values': n_values,
+        **results,
+        'direction': np.where(slope > 0, 'increase', np.where(slope < 0, 'decrease', 'none'))
+    }
@@ -0,0 +1,118 @@
+"""
+BUR Sensitivity - Headline Counts Across Threshold Settings
+
+Re-evaluates the surge summary for a grid of MIN_BUR_VALUES, FDR_ALPHA and
+CONFIDENCE_LEVEL settings without refitting any phrase.
+
+The per-phrase fits do not depend on these thresholds: the minimum length
+only selects phrases, alpha only enters the Benjamini-Hochberg step, and
+the confidence level only scales the slope CI half-width. So every phrase
+of the raw corpus is fitted once, and each grid point masks the fits,
+reruns fdr_correction on the selected p-values and recounts.
+"""
+
+import numpy as np
+from utils.config import LINEAR_REGRESSION_PARAMS
+from utils.profiling import profiled
+from .bur_surge_analysis import fdr_correction
+
+# Shortest phrase with a residual degree of freedom for the slope test
+MIN_SWEEP_LENGTH = LINEAR_REGRESSION_PARAMS + 1
+
+
+@profiled(rows=lambda result: len(result['min_length']))
+def sensitivity_sweep(trends, group_code, artist_code, min_lengths, alphas, confidence_levels, robust=False):
+    """
+    Surge summary counts for every combination of threshold settings.
+
+    Args:
+        trends: Per-phrase arrays from linear_trend_analysis_batch (and
+                hac_trend_analysis_batch if robust) fitted with
+                min_values <= min(min_lengths)
+        group_code: Solo code of every phrase (phrases['solo_code'])
+        artist_code: Artist code of every phrase (see utils.data_utils.phrase_artist_codes)
+        min_lengths: Minimum phrase lengths to try (each >= MIN_SWEEP_LENGTH)
+        alphas: FDR levels to try
+        confidence_levels: Slope CI levels to try
+        robust: Use the Newey-West (HAC) p-values and standard errors
+
+    Returns:
+        Dictionary of columns with one entry per grid point, in
+        min_length, alpha, confidence_level order:
+            - min_length, alpha, confidence_level: The settings
+            - n_phrases, n_solos, n_artists: Phrases selected and the solos
+              and artists they come from
+            - n_significant, n_increase, n_decrease: FDR-significant phrases
+              (BH over the selected phrases at alpha) and their directions
+            - pct_significant: n_significant as a percentage of n_phrases
+            - n_artists_increase: Artists with at least one significant increase
+            - n_ci_excludes_zero, n_ci_increase, n_ci_decrease: Phrases whose
+              slope CI at confidence_level excludes zero (uncorrected)
+
+    Note:
+        One fdr_correction call per (min_length, alpha) pair and one t
+        quantile per distinct phrase length and confidence level; nothing is
+        refitted.
+    """
+    from scipy import stats
+
+    if min(min_lengths) < MIN_SWEEP_LENGTH:
+        raise ValueError(f"min_lengths must be at least {MIN_SWEEP_LENGTH}, got {min(min_lengths)}")
+    n_values = np.asarray(trends['n_values'])
+    slope = np.asarray(trends['slope'])
+    p_values = np.asarray(trends['hac_p_value' if robust else 'p_value'])
+    std_err = np.asarray(trends['hac_std_err' if robust else 'std_err'])
+    group_code = np.asarray(group_code)
+    artist_code = np.asarray(artist_code)
+
+    rows = {key: [] for key in (
+        'min_length', 'alpha', 'confidence_level', 'n_phrases', 'n_solos', 'n_artists',
+        'n_significant', 'n_increase', 'n_decrease', 'pct_significant', 'n_artists_increase',
+        'n_ci_excludes_zero', 'n_ci_increase', 'n_ci_decrease'
+    )}
+    for min_length in min_lengths:
+        selected = np.flatnonzero((n_values >= min_length) & ~np.isnan(p_values))
+        sel_slope = slope[selected]
+        dof = n_values[selected] - LINEAR_REGRESSION_PARAMS
+        unique_dof, dof_inverse = np.unique(dof, return_inverse=True)
+        counts = {
+            'n_phrases': len(selected),
+            'n_solos': len(np.unique(group_code[selected])),
+            'n_artists': len(np.unique(artist_code[selected]))
+        }
+
+        for alpha in alphas:
+            if len(selected):
+                reject = np.asarray(fdr_correction(p_values[selected], alpha=alpha)[0], dtype=bool)
+            else:
+                reject = np.zeros(0, dtype=bool)
+            increase = reject & (sel_slope > 0)
+            decrease = reject & (sel_slope < 0)
+            fdr_counts = {
+                'n_significant': int(reject.sum()),
+                'n_increase': int(increase.sum()),
+                'n_decrease': int(decrease.sum()),
+                'pct_significant': 100 * reject.sum() / max(len(selected), 1),
+                'n_artists_increase': len(np.unique(artist_code[selected][increase]))
+            }
+
+            for confidence_level in confidence_levels:
+                # Same CI as linear_trend_analysis_batch: slope ± t(n - 2) * std_err
+                t_critical = stats.t.ppf(1 - (1 - confidence_level) / 2, unique_dof)[dof_inverse]
+                half_width = t_critical * std_err[selected]
+                ci_increase = sel_slope - half_width > 0
+                ci_decrease = sel_slope + half_width < 0
+                point = {
+                    'min_length': min_length,
+                    'alpha': alpha,
+                    'confidence_level': confidence_level,
+                    **counts,
+                    **fdr_counts,
+                    'n_ci_excludes_zero': int((ci_increase | ci_decrease).sum()),
+                    'n_ci_increase': int(ci_increase.sum()),
+                    'n_ci_decrease': int(ci_decrease.sum())
+                }
+                for key, value in point.items():
+                    rows[key].append(value)
+
+    return {key: np.asarray(column) for key, column in rows.items()}
@@ -0,0 +1,143 @@
+"""
+BUR Sharding - Map/Reduce Surge Analysis
+
+Splits a corpus into shards of whole solos, fits the per-phrase trends of
+each shard independently (map) and applies the Benjamini-Hochberg
+correction once over the merged p-values (reduce).
+
+Per-phrase fits only read their own phrase, so a phrase gets the same bits
+in any shard. The reduce step concatenates the shard p-values in corpus
+order and runs the single-process fdr_correction on them, so the merged
+decisions and corrected p-values are identical to an unsharded run.
+
+Shards can run in a local process pool (sharded_phrase_trend_stats) or as
+separate jobs that write shard files and are merged later
+(cli/bur_shard_cli.py).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from utils.profiling import profiled
+from .bur_surge_analysis import phrase_trend_stats, fdr_correction
+
+
+def shard_bounds(phrases, n_shards):
+    """
+    Phrase boundaries of n_shards shards made of whole solos.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.group_phrases)
+        n_shards: Number of shards wanted
+
+    Returns:
+        Integer array of length n_shards + 1; shard i holds phrases
+        bounds[i]:bounds[i + 1]. Cuts fall on solo boundaries and balance the
+        BUR value count, so some shards may be empty if there are few solos.
+
+    Note:
+        Phrases are grouped in solo id order, so every solo is one
+        contiguous run of phrases.
+    """
+    if n_shards < 1:
+        raise ValueError(f"n_shards must be at least 1, got {n_shards}")
+    offsets = np.asarray(phrases['offsets'], dtype=np.int64)
+    solo_code = np.asarray(phrases['solo_code'])
+    n_phrases = len(solo_code)
+
+    # First phrase of every solo; cut before the solo where each target value count is reached
+    solo_starts = np.flatnonzero(np.r_[True, solo_code[1:] != solo_code[:-1]])[:n_phrases]
+    targets = np.arange(1, n_shards) * (offsets[-1] / n_shards)
+    cuts = np.append(solo_starts, n_phrases)[np.searchsorted(offsets[solo_starts], targets)]
+    return np.concatenate([[0], cuts, [n_phrases]]).astype(np.int64)
+
+
+def take_phrases(phrases, start, stop):
+    """
+    Grouped phrase dict restricted to phrases start:stop.
+
+    Lookup tables (solo_ids, artists, ...) are kept whole, so codes keep
+    their meaning; offsets are rebased to the shard's own values.
+    """
+    offsets = np.asarray(phrases['offsets'], dtype=np.int64)
+    shard = dict(phrases)
+    shard['values'] = phrases['values'][offsets[start]:offsets[stop]]
+    shard['offsets'] = offsets[start:stop + 1] - offsets[start]
+    for key in ('seg_id', 'solo_code', 'seg_type_code'):
+        shard[key] = phrases[key][start:stop]
+    return shard
+
+
+def _map_shard(task):
+    """Worker entry point: per-phrase trend fits of one shard's values."""
+    values, offsets = task
+    return phrase_trend_stats(values, offsets)
+
+
+def merge_shard_columns(shard_results):
+    """
+    Concatenate per-shard dictionaries of per-phrase arrays in shard order.
+
+    Args:
+        shard_results: Sequence of dicts with the same keys
+
+    Returns:
+        Dictionary of concatenated arrays
+    """
+    shard_results = list(shard_results)
+    if not shard_results:
+        return {}
+    return {key: np.concatenate([result[key] for result in shard_results]) for key in shard_results[0]}
+
+
+@profiled(rows=lambda result: len(result['n_values']))
+def sharded_phrase_trend_stats(phrases, n_shards=None, n_workers=None):
+    """
+    phrase_trend_stats computed shard by shard in a process pool.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.group_phrases)
+        n_shards: Shards of whole solos (default: n_workers)
+        n_workers: Worker processes (default: os.cpu_count(); 1 = map inline)
+
+    Returns:
+        Dictionary of per-phrase arrays in corpus order, identical to
+        phrase_trend_stats(phrases['values'], phrases['offsets'])
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    n_shards = n_shards or n_workers
+    bounds = shard_bounds(phrases, n_shards)
+    offsets = np.asarray(phrases['offsets'], dtype=np.int64)
+    tasks = [
+        (phrases['values'][offsets[start]:offsets[stop]], offsets[start:stop + 1] - offsets[start])
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    if n_workers == 1 or len(tasks) <= 1:
+        results = [_map_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks))) as pool:
+            results = list(pool.map(_map_shard, tasks))
+    return merge_shard_columns(results)
+
+
+def sharded_fdr_correction(shard_p_values, alpha):
+    """
+    Benjamini-Hochberg over the union of several shards' p-values.
+
+    Args:
+        shard_p_values: Sequence of p-value arrays, one per shard, in corpus order
+        alpha: False discovery rate
+
+    Returns:
+        List of (reject, p_values_corrected) array pairs, one per shard,
+        equal to slicing fdr_correction of the concatenated p-values
+    """
+    shard_p_values = [np.asarray(p_values, dtype=float) for p_values in shard_p_values]
+    if not shard_p_values:
+        return []
+    reject, p_corrected = fdr_correction(np.concatenate(shard_p_values), alpha=alpha)
+    reject = np.asarray(reject, dtype=bool)
+    p_corrected = np.asarray(p_corrected, dtype=float)
+    splits = np.cumsum([len(p_values) for p_values in shard_p_values])[:-1]
+    return list(zip(np.split(reject, splits), np.split(p_corrected, splits)))
@@ -3,13 +3,35 @@ BUR Surge Analysis - Linear Trend Detection
 
 Performs simple linear regression on BUR values across phrase positions
 to detect trends (increases/decreases) in swing timing within phrases.
+Exponential and logarithmic trend models are fitted alongside for comparison.
+
+scipy and statsmodels are imported by the functions that need them, so
+importing this module (and the analysis package) stays cheap.
 """
 
 import numpy as np
-from scipy import stats
-from statsmodels.stats.multitest import multipletests
-from statsmodels.stats.stattools import durbin_watson
-from utils.config import MIN_BUR_VALUES, CONFIDENCE_LEVEL, LINEAR_REGRESSION_PARAMS, FDR_ALPHA
+from utils.config import MIN_BUR_VALUES, CONFIDENCE_LEVEL, LINEAR_REGRESSION_PARAMS, FDR_ALPHA, HAC_MAX_LAGS
+from utils.profiling import profiled
+from .segments import segment_index, segment_lengths, segment_mean, segment_positions, segment_sum
+
+# Guard against division by zero for perfect fits (same constant as scipy.stats.linregress)
+_TINY = 1.0e-20
+
+# Trend models compared per phrase, in tie-break order
+TREND_MODELS = ('linear', 'exponential', 'logarithmic')
+
+# Parameters per trend model for AIC: slope, intercept and residual variance
+TREND_MODEL_PARAMS = 3
+
+# Everything phrase_trend_stats depends on besides the phrase itself;
+# bump stage_version when the per-phrase statistics change
+TREND_STATS_PARAMS = {
+    'stage_version': 2,
+    'MIN_BUR_VALUES': MIN_BUR_VALUES,
+    'CONFIDENCE_LEVEL': CONFIDENCE_LEVEL,
+    'LINEAR_REGRESSION_PARAMS': LINEAR_REGRESSION_PARAMS,
+    'HAC_MAX_LAGS': HAC_MAX_LAGS
+}
 
 
 def linear_trend_analysis(bur_values):
@@ -32,7 +54,7 @@ def linear_trend_analysis(bur_values):
             - durbin_watson: Test statistic for autocorrelation (2 = none, <2 = positive, >2 = negative)
             
     Note:
-        - Uses scipy.stats.linregress for regression
+        - Thin wrapper around linear_trend_analysis_batch for a single phrase
         - p_value tests H0: slope = 0 (no trend) with two-tailed test
         - Confidence interval uses t-distribution with n-2 degrees of freedom
         - Assumes independence of observations (potential limitation)
@@ -41,52 +63,396 @@ def linear_trend_analysis(bur_values):
     n = len(bur_values)
     if n < MIN_BUR_VALUES:
         return None
-        
-    x = np.arange(n)
-    y = np.array(bur_values, dtype=float)
+
+    batch = linear_trend_analysis_batch(np.asarray(bur_values, dtype=float), [0, n])
+
+    return {
+        'slope': batch['slope'][0],
+        'intercept': batch['intercept'][0],
+        'r2': batch['r2'][0],
+        'p_value': batch['p_value'][0],
+        'std_err': batch['std_err'][0],
+        'conf_interval': (batch['ci_lower'][0], batch['ci_upper'][0]),
+        'direction': str(batch['direction'][0]),
+        'n_values': n,
+        'durbin_watson': batch['durbin_watson'][0]
+    }
+
+
+@profiled(rows=lambda result: len(result['n_values']))
+def linear_trend_analysis_batch(values, offsets, min_values=MIN_BUR_VALUES):
+    """
+    Perform linear regression on every phrase at once using segmented sums.
     
-    # Perform linear regression
-    result = stats.linregress(x, y)
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1; phrase i is
+                 values[offsets[i]:offsets[i + 1]]
+        min_values: Phrases shorter than this get NaN statistics (default from config: 6)
+        
+    Returns:
+        Dictionary of arrays (one entry per phrase) containing:
+            - slope, intercept, r2, p_value, std_err: As in linear_trend_analysis
+            - ci_lower, ci_upper: Confidence interval bounds for the slope
+            - direction: 'increase', 'decrease', or 'none'
+            - n_values: Number of BUR values
+            - durbin_watson: Test statistic for autocorrelation
+            
+    Note:
+        - Reproduces scipy.stats.linregress (centered sums, r clipped to [-1, 1])
+          to floating-point rounding
+        - Positions are 0..n-1, so the x mean is (n-1)/2 and needs no reduction
+        - Durbin-Watson only uses residual differences within a phrase
+    """
+    from scipy import stats
+
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    seg = segment_index(offsets)
+    x = segment_positions(offsets).astype(float)
+
+    moments = trend_moments(y, offsets)
+    n = moments['n']
+    xmean, ymean = moments['xmean'], moments['ymean']
+    ssxm, ssxym, ssym = moments['ssxm'], moments['ssxym'], moments['ssym']
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = trend_correlation(ssxm, ssxym, ssym)
+
+        slope = ssxym / ssxm
+        intercept = ymean - slope * xmean
+
+        # Two-tailed t-test on the slope with n-2 degrees of freedom
+        p_value = trend_p_value(r, n)
+        dof = n - LINEAR_REGRESSION_PARAMS
+        std_err = np.sqrt((1 - r ** 2) * ssym / ssxm / dof)
+
+        # Confidence interval: one t.ppf call per distinct phrase length
+        alpha = 1 - CONFIDENCE_LEVEL
+        t_percentile = 1 - alpha / 2  # 0.975 for 95% CI
+        unique_dof, dof_inverse = np.unique(dof, return_inverse=True)
+        t_critical = stats.t.ppf(t_percentile, unique_dof)[dof_inverse]
+        ci_lower = slope - t_critical * std_err
+        ci_upper = slope + t_critical * std_err
+
+        # Durbin-Watson: squared residual differences within each phrase only
+        residuals = y - (slope[seg] * x + intercept[seg])
+        diff_sq = np.zeros_like(residuals)
+        diff_sq[1:] = np.diff(residuals) ** 2
+        diff_sq[x == 0] = 0.0
+        dw_stat = segment_sum(diff_sq, offsets) / segment_sum(residuals ** 2, offsets)
+
+    direction = np.where(slope > 0, 'increase', np.where(slope < 0, 'decrease', 'none'))
+
+    results = {
+        'slope': slope,
+        'intercept': intercept,
+        'r2': r ** 2,
+        'p_value': p_value,
+        'std_err': std_err,
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper,
+        'direction': direction,
+        'n_values': n,
+        'durbin_watson': dw_stat
+    }
+
+    too_short = n < min_values
+    if too_short.any():
+        for key, column in results.items():
+            if column.dtype.kind == 'f':
+                column[too_short] = np.nan
+        direction[too_short] = 'none'
+
+    return results
+
+
+@profiled(rows=lambda result: len(result['n_values']))
+def phrase_trend_stats(values, offsets):
+    """
+    All per-phrase surge statistics: linear fit plus trend model comparison.
     
-    # Calculate confidence interval for slope
-    # For a two-tailed test with confidence_level (e.g., 95%), we need the
-    # critical value at (1 + confidence_level) / 2 = 0.975 for 95%
-    # This accounts for splitting alpha/2 into each tail
-    alpha = 1 - CONFIDENCE_LEVEL
-    t_percentile = 1 - alpha / 2  # 0.975 for 95% CI
-    df = n - LINEAR_REGRESSION_PARAMS  # degrees of freedom
-    t_critical = stats.t.ppf(t_percentile, df)
-    ci_lower = result.slope - t_critical * result.stderr # type: ignore
-    ci_upper = result.slope + t_critical * result.stderr # type: ignore
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        
+    Returns:
+        Dictionary of per-phrase arrays, the union of linear_trend_analysis_batch,
+        hac_trend_analysis_batch and trend_model_comparison_batch (NaN for
+        phrases below MIN_BUR_VALUES)
+        
+    Note:
+        Results depend only on the phrase and TREND_STATS_PARAMS, so they can be
+        kept in the per-phrase results store (utils.results_store).
+    """
+    return {
+        **linear_trend_analysis_batch(values, offsets),
+        **hac_trend_analysis_batch(values, offsets),
+        **trend_model_comparison_batch(values, offsets)
+    }
+
+
+def hac_lags(n, max_lags=HAC_MAX_LAGS):
+    """
+    Newey-West lag truncation per phrase.
     
-    # Determine direction
-    if result.slope > 0: # type: ignore
-        direction = 'increase'
-    elif result.slope < 0: # type: ignore
-        direction = 'decrease'
+    Args:
+        n: Array of phrase lengths
+        max_lags: None for the Newey-West rule floor(4 * (n / 100) ** (2 / 9)),
+                  or a fixed number of lags
+        
+    Returns:
+        Integer array of lags, at most n - 1
+    """
+    n = np.asarray(n, dtype=np.int64)
+    if max_lags is None:
+        lags = np.floor(4 * (n / 100) ** (2 / 9)).astype(np.int64)
     else:
-        direction = 'none'
+        lags = np.full(len(n), int(max_lags), dtype=np.int64)
+    return np.clip(lags, 0, np.maximum(n - 1, 0))
+
+
+@profiled(rows=lambda result: len(result['hac_lags']))
+def hac_trend_analysis_batch(values, offsets, max_lags=HAC_MAX_LAGS, min_values=MIN_BUR_VALUES):
+    """
+    Autocorrelation-robust slope inference for every phrase at once.
     
-    # Calculate Durbin-Watson statistic for autocorrelation
-    # DW ≈ 2: no autocorrelation
-    # DW < 2: positive autocorrelation (adjacent values are similar)
-    # DW > 2: negative autocorrelation (adjacent values alternate)
-    residuals = y - (result.slope * x + result.intercept) # type: ignore
-    dw_stat = durbin_watson(residuals)
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        max_lags: Newey-West lag truncation (default from config: None = per-phrase rule)
+        min_values: Phrases shorter than this get NaN statistics (default from config: 6)
+        
+    Returns:
+        Dictionary of arrays (one entry per phrase) containing:
+            - hac_std_err: Newey-West (HAC, Bartlett kernel) standard error of the slope
+            - hac_p_value: Two-tailed p-value for H0: slope = 0 using hac_std_err
+            - hac_lags: Number of lags used
+            - ar1_rho: Lag-1 autocorrelation of the residuals
+            - n_effective: AR(1)-adjusted effective sample size, n (1 - rho) / (1 + rho),
+              capped at n
+              
+    Note:
+        - Same estimate as statsmodels OLS(...).fit(cov_type='HAC',
+          cov_kwds={'maxlags': L}, use_t=True): no small-sample correction,
+          t-distribution with n-2 degrees of freedom
+        - Lagged products are summed with one shifted multiply per lag over
+          the flat array, masked to pairs within the same phrase
+    """
+    from scipy import special
+
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    seg = segment_index(offsets)
+    x = segment_positions(offsets)
+
+    moments = trend_moments(y, offsets)
+    n = moments['n']
+    lags = hac_lags(n, max_lags)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = moments['ssxym'] / moments['ssxm']
+        dx = x - moments['xmean'][seg]
+        residuals = (y - moments['ymean'][seg]) - slope[seg] * dx
+        scores = dx * residuals
+
+        # Bartlett-weighted sum of score autocovariances, one shifted product per lag
+        long_run = segment_sum(scores * scores, offsets)
+        lag1 = np.zeros(len(n))
+        for lag in range(1, int(lags.max(initial=0)) + 1):
+            same_phrase = x[lag:] >= lag
+            products = np.where(same_phrase, scores[lag:] * scores[:-lag], 0.0)
+            weights = np.where(lag <= lags, 1 - lag / (lags + 1), 0.0)
+            lagged = np.concatenate([np.zeros(lag), products])
+            long_run += 2 * weights * segment_sum(lagged, offsets)
+        sxx = n * moments['ssxm']
+        hac_std_err = np.sqrt(long_run) / sxx
+
+        dof = n - LINEAR_REGRESSION_PARAMS
+        hac_p_value = 2 * special.stdtr(dof, -np.abs(slope / hac_std_err))
+
+        # Lag-1 residual autocorrelation and the AR(1) effective sample size
+        lag1_products = np.zeros_like(residuals)
+        lag1_products[1:] = np.where(x[1:] >= 1, residuals[1:] * residuals[:-1], 0.0)
+        ar1_rho = segment_sum(lag1_products, offsets) / segment_sum(residuals ** 2, offsets)
+        n_effective = np.minimum(n * (1 - ar1_rho) / (1 + ar1_rho), n)
+
+    results = {
+        'hac_std_err': hac_std_err,
+        'hac_p_value': hac_p_value,
+        'hac_lags': lags,
+        'ar1_rho': ar1_rho,
+        'n_effective': n_effective
+    }
+
+    too_short = n < min_values
+    if too_short.any():
+        for column in results.values():
+            if column.dtype.kind == 'f':
+                column[too_short] = np.nan
+        lags[too_short] = 0
+
+    return results
+
+
+@profiled(rows=lambda result: len(result['best_model']))
+def trend_model_comparison_batch(values, offsets, min_values=MIN_BUR_VALUES):
+    """
+    Fit linear, exponential and logarithmic trends to every phrase at once.
     
-    return {
-        'slope': result.slope, # type: ignore
-        'intercept': result.intercept, # type: ignore
-        'r2': result.rvalue ** 2, # type: ignore
-        'p_value': result.pvalue, # type: ignore
-        'std_err': result.stderr, # type: ignore
-        'conf_interval': (ci_lower, ci_upper),
-        'direction': direction,
-        'n_values': n,
-        'durbin_watson': dw_stat
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        min_values: Phrases shorter than this get NaN statistics (default from config: 6)
+        
+    Returns:
+        Dictionary of arrays (one entry per phrase) containing:
+            - exp_rate, exp_r2, exp_p_value: Exponential model, ln(BUR) vs position
+              (BUR = a * exp(exp_rate * position))
+            - log_slope, log_r2, log_p_value: Logarithmic model, BUR vs ln(position + 1)
+            - aic_linear, aic_exponential, aic_logarithmic: Gaussian AIC on the BUR scale
+            - best_model: 'linear', 'exponential' or 'logarithmic' (lowest AIC; 'none' if unfit)
+            
+    Note:
+        - Each model is a simple regression, so all three come from the same
+          segmented moments used by linear_trend_analysis_batch
+        - Positions are shifted by one for the logarithmic model so the first
+          value sits at ln(1) = 0
+        - The exponential AIC adds 2 * sum(ln BUR), the Jacobian of the log
+          transform, so it is comparable with the models fitted on raw BUR
+        - All models have the same number of parameters, so AIC and R² on
+          the BUR scale rank them the same way
+    """
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    positions = segment_positions(offsets).astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_y = np.log(y)
+        fits = {
+            'linear': _fit_from_moments(trend_moments(y, offsets)),
+            'exponential': _fit_from_moments(trend_moments(log_y, offsets)),
+            'logarithmic': _fit_from_moments(trend_moments(y, offsets, positions=np.log1p(positions)))
+        }
+
+        n = segment_lengths(offsets).astype(float)
+        aic = {name: n * np.log(fit['rss'] / n) + 2 * TREND_MODEL_PARAMS for name, fit in fits.items()}
+        aic['exponential'] = aic['exponential'] + 2 * segment_sum(log_y, offsets)
+
+    aic_matrix = np.column_stack([aic[name] for name in TREND_MODELS])
+    fitted = ~np.isnan(aic_matrix).all(axis=1)
+    best = np.argmin(np.where(np.isnan(aic_matrix), np.inf, aic_matrix), axis=1)
+    best_model = np.where(fitted, np.asarray(TREND_MODELS)[best], 'none')
+
+    results = {
+        'exp_rate': fits['exponential']['slope'],
+        'exp_r2': fits['exponential']['r2'],
+        'exp_p_value': fits['exponential']['p_value'],
+        'log_slope': fits['logarithmic']['slope'],
+        'log_r2': fits['logarithmic']['r2'],
+        'log_p_value': fits['logarithmic']['p_value'],
+        'aic_linear': aic['linear'],
+        'aic_exponential': aic['exponential'],
+        'aic_logarithmic': aic['logarithmic'],
+        'best_model': best_model
     }
 
+    too_short = segment_lengths(offsets) < min_values
+    if too_short.any():
+        for column in results.values():
+            if column.dtype.kind == 'f':
+                column[too_short] = np.nan
+        best_model[too_short] = 'none'
+
+    return results
+
+
+def _fit_from_moments(moments):
+    """Slope, r², p-value and residual sum of squares from trend_moments output."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = trend_correlation(moments['ssxm'], moments['ssxym'], moments['ssym'])
+        return {
+            'slope': moments['ssxym'] / moments['ssxm'],
+            'r2': r ** 2,
+            'p_value': trend_p_value(r, moments['n']),
+            'rss': moments['n'] * moments['ssym'] * (1 - r ** 2)
+        }
+
+
+def trend_moments(values, offsets, positions=None):
+    """
+    Per-phrase centered moments of BUR against position.
+    
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        positions: Optional flat array of regressor values (default: 0..n-1
+                   within each phrase, whose mean is (n-1)/2 without a reduction)
+        
+    Returns:
+        Dictionary of per-phrase arrays:
+            - n: Number of BUR values
+            - xmean, ymean: Mean position and mean BUR
+            - ssxm, ssxym, ssym: Average squared/cross deviations from the means
+              (the entries of np.cov(x, y, bias=1), as used by linregress)
+    """
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n = segment_lengths(offsets)
+    seg = segment_index(offsets)
+    nf = n.astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if positions is None:
+            x = segment_positions(offsets).astype(float)
+            xmean = (nf - 1) / 2
+        else:
+            x = np.asarray(positions, dtype=float)
+            xmean = segment_mean(x, offsets)
+        ymean = segment_mean(y, offsets)
+        dx = x - xmean[seg]
+        dy = y - ymean[seg]
+        return {
+            'n': n,
+            'xmean': xmean,
+            'ymean': ymean,
+            'ssxm': segment_sum(dx * dx, offsets) / nf,
+            'ssxym': segment_sum(dx * dy, offsets) / nf,
+            'ssym': segment_sum(dy * dy, offsets) / nf
+        }
+
 
+def trend_correlation(ssxm, ssxym, ssym):
+    """
+    Pearson r from centered moments, with linregress's degenerate-case handling.
+    
+    Note:
+        - r is NaN when there is no variation at all, 0 when only one side varies
+        - Clipped to [-1, 1] against rounding error
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        degenerate = (ssxm == 0.0) | (ssym == 0.0)
+        r = np.where(degenerate, np.where(ssxym == 0, np.nan, 0.0), ssxym / np.sqrt(ssxm * ssym))
+    return np.clip(r, -1.0, 1.0)
+
+
+def trend_p_value(r, n):
+    """
+    Two-tailed p-value for H0: slope = 0, given r and phrase length n.
+    
+    Note:
+        Uses the t statistic with n-2 degrees of freedom exactly as
+        scipy.stats.linregress does (including its TINY guard).
+    """
+    from scipy import special
+
+    dof = np.asarray(n) - LINEAR_REGRESSION_PARAMS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt(dof / ((1.0 - r + _TINY) * (1.0 + r + _TINY)))
+        return 2 * special.stdtr(dof, -np.abs(t))
+
+
+@profiled(rows=lambda result: len(result[1]))
 def fdr_correction(p_values, alpha=FDR_ALPHA):
     """
     Apply Benjamini-Hochberg FDR correction for multiple testing.
@@ -105,6 +471,8 @@ def fdr_correction(p_values, alpha=FDR_ALPHA):
         This is less conservative than Bonferroni correction and more
         appropriate when testing many hypotheses.
     """
+    from statsmodels.stats.multitest import multipletests
+
     # Remove None values for correction
     valid_p_values = [p for p in p_values if p is not None]
     
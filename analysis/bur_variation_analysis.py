@@ -3,25 +3,80 @@ BUR Variation Analysis - Within-Phrase Consistency
 
 Measures how much BUR varies within individual phrases using standard deviation.
 Lower variation indicates more consistent swing timing within a phrase.
+Alongside the standard deviation, each phrase gets its mean, coefficient of
+variation, median absolute deviation, quartiles, range and lag-1
+autocorrelation.
 """
 
 import numpy as np
 from utils.config import MIN_BUR_VALUES
+from utils.profiling import profiled
+from .segments import segment_rows_by_length
+
+# Everything phrase_variation_stats_batch depends on besides the phrase itself;
+# bump stage_version when the per-phrase statistics change
+VARIATION_STATS_PARAMS = {
+    'stage_version': 2,
+    'MIN_BUR_VALUES': MIN_BUR_VALUES
+}
+
+# Per-phrase statistics besides n_values, in output order
+VARIATION_STATS = (
+    'std_bur', 'mean_bur', 'cv_bur', 'mad_bur',
+    'q25_bur', 'median_bur', 'q75_bur', 'iqr_bur',
+    'min_bur', 'max_bur', 'lag1_autocorr'
+)
+
+
+def _describe(rows):
+    """
+    Descriptive statistics along the last axis of a 1-D phrase or 2-D stack of phrases.
+
+    Every statistic is one numpy reduction along that axis, so a row of a
+    stack gets exactly the same bits as the phrase on its own.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std_bur = np.std(rows, axis=-1, ddof=1)
+        mean_bur = np.mean(rows, axis=-1)
+        q25_bur, median_bur, q75_bur = np.quantile(rows, [0.25, 0.5, 0.75], axis=-1)
+        deviations = rows - mean_bur[..., None]
+        lag1_autocorr = (np.sum(deviations[..., :-1] * deviations[..., 1:], axis=-1)
+                         / np.sum(deviations * deviations, axis=-1))
+        return {
+            'std_bur': std_bur,
+            'mean_bur': mean_bur,
+            'cv_bur': std_bur / mean_bur,
+            'mad_bur': np.median(np.abs(rows - median_bur[..., None]), axis=-1),
+            'q25_bur': q25_bur,
+            'median_bur': median_bur,
+            'q75_bur': q75_bur,
+            'iqr_bur': q75_bur - q25_bur,
+            'min_bur': np.min(rows, axis=-1),
+            'max_bur': np.max(rows, axis=-1),
+            'lag1_autocorr': lag1_autocorr
+        }
 
 
 def phrase_variation_stats(bur_values):
     """
-    Calculate standard deviation of BUR values within a phrase.
-    
+    Calculate descriptive statistics of BUR values within a phrase.
+
     Args:
         bur_values: List or array of BUR values for a single phrase
-        
+
     Returns:
         Dictionary containing:
             - n_values: Number of BUR values in the phrase
             - std_bur: Standard deviation of BUR values (measure of variation/consistency)
+            - mean_bur, cv_bur: Mean and coefficient of variation (std / mean)
+            - mad_bur: Median absolute deviation from the median (unscaled)
+            - q25_bur, median_bur, q75_bur, iqr_bur: Quartiles (linear
+              interpolation) and interquartile range
+            - min_bur, max_bur: Smallest and largest value
+            - lag1_autocorr: Lag-1 autocorrelation around the phrase mean
+              (NaN for a constant phrase)
         Returns None if fewer than MIN_BUR_VALUES values
-        
+
     Note:
         - Uses sample standard deviation (ddof=1, divide by n-1)
         - This is pure descriptive statistics (no hypothesis testing)
@@ -31,8 +86,41 @@ def phrase_variation_stats(bur_values):
     n = len(bur_values)
     if n < MIN_BUR_VALUES:
         return None
-    std_bur = np.std(bur_values, ddof=1)
+    stats = _describe(np.asarray(bur_values, dtype=float))
     return {
         'n_values': n,
-        'std_bur': std_bur
+        **{key: float(value) for key, value in stats.items()}
+    }
+
+
+@profiled(rows=lambda result: len(result['n_values']))
+def phrase_variation_stats_batch(values, offsets):
+    """
+    Calculate phrase_variation_stats for every phrase in a flat BUR array.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1; phrase i is
+                 values[offsets[i]:offsets[i + 1]]
+
+    Returns:
+        Dictionary of per-phrase arrays:
+            - n_values: Number of BUR values in the phrase
+            - One float array per VARIATION_STATS key (NaN below MIN_BUR_VALUES)
+
+    Note:
+        Phrases of equal length are stacked and reduced row-wise, one pass
+        per distinct length, so every value equals phrase_variation_stats on
+        that phrase exactly (std_bur is bit-identical to np.std(ddof=1)).
+    """
+    values = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_values = np.diff(offsets)
+    results = {key: np.full(len(n_values), np.nan) for key in VARIATION_STATS}
+    for phrase_index, rows in segment_rows_by_length(values, offsets, min_length=MIN_BUR_VALUES):
+        for key, column in _describe(rows).items():
+            results[key][phrase_index] = column
+    return {
+        'n_values': n_values,
+        **results
     }
@@ -0,0 +1,135 @@
+"""
+BUR Window Trends - Onset, Close and Sliding-Window Regressions
+
+Fits the BUR-vs-position regression over parts of each phrase: the first k
+values (onset), the last k values (close) and every sliding window of width
+w. Window sums come from prefix sums over the flat BUR array, so each window
+costs O(1) and a whole corpus is scanned in O(n) per window width.
+
+Positions inside a window are consecutive integers, so the position sums
+have closed forms; only sums of y, x*y and y^2 need prefix sums. BUR values
+are centred on their phrase mean first, which keeps the prefix sums small
+and the window differences accurate.
+"""
+
+import numpy as np
+from utils.config import MIN_BUR_VALUES, FDR_ALPHA, LINEAR_REGRESSION_PARAMS
+from utils.profiling import profiled
+from .bur_surge_analysis import trend_correlation, trend_p_value
+from .segments import segment_index, segment_lengths, segment_mean, segment_positions
+
+# Smallest width that leaves a degree of freedom for the slope test
+MIN_WINDOW = LINEAR_REGRESSION_PARAMS + 1
+
+
+def _prefix(values):
+    """Prefix sums with a leading zero: sum of values[a:b] is out[b] - out[a]."""
+    out = np.zeros(len(values) + 1)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _window_fits(prefix, positions, starts, width):
+    """Slope and two-tailed p-value for windows values[starts:starts + width]."""
+    prefix_y, prefix_xy, prefix_yy = prefix
+    ends = starts + width
+    sum_y = prefix_y[ends] - prefix_y[starts]
+    sum_xy = prefix_xy[ends] - prefix_xy[starts]
+    sum_yy = prefix_yy[ends] - prefix_yy[starts]
+
+    # Positions a, a+1, ..., a+w-1: closed-form sum and squared deviations
+    first = positions[starts].astype(float)
+    sum_x = width * first + width * (width - 1) / 2
+    ssxm = np.full(len(starts), width * (width ** 2 - 1) / 12)
+    ssxym = sum_xy - sum_x * sum_y / width
+    ssym = sum_yy - sum_y * sum_y / width
+    # Rounding in the differences can leave a tiny residue for constant windows
+    ssym = np.where(ssym <= 1e-12 * np.maximum(sum_yy, 1.0), 0.0, ssym)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = ssxym / ssxm
+        r = trend_correlation(ssxm, ssxym, ssym)
+        p_value = trend_p_value(r, np.full(len(starts), width))
+    return slope, p_value
+
+
+@profiled(rows=lambda result: len(result['n_windows']))
+def window_trend_scan(values, offsets, window=MIN_BUR_VALUES, edge=None, alpha=FDR_ALPHA):
+    """
+    Onset, close and sliding-window trend fits for every phrase at once.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        window: Sliding window width w (default from config: 6)
+        edge: Values fitted at the onset and close (default: window)
+        alpha: Per-window significance threshold (default from config: 0.05)
+
+    Returns:
+        Dictionary of per-phrase arrays:
+            - onset_slope, onset_p_value: Fit over the first edge values
+            - close_slope, close_p_value: Fit over the last edge values
+            - n_windows: Number of sliding windows (n - w + 1, or 0)
+            - best_window_start: Position of the first value of the window with
+              the steepest significant increase (-1 if there is none)
+            - best_window_slope, best_window_p_value: That window's fit (NaN if none)
+        Phrases shorter than edge (or window) get NaN for those fits.
+
+    Note:
+        - Slopes and p-values equal scipy.stats.linregress on the same values
+          up to rounding
+        - The best window is picked from many overlapping tests, so its
+          p-value is not corrected for that selection
+    """
+    edge = window if edge is None else edge
+    if min(window, edge) < MIN_WINDOW:
+        raise ValueError(f"window and edge must be at least {MIN_WINDOW}")
+
+    y = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n = segment_lengths(offsets)
+    seg = segment_index(offsets)
+    positions = segment_positions(offsets)
+    n_phrases = len(n)
+
+    with np.errstate(invalid='ignore'):
+        dy = y - segment_mean(y, offsets)[seg]
+    prefix = (_prefix(dy), _prefix(positions * dy), _prefix(dy * dy))
+
+    results = {}
+    # Onset and close: one window per phrase at either end
+    has_edge = n >= edge
+    for name, starts in (('onset', offsets[:-1]), ('close', offsets[1:] - edge)):
+        slope = np.full(n_phrases, np.nan)
+        p_value = np.full(n_phrases, np.nan)
+        slope[has_edge], p_value[has_edge] = _window_fits(prefix, positions, starts[has_edge], edge)
+        results[f'{name}_slope'] = slope
+        results[f'{name}_p_value'] = p_value
+
+    # Every sliding window, grouped by phrase in flat order
+    starts = np.flatnonzero(positions + window <= n[seg])
+    window_phrase = seg[starts]
+    slope, p_value = _window_fits(prefix, positions, starts, window)
+    n_windows = np.bincount(window_phrase, minlength=n_phrases)
+    window_offsets = np.concatenate([[0], np.cumsum(n_windows)])
+
+    # Steepest significant increase per phrase (first such window on ties)
+    score = np.where((p_value < alpha) & (slope > 0), slope, -np.inf)
+    best_score = np.full(n_phrases, -np.inf)
+    has_windows = n_windows > 0
+    if has_windows.any():
+        best_score[has_windows] = np.maximum.reduceat(score, window_offsets[:-1][has_windows])
+    candidate = np.where(np.isfinite(score) & (score == best_score[window_phrase]), np.arange(len(starts)), len(starts))
+    best_index = np.full(n_phrases, len(starts))
+    if has_windows.any():
+        best_index[has_windows] = np.minimum.reduceat(candidate, window_offsets[:-1][has_windows])
+    found = best_index < len(starts)
+
+    results['n_windows'] = n_windows
+    results['best_window_start'] = np.full(n_phrases, -1, dtype=np.int64)
+    results['best_window_slope'] = np.full(n_phrases, np.nan)
+    results['best_window_p_value'] = np.full(n_phrases, np.nan)
+    results['best_window_start'][found] = positions[starts[best_index[found]]]
+    results['best_window_slope'][found] = slope[best_index[found]]
+    results['best_window_p_value'][found] = p_value[best_index[found]]
+    return results
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the PhraseBur pipeline on synthetic corpora of any size.
+"""
@@ -0,0 +1,153 @@
+"""
+Import-time budget check.
+
+Imports each package and CLI entry module in a fresh interpreter with
+``python -X importtime`` and checks two things:
+
+- the cumulative import time of the module stays within its budget
+- heavy dependencies the module is meant to defer (pandas, scipy,
+  statsmodels, matplotlib, and numpy for the bare packages) are not
+  imported at all
+
+The second check is what catches most regressions (a stray top-level
+import); the time budgets are generous so machine noise does not trip them.
+
+Usage:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --repeat 5 --output outputs/import_times.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Dependencies that no entry module below should load at import time
+DEFERRED = ('pandas', 'scipy', 'statsmodels', 'matplotlib')
+
+# Module -> (budget in milliseconds, top-level packages it must not import)
+IMPORT_BUDGETS = {
+    'utils': (50, DEFERRED + ('numpy',)),
+    'analysis': (50, DEFERRED + ('numpy',)),
+    'visualization': (50, DEFERRED + ('numpy',)),
+    'service': (50, DEFERRED + ('numpy',)),
+    'utils.clean_data': (400, DEFERRED),
+    'utils.ingest': (400, DEFERRED),
+    'service.queries': (400, DEFERRED),
+    'cli.pipeline': (500, DEFERRED),
+    'cli.bur_surge_cli': (400, DEFERRED),
+    'cli.bur_variation_cli': (400, DEFERRED),
+    'cli.bur_histogram_cli': (400, DEFERRED),
+    'cli.bur_null_model_cli': (400, DEFERRED),
+    'cli.bur_shard_cli': (400, DEFERRED),
+    'cli.bur_window_cli': (400, DEFERRED),
+    'cli.bur_artist_trend_cli': (400, DEFERRED),
+    'cli.bur_changepoint_cli': (400, DEFERRED),
+    'cli.bur_sensitivity_cli': (400, DEFERRED),
+    'cli.bur_rank_trend_cli': (400, DEFERRED)
+}
+
+
+def measure_import(module, repeat=3):
+    """
+    Import a module in fresh interpreters and parse the -X importtime report.
+
+    Args:
+        module: Dotted module name
+        repeat: Interpreters started; the fastest run is kept (default: 3)
+
+    Returns:
+        Dictionary containing:
+            - module: The module name
+            - ms: Cumulative import time of the module in milliseconds
+            - packages: Sorted top-level packages imported along the way
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    packages = set()
+    for _ in range(max(repeat, 1)):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            capture_output=True, text=True, cwd=root
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr}")
+
+        cumulative = None
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, total, name = line.split('|')
+            if not total.strip().isdigit():
+                continue  # header line
+            name = name.strip()
+            packages.add(name.split('.')[0])
+            if name == module:
+                cumulative = int(total) / 1000
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+    return {
+        'module': module,
+        'ms': best,
+        'packages': sorted(packages)
+    }
+
+
+def check_import_budgets(budgets=IMPORT_BUDGETS, repeat=3):
+    """
+    Measure every module in budgets and list the violations.
+
+    Args:
+        budgets: Dictionary mapping module -> (budget ms, forbidden packages)
+        repeat: Interpreters started per module (default: 3)
+
+    Returns:
+        Tuple of (measurements, violations); each violation is a message string
+    """
+    measurements = []
+    violations = []
+    for module, (budget_ms, forbidden) in budgets.items():
+        result = measure_import(module, repeat)
+        result['budget_ms'] = budget_ms
+        result['loaded'] = [package for package in forbidden if package in result['packages']]
+        measurements.append(result)
+        if result['ms'] is not None and result['ms'] > budget_ms:
+            violations.append(f"{module}: {result['ms']:.1f} ms > budget {budget_ms} ms")
+        if result['loaded']:
+            violations.append(f"{module}: imports {', '.join(result['loaded'])} at import time")
+    return measurements, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import times of the packages and CLIs against a budget')
+    parser.add_argument('modules', nargs='*', help='Modules to check (default: all budgeted modules)')
+    parser.add_argument('--repeat', type=int, default=3, help='Interpreters per module, fastest kept (default: 3)')
+    parser.add_argument('--output', '-o', help='Write the measurements as JSON to this file')
+    args = parser.parse_args()
+
+    unknown = [module for module in args.modules if module not in IMPORT_BUDGETS]
+    if unknown:
+        parser.error(f"no budget for: {', '.join(unknown)} (choose from {', '.join(IMPORT_BUDGETS)})")
+    budgets = {module: IMPORT_BUDGETS[module] for module in args.modules} if args.modules else IMPORT_BUDGETS
+
+    measurements, violations = check_import_budgets(budgets, args.repeat)
+    print(f"{'module':<24} {'ms':>8} {'budget':>8}  deferred dependencies loaded")
+    for result in measurements:
+        print(f"{result['module']:<24} {result['ms']:>8.1f} {result['budget_ms']:>8}  "
+              f"{', '.join(result['loaded']) or '-'}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'measurements': measurements, 'violations': violations}, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    for violation in violations:
+        print(f"OVER BUDGET {violation}")
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
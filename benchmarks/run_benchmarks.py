@@ -0,0 +1,338 @@
+"""
+PhraseBur pipeline benchmarks.
+
+Times each pipeline stage on synthetic corpora (see synthetic_corpus.py) of
+increasing size and records throughput and peak memory as JSON. Every stage
+runs in a fresh Python process, so peak RSS is not inflated by earlier stages
+and import costs are not charged to the stage.
+
+Stages:
+- clean / clean_stream: utils.clean_data on the raw synthetic CSV
+- load: parse and group the filtered CSV (no phrase cache)
+- trend / variation: batch per-phrase statistics
+- trend_scalar / variation_scalar: linear_trend_analysis / phrase_variation_stats
+  called once per phrase (skipped above --scalar-max-rows)
+- histograms: create_performer_bur_histograms, every PNG redrawn
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 10000 1000000 10000000 --output outputs/benchmarks.json
+    python -m benchmarks.run_benchmarks --sizes 10000 --compare outputs/benchmarks.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_corpus import generate_phrasebur_csv
+
+STAGES = ('clean', 'clean_stream', 'load', 'trend', 'trend_scalar', 'variation', 'variation_scalar', 'histograms')
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+
+# Per-phrase Python loops get slow on large corpora
+DEFAULT_SCALAR_MAX_ROWS = 1_000_000
+
+# Relative slowdown (or memory growth) reported as a regression by --compare
+DEFAULT_TOLERANCE = 0.25
+
+DEFAULT_WORK_DIR = 'outputs/benchmark_corpora'
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    # On Linux ru_maxrss survives exec and would include the parent's peak;
+    # VmHWM belongs to this process image only
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def _load_phrases_in_memory(filtered_csv):
+    """Grouped phrases with every array read into memory (not memory-mapped)."""
+    from utils.data_utils import load_phrasebur_phrases
+    return {name: np.array(array) for name, array in load_phrasebur_phrases(filtered_csv).items()}
+
+
+def _import_dependencies():
+    """
+    Import the libraries the stages load on first use.
+
+    Analysis modules import pandas, scipy, statsmodels and matplotlib inside
+    the functions that need them; loading them here keeps that one-off cost
+    out of the timed stage, as when they were imported at module level.
+    """
+    import pandas
+    from scipy import special, stats
+    from statsmodels.stats.multitest import multipletests
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+
+def _run_stage(stage, corpus_dir):
+    """
+    Run one stage in the current process and measure it.
+
+    Returns:
+        Dictionary with seconds, peak_rss_mb and baseline_rss_mb (peak RSS
+        after imports and input loading, before the timed stage)
+    """
+    from utils.clean_data import clean_phrasebur_data, clean_phrasebur_data_streaming
+    from utils.data_utils import iter_phrase_values
+
+    raw_csv = os.path.join(corpus_dir, 'raw.csv')
+    filtered_csv = os.path.join(corpus_dir, 'filtered.csv')
+    scratch_csv = os.path.join(corpus_dir, f'scratch-{os.getpid()}.csv')
+    scratch_dir = os.path.join(corpus_dir, f'scratch-{os.getpid()}')
+
+    phrases = None
+    if stage not in ('clean', 'clean_stream', 'load'):
+        phrases = _load_phrases_in_memory(filtered_csv)
+    values, offsets = (phrases['values'], phrases['offsets']) if phrases else (None, None)
+
+    if stage == 'clean':
+        run = lambda: clean_phrasebur_data(raw_csv, scratch_csv)
+    elif stage == 'clean_stream':
+        run = lambda: clean_phrasebur_data_streaming(raw_csv, scratch_csv)
+    elif stage == 'load':
+        from utils.data_utils import load_phrasebur_phrases
+        run = lambda: load_phrasebur_phrases(filtered_csv, use_cache=False)
+    elif stage == 'trend':
+        from analysis.bur_surge_analysis import phrase_trend_stats
+        run = lambda: phrase_trend_stats(values, offsets)
+    elif stage == 'trend_scalar':
+        from analysis.bur_surge_analysis import linear_trend_analysis
+        run = lambda: [linear_trend_analysis(phrase) for phrase in iter_phrase_values(phrases)]
+    elif stage == 'variation':
+        from analysis.bur_variation_analysis import phrase_variation_stats_batch
+        run = lambda: phrase_variation_stats_batch(values, offsets)
+    elif stage == 'variation_scalar':
+        from analysis.bur_variation_analysis import phrase_variation_stats
+        run = lambda: [phrase_variation_stats(phrase) for phrase in iter_phrase_values(phrases)]
+    elif stage == 'histograms':
+        from visualization.bur_histograms import create_performer_bur_histograms
+        run = lambda: create_performer_bur_histograms(scratch_dir, phrases=phrases, force=True, store_dir=None)
+    else:
+        raise ValueError(f"Unknown stage {stage!r}; choose from {STAGES}")
+
+    _import_dependencies()
+    baseline_rss_mb = _peak_rss_mb()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    peak_rss_mb = _peak_rss_mb()
+
+    if os.path.exists(scratch_csv):
+        os.remove(scratch_csv)
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    return {
+        'seconds': seconds,
+        'peak_rss_mb': peak_rss_mb,
+        'baseline_rss_mb': baseline_rss_mb
+    }
+
+
+def prepare_corpus(n_rows, work_dir=DEFAULT_WORK_DIR, seed=0):
+    """
+    Generate (or reuse) the raw and filtered synthetic CSVs for one size.
+
+    Returns:
+        Tuple of (corpus_dir, summary) where summary has the row and phrase
+        counts of the filtered corpus that the phrase stages run on
+    """
+    from utils.clean_data import clean_phrasebur_data
+    from utils.data_utils import load_phrasebur_phrases
+
+    corpus_dir = os.path.join(work_dir, f'rows-{n_rows}-seed-{seed}')
+    summary_path = os.path.join(corpus_dir, 'summary.json')
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            return corpus_dir, json.load(f)
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    raw = generate_phrasebur_csv(os.path.join(corpus_dir, 'raw.csv'), n_rows, seed=seed)
+    cleaned = clean_phrasebur_data(os.path.join(corpus_dir, 'raw.csv'), os.path.join(corpus_dir, 'filtered.csv'))
+
+    # Build the phrase cache now so phrase stages do not pay for it
+    load_phrasebur_phrases(os.path.join(corpus_dir, 'filtered.csv'))
+
+    summary = {
+        'raw_rows': raw['n_rows'],
+        'raw_phrases': raw['n_phrases'],
+        'filtered_rows': cleaned['cleaned_rows'],
+        'filtered_phrases': cleaned['cleaned_phrases']
+    }
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return corpus_dir, summary
+
+
+def benchmark_stage(stage, corpus_dir, repeat=1):
+    """
+    Run a stage in fresh subprocesses; keeps the fastest time and the largest peak.
+    """
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run_benchmarks', '--run-stage', stage, '--corpus', corpus_dir],
+            capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        'seconds': min(run['seconds'] for run in runs),
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'baseline_rss_mb': max(run['baseline_rss_mb'] for run in runs)
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=STAGES, repeat=1, seed=0, work_dir=DEFAULT_WORK_DIR,
+                   scalar_max_rows=DEFAULT_SCALAR_MAX_ROWS):
+    """
+    Benchmark every stage at every corpus size.
+
+    Args:
+        sizes: Raw corpus sizes in rows (default: 10k, 1M, 10M)
+        stages: Stage names from STAGES (default: all)
+        repeat: Runs per stage; the fastest is kept (default: 1)
+        seed: Synthetic corpus seed (default: 0)
+        work_dir: Where generated corpora are kept between runs
+        scalar_max_rows: Skip per-phrase loop stages above this size
+
+    Returns:
+        Dictionary with 'environment' and a list of per-stage 'results'
+    """
+    results = []
+    for n_rows in sizes:
+        print(f"Preparing {n_rows:,}-row corpus...", file=sys.stderr)
+        corpus_dir, summary = prepare_corpus(n_rows, work_dir, seed)
+
+        for stage in stages:
+            if stage.endswith('_scalar') and n_rows > scalar_max_rows:
+                continue
+            # Cleaning reads the raw CSV; everything else the filtered phrases
+            if stage.startswith('clean'):
+                rows, phrases = summary['raw_rows'], summary['raw_phrases']
+            else:
+                rows, phrases = summary['filtered_rows'], summary['filtered_phrases']
+
+            print(f"  {stage}...", file=sys.stderr)
+            measured = benchmark_stage(stage, corpus_dir, repeat)
+            results.append({
+                'corpus_rows': n_rows,
+                'stage': stage,
+                'rows': rows,
+                'phrases': phrases,
+                **measured,
+                'rows_per_second': rows / measured['seconds'] if measured['seconds'] > 0 else None,
+                'phrases_per_second': phrases / measured['seconds'] if measured['seconds'] > 0 else None
+            })
+
+    return {
+        'environment': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare_results(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Stages that got slower or larger than a baseline benchmark file allows.
+
+    Args:
+        current: Output of run_benchmarks
+        baseline: Earlier output of run_benchmarks (e.g. loaded from JSON)
+        tolerance: Allowed relative increase (default: 0.25 = 25%)
+
+    Returns:
+        List of dictionaries (corpus_rows, stage, metric, baseline, current)
+    """
+    previous = {(row['corpus_rows'], row['stage']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = previous.get((row['corpus_rows'], row['stage']))
+        if old is None:
+            continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            if row[metric] > old[metric] * (1 + tolerance):
+                regressions.append({
+                    'corpus_rows': row['corpus_rows'],
+                    'stage': row['stage'],
+                    'metric': metric,
+                    'baseline': old[metric],
+                    'current': row[metric]
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PhraseBur pipeline stages on synthetic corpora')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Corpus sizes in rows (default: 10000 1000000 10000000)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='Stages to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per stage, fastest kept (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Synthetic corpus seed (default: 0)')
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR,
+                        help=f'Generated corpora are kept here (default: {DEFAULT_WORK_DIR})')
+    parser.add_argument('--scalar-max-rows', type=int, default=DEFAULT_SCALAR_MAX_ROWS,
+                        help=f'Skip per-phrase loop stages above this size (default: {DEFAULT_SCALAR_MAX_ROWS})')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline JSON; exit with status 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed relative increase for --compare (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--run-stage', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--corpus', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child process: run a single stage and report it on stdout
+    if args.run_stage:
+        print(json.dumps(_run_stage(args.run_stage, args.corpus)))
+        return
+
+    report = run_benchmarks(args.sizes, args.stages, args.repeat, args.seed, args.work_dir, args.scalar_max_rows)
+
+    print(f"{'rows':>12} {'stage':<17} {'seconds':>9} {'rows/s':>12} {'peak MiB':>9}")
+    for row in report['results']:
+        print(f"{row['corpus_rows']:>12,} {row['stage']:<17} {row['seconds']:>9.3f} "
+              f"{row['rows_per_second'] or 0:>12,.0f} {row['peak_rss_mb']:>9.1f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['stage']} at {regression['corpus_rows']:,} rows: "
+                  f"{regression['metric']} {regression['baseline']:.3f} -> {regression['current']:.3f}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
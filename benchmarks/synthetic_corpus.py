@@ -0,0 +1,182 @@
+"""
+Synthetic PhraseBur corpus generator.
+
+Writes semicolon-delimited CSVs with the same schema as the MeloSpyGUI
+export (id;seg_type;seg_id;swing_ratios), so every stage of the pipeline
+can be run on corpora far larger than data/phrasebur_raw.csv.
+
+Defaults mimic the raw export: about 80 performers, geometric phrase
+lengths with a mean near 4.9 values (23.8% of raw phrases have n = 1) and
+BUR values centred around 1.4. A configurable share of phrases gets a
+linear BUR surge. Output depends only on the arguments and the seed.
+
+Usage:
+    python -m benchmarks.synthetic_corpus data/synthetic_1m.csv --rows 1000000 --seed 1
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Phrase length distributions understood by phrase_lengths()
+LENGTH_DISTRIBUTIONS = ('geometric', 'poisson', 'fixed')
+
+# BUR level and spread, fitted loosely to data/phrasebur_raw.csv
+BUR_PHRASE_MEAN = 1.41
+BUR_PHRASE_STD = 0.35
+BUR_NOISE_STD = 0.45
+BUR_MIN = 0.2
+BUR_MAX = 6.0
+
+# Rows written per CSV chunk
+WRITE_CHUNK_ROWS = 1_000_000
+
+
+def phrase_lengths(n_rows, distribution='geometric', mean_length=4.9, rng=None):
+    """
+    Draw phrase lengths until they cover exactly n_rows BUR values.
+
+    Args:
+        n_rows: Total number of BUR values
+        distribution: 'geometric', 'poisson' (1 + Poisson) or 'fixed'
+        mean_length: Mean phrase length (default: 4.9, as in the raw export)
+        rng: numpy Generator (default: np.random.default_rng(0))
+
+    Returns:
+        int64 array of phrase lengths summing to n_rows (the last phrase is
+        truncated to fit)
+    """
+    if distribution not in LENGTH_DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {LENGTH_DISTRIBUTIONS}, got {distribution!r}")
+    rng = rng or np.random.default_rng(0)
+
+    batch = max(16, int(n_rows / mean_length * 1.1))
+    parts = []
+    total = 0
+    while total < n_rows:
+        if distribution == 'geometric':
+            lengths = rng.geometric(1 / mean_length, size=batch)
+        elif distribution == 'poisson':
+            lengths = 1 + rng.poisson(mean_length - 1, size=batch)
+        else:
+            lengths = np.full(batch, max(1, int(round(mean_length))))
+        parts.append(lengths.astype(np.int64))
+        total += int(lengths.sum())
+
+    lengths = np.concatenate(parts)
+    ends = np.cumsum(lengths)
+    n_phrases = int(np.searchsorted(ends, n_rows)) + 1
+    lengths = lengths[:n_phrases]
+    lengths[-1] -= ends[n_phrases - 1] - n_rows
+    return lengths
+
+
+def generate_phrasebur_csv(output_csv, n_rows, n_performers=80, solos_per_performer=6,
+                           length_distribution='geometric', mean_length=4.9,
+                           surge_prevalence=0.05, surge_slope=0.05, seed=0):
+    """
+    Write a synthetic PhraseBur CSV.
+
+    Args:
+        output_csv: Path of the CSV to write
+        n_rows: Number of BUR values (rows)
+        n_performers: Number of performers (default: 80)
+        solos_per_performer: Solos per performer (default: 6)
+        length_distribution: Phrase length distribution, see phrase_lengths()
+        mean_length: Mean phrase length (default: 4.9)
+        surge_prevalence: Share of phrases with a BUR trend (default: 0.05)
+        surge_slope: BUR change per position in those phrases; the sign is
+                     drawn per phrase (default: 0.05)
+        seed: Random seed; same arguments and seed = same file
+
+    Returns:
+        Dictionary with n_rows, n_phrases, n_solos and n_surge_phrases
+
+    Note:
+        - Ids look like 'SynthPlayer007_Solo0003_FINAL.sv', so the artist
+          helpers see one performer per prefix
+        - Phrases are spread evenly over solos and written solo by solo with
+          increasing seg_id, like the MeloSpyGUI export
+    """
+    rng = np.random.default_rng(seed)
+    lengths = phrase_lengths(n_rows, length_distribution, mean_length, rng)
+    n_phrases = len(lengths)
+    n_solos = n_performers * solos_per_performer
+
+    # Contiguous runs of phrases per solo, seg_id counting from 1 within each solo
+    phrase_solo = np.arange(n_phrases) * n_solos // max(n_phrases, 1)
+    solo_start = np.searchsorted(phrase_solo, np.arange(n_solos))
+    phrase_seg_id = np.arange(n_phrases) - solo_start[phrase_solo] + 1
+    solo_ids = np.array([
+        f"SynthPlayer{solo // solos_per_performer:03d}_Solo{solo % solos_per_performer:04d}_FINAL.sv"
+        for solo in range(n_solos)
+    ])
+
+    phrase_level = rng.normal(BUR_PHRASE_MEAN, BUR_PHRASE_STD, size=n_phrases)
+    is_surge = rng.random(n_phrases) < surge_prevalence
+    phrase_slope = np.where(is_surge, surge_slope * rng.choice([-1.0, 1.0], size=n_phrases), 0.0)
+
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    with open(output_csv, 'w', newline='') as f:
+        f.write('id;seg_type;seg_id;swing_ratios\n')
+        first = 0
+        while first < n_phrases:
+            # Whole phrases per chunk, about WRITE_CHUNK_ROWS rows each
+            last = int(np.searchsorted(offsets, offsets[first] + WRITE_CHUNK_ROWS, side='right')) - 1
+            last = min(max(last, first + 1), n_phrases)
+            chunk_lengths = lengths[first:last]
+            phrase = np.repeat(np.arange(first, last), chunk_lengths)
+            position = np.arange(len(phrase)) - np.repeat(offsets[first:last] - offsets[first], chunk_lengths)
+
+            bur = phrase_level[phrase] + phrase_slope[phrase] * position
+            bur = np.clip(bur + rng.normal(0, BUR_NOISE_STD, size=len(phrase)), BUR_MIN, BUR_MAX)
+            pd.DataFrame({
+                'id': solo_ids[phrase_solo[phrase]],
+                'seg_type': 'phrases',
+                'seg_id': phrase_seg_id[phrase],
+                'swing_ratios': bur
+            }).to_csv(f, sep=';', index=False, header=False)
+            first = last
+
+    return {
+        'n_rows': int(n_rows),
+        'n_phrases': int(n_phrases),
+        'n_solos': int(n_solos),
+        'n_surge_phrases': int(is_surge.sum())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic PhraseBur CSV')
+    parser.add_argument('output_csv', help='CSV file to write')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of BUR values (default: 1,000,000)')
+    parser.add_argument('--performers', type=int, default=80, help='Number of performers (default: 80)')
+    parser.add_argument('--solos', type=int, default=6, help='Solos per performer (default: 6)')
+    parser.add_argument('--lengths', choices=LENGTH_DISTRIBUTIONS, default='geometric',
+                        help='Phrase length distribution (default: geometric)')
+    parser.add_argument('--mean-length', type=float, default=4.9, help='Mean phrase length (default: 4.9)')
+    parser.add_argument('--surge-prevalence', type=float, default=0.05,
+                        help='Share of phrases with a BUR trend (default: 0.05)')
+    parser.add_argument('--surge-slope', type=float, default=0.05,
+                        help='BUR change per position in trending phrases (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    summary = generate_phrasebur_csv(
+        args.output_csv,
+        args.rows,
+        n_performers=args.performers,
+        solos_per_performer=args.solos,
+        length_distribution=args.lengths,
+        mean_length=args.mean_length,
+        surge_prevalence=args.surge_prevalence,
+        surge_slope=args.surge_slope,
+        seed=args.seed
+    )
+    print(f"Wrote {summary['n_rows']:,} rows in {summary['n_phrases']:,} phrases "
+          f"({summary['n_surge_phrases']:,} with a surge) to {args.output_csv}")
+
+
+if __name__ == '__main__':
+    main()
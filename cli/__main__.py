@@ -0,0 +1,5 @@
+"""Entry point for ``python -m cli`` (see cli/pipeline.py)."""
+
+from cli.pipeline import main
+
+main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+BUR Artist Trend CLI
+
+Estimates each performer's BUR trend from all of their phrases at once,
+instead of counting phrases whose individual trend test passes FDR.
+
+Statistical Approach:
+- Pooled slope: one common within-phrase slope per performer (phrase-specific intercepts)
+- Random slope: performer mean slope with between-phrase slope variance τ²
+  (DerSimonian-Laird), phrase slopes weighted by 1 / (sampling variance + τ²)
+- Benjamini-Hochberg FDR correction of the random-slope p-values across performers
+- Both models are built from per-phrase sufficient statistics, so refits
+  with another --min-length only repeat per-artist sums
+
+Usage:
+    python -m cli.bur_artist_trend_cli --top 20 --min-length 8
+"""
+
+import argparse
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_store import cached_phrase_results, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_artist_trends import phrase_sufficient_stats, grouped_trend_estimates, SUFFICIENT_STATS_PARAMS
+from analysis.bur_surge_analysis import fdr_correction
+from utils.config import DEFAULT_TOP_N, FDR_ALPHA, MIN_BUR_VALUES, CONFIDENCE_LEVEL
+
+
+def run_artist_trends(phrases, min_length=MIN_BUR_VALUES, n_top=DEFAULT_TOP_N, output_dir="outputs",
+                      store_dir=DEFAULT_STORE_DIR, output_format='csv'):
+    """
+    Fit pooled and random-slope trends per performer and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        min_length: Only phrases with at least this many BUR values (never below MIN_BUR_VALUES)
+        n_top: Performers to display, steepest random-slope increase first (default from config: 20)
+        output_dir: Directory for bur_artist_trends.csv (default: outputs)
+        store_dir: Per-phrase results store (default: <output_dir>/.phrase_results;
+                   None = recompute every phrase)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        DataFrame with one row per performer, as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    store_dir = resolve_store_dir(store_dir, output_dir)
+    if store_dir is None:
+        stats = phrase_sufficient_stats(phrases['values'], phrases['offsets'])
+    else:
+        stats, n_computed = cached_phrase_results(
+            'sufficient_stats', phrase_sufficient_stats, phrases['values'], phrases['offsets'],
+            SUFFICIENT_STATS_PARAMS, store_dir
+        )
+        print(f"Computed {n_computed} new or changed phrases (others reused from {store_dir})")
+
+    estimates = grouped_trend_estimates(
+        stats, phrase_artist_codes(phrases), len(phrases['artists']),
+        min_values=max(min_length, MIN_BUR_VALUES)
+    )
+    present = np.flatnonzero(estimates['n_phrases'] > 0)
+    results = pd.DataFrame({'artist': phrases['artists'][present],
+                            **{key: column[present] for key, column in estimates.items()}})
+
+    testable = results['p_value'].notna().to_numpy()
+    results['p_value_corrected'] = np.nan
+    results['significant_fdr'] = False
+    if testable.any():
+        reject, p_corrected = fdr_correction(results.loc[testable, 'p_value'].to_numpy(), alpha=FDR_ALPHA)
+        results.loc[testable, 'p_value_corrected'] = p_corrected
+        results.loc[testable, 'significant_fdr'] = reject
+    results = results.sort_values(['slope', 'n_phrases'], ascending=[False, False], kind='stable',
+                                  ignore_index=True)
+
+    significant = results['significant_fdr']
+    print(f"\nPer-performer BUR trends from {int(results['n_phrases'].sum())} phrases "
+          f"(n >= {max(min_length, MIN_BUR_VALUES)}), {len(results)} performers")
+    print("=" * 60)
+    print(f"Significant increase (FDR α = {FDR_ALPHA}): {int((significant & (results['slope'] > 0)).sum())}")
+    print(f"Significant decrease (FDR α = {FDR_ALPHA}): {int((significant & (results['slope'] < 0)).sum())}")
+    print()
+    print("=" * 60)
+    print(f"Top {n_top} performers (steepest mean BUR increase first):")
+    print("=" * 60)
+    ci_label = f"{100 * CONFIDENCE_LEVEL:.0f}% CI"
+    for row in results.head(n_top).itertuples():
+        marker = ' *' if row.significant_fdr else ''
+        tau = 'n/a' if np.isnan(row.tau2) else f"{np.sqrt(row.tau2):.4f}"
+        print(f"{row.artist}: slope = {row.slope:+.4f} [{ci_label} {row.ci_lower:+.4f} to {row.ci_upper:+.4f}], "
+              f"τ = {tau}, pooled = {row.pooled_slope:+.4f} ({row.n_phrases} phrases){marker}")
+
+    output_file = write_results(results, output_dir, 'bur_artist_trends', output_format)
+    print()
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print()
+    print("Statistical Notes:")
+    print("- slope/std_err/p_value: Random-slope mean slope (BUR per position), z-test")
+    print("- tau2: Between-phrase variance of the slope (DerSimonian-Laird); i2: its share of the spread")
+    print("- pooled_*: Common within-phrase slope, t-test; ignores between-phrase variation")
+    print("- * = significant after FDR correction across performers")
+    print("=" * 60)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estimate pooled and random-slope BUR trends per performer')
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--min-length', type=int, default=MIN_BUR_VALUES,
+                        help=f'Only phrases with at least this many BUR values (default: {MIN_BUR_VALUES})')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                        help=f'Performers to display (default: {DEFAULT_TOP_N})')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    run_artist_trends(
+        load_phrasebur_phrases(args.input),
+        min_length=args.min_length,
+        n_top=args.top,
+        output_format=args.format
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+BUR Changepoint CLI
+
+Locates where in each phrase the BUR trend changes, rather than fitting one
+slope to the whole phrase.
+
+Statistical Approach:
+- Best single break per phrase: two segments, each with its own line
+  (--model linear) or level (--model mean), chosen by least squares
+- Likelihood-ratio statistic of the split against the unsplit phrase
+- Multiple breaks per phrase by penalized segmentation (BIC penalty by default)
+
+Usage:
+    python -m cli.bur_changepoint_cli --model linear
+    python -m cli.bur_changepoint_cli --model mean --penalty 10
+"""
+
+import argparse
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_changepoints import single_changepoint_batch, multiple_changepoints_batch, CHANGEPOINT_MODELS
+from utils.config import CHANGEPOINT_MIN_SEGMENT
+
+
+def run_changepoints(phrases, model='linear', penalty=None, output_dir="outputs", output_format='csv'):
+    """
+    Find single and multiple BUR changepoints per phrase and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        model: 'linear' (a line per segment, default) or 'mean' (a level per segment)
+        penalty: Cost per added segment for multiple breaks (default: BIC)
+        output_dir: Directory for bur_changepoints.csv (default: outputs)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        DataFrame with one row per phrase of at least 2 * CHANGEPOINT_MIN_SEGMENT
+        values, as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    n_values = np.diff(phrases['offsets'])
+    single = single_changepoint_batch(phrases['values'], phrases['offsets'], model=model)
+    multiple = multiple_changepoints_batch(phrases['values'], phrases['offsets'], model=model, penalty=penalty)
+    keep = single['break_position'] >= 0
+    artist_code = phrase_artist_codes(phrases)[keep]
+    breaks = np.split(multiple['breaks'], multiple['break_offsets'][1:-1])
+
+    results = pd.DataFrame({
+        'id': phrases['solo_ids'][phrases['solo_code'][keep]],
+        'seg_id': phrases['seg_id'][keep],
+        'artist': phrases['artists'][artist_code],
+        'n_values': n_values[keep],
+        **{key: column[keep] for key, column in single.items()},
+        'relative_break': single['break_position'][keep] / n_values[keep],
+        'n_breaks': multiple['n_breaks'][keep],
+        'breaks': [' '.join(map(str, phrase_breaks)) for phrase_breaks, kept in zip(breaks, keep) if kept]
+    })
+
+    total = len(results)
+    print(f"\nBUR changepoints ({model} segments, at least {CHANGEPOINT_MIN_SEGMENT} values each)")
+    print("=" * 60)
+    print(f"Phrases with n >= {2 * CHANGEPOINT_MIN_SEGMENT}: {total}")
+    print()
+    print("=" * 60)
+    print("SINGLE BREAK")
+    print("=" * 60)
+    if total:
+        steeper = int((results['post_slope'] > results['pre_slope']).sum())
+        higher = int((results['post_mean'] > results['pre_mean']).sum())
+        print(f"Break position: median {100 * results['relative_break'].median():.0f}% of the phrase "
+              f"(quartiles {100 * results['relative_break'].quantile(0.25):.0f}%-"
+              f"{100 * results['relative_break'].quantile(0.75):.0f}%)")
+        print(f"Steeper slope after the break: {steeper} ({100 * steeper / total:.1f}%)")
+        print(f"Higher mean BUR after the break: {higher} ({100 * higher / total:.1f}%)")
+        print(f"Likelihood-ratio statistic: median {results['lr_statistic'].median():.2f}")
+    print()
+
+    print("=" * 60)
+    print(f"MULTIPLE BREAKS (penalty: {'BIC' if penalty is None else penalty})")
+    print("=" * 60)
+    counts = results['n_breaks'].value_counts().sort_index()
+    for n_breaks, count in counts.items():
+        print(f"{n_breaks} break{'s' if n_breaks != 1 else ''}: {count} ({100 * count / max(total, 1):.1f}%)")
+    print()
+
+    output_file = write_results(results, output_dir, 'bur_changepoints', output_format)
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print()
+    print("Statistical Notes:")
+    print("- break_position: First BUR value after the single best break (0-based)")
+    print("- lr_statistic: n * ln(RSS unsplit / RSS split); the break is searched,")
+    print("  so it is not chi-squared distributed")
+    print("- breaks: Positions from the penalized multi-break segmentation")
+    print("=" * 60)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Locate BUR changepoints within phrases')
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--model', choices=CHANGEPOINT_MODELS, default='linear',
+                        help='Segment model: a line or a constant level per segment (default: linear)')
+    parser.add_argument('--penalty', type=float, default=None,
+                        help='Cost per added segment for multiple breaks (default: BIC)')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    run_changepoints(
+        load_phrasebur_phrases(args.input),
+        model=args.model,
+        penalty=args.penalty,
+        output_format=args.format
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -15,21 +15,49 @@ Output:
 Note:
     This is visualization only - no statistical analysis or significance testing.
     Histograms use 0.1 bin width and auto-adjust range to fit the data.
+    PNGs whose underlying data is unchanged since the last run are not redrawn.
 """
 
+import os
+
+from utils.results_store import resolve_store_dir, DEFAULT_STORE_DIR
 from visualization.bur_histograms import create_performer_bur_histograms
 
 
-def main():
+def run_histograms(phrases=None, output_dir="outputs", force=False, store_dir=DEFAULT_STORE_DIR, n_workers=None):
+    """
+    Render one BUR histogram per performer into output_dir/bur_histograms.
+
+    Args:
+        phrases: Pre-loaded grouped phrases (default: load from the filtered CSV)
+        output_dir: Parent directory for the bur_histograms folder (default: outputs)
+        force: Redraw PNGs even if their data is unchanged
+        store_dir: Per-phrase results store (default: <output_dir>/.phrase_results;
+                   None = re-bin every phrase)
+        n_workers: Rendering processes (default: os.cpu_count(); 1 = render inline)
+
+    Returns:
+        str: Path to the histogram directory
+    """
+    store_dir = resolve_store_dir(store_dir, output_dir)
     print("\nGenerating BUR histograms for each performer...")
     print("=" * 60)
     
-    output_dir = create_performer_bur_histograms()
+    output_dir = create_performer_bur_histograms(
+        os.path.join(output_dir, "bur_histograms"), phrases=phrases, n_workers=n_workers, force=force,
+        store_dir=store_dir
+    )
     
     print(f"\n✓ Histograms saved to {output_dir}/")
     print("  (one PNG file per performer)")
     print("=" * 60)
 
+    return output_dir
+
+
+def main():
+    run_histograms()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+BUR Null Model CLI
+
+Compares the observed rate of significant BUR increases against randomized
+null models in which BUR order is shuffled within each phrase.
+
+Statistical Approach:
+- Shuffle BUR values within every phrase, n_permutations times
+- Rerun the linear trend test (and FDR correction) on each shuffle
+- Empirical p-value = share of shuffles at least as extreme as the data
+
+Usage:
+    python -m cli.bur_null_model_cli --permutations 10000 --seed 1 --workers 8
+"""
+
+import argparse
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_io import write_results
+from analysis.bur_null_models import surge_null_distribution, DEFAULT_PERMUTATIONS
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES, DEFAULT_TOP_N
+
+
+def run_null_models(phrases, n_permutations=DEFAULT_PERMUTATIONS, seed=0, n_workers=None,
+                    uncorrected=False, n_top=DEFAULT_TOP_N, output_dir="outputs"):
+    """
+    Run the within-phrase shuffle null models on grouped phrases and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        n_permutations: Number of shuffles (default: 1000)
+        seed: Random seed (default: 0)
+        n_workers: Worker processes (default: all cores)
+        uncorrected: Count raw p < alpha instead of FDR-significant phrases
+        n_top: Performers to display (default from config: 20)
+        output_dir: Directory for bur_null_model_artists.csv (default: outputs)
+
+    Returns:
+        DataFrame of per-artist null model results as written to the CSV
+    """
+    import pandas as pd
+
+    artist_code = phrase_artist_codes(phrases)
+
+    criterion = f"raw p < {FDR_ALPHA}" if uncorrected else f"FDR α = {FDR_ALPHA}"
+    print(f"\nShuffling BUR order within phrases ({n_permutations:,} permutations, seed {seed})...")
+    print("=" * 60)
+
+    null = surge_null_distribution(
+        phrases['values'],
+        phrases['offsets'],
+        artist_code,
+        n_permutations=n_permutations,
+        seed=seed,
+        n_workers=n_workers,
+        correction=None if uncorrected else 'fdr_bh'
+    )
+
+    null_rates = null['null_rates']
+    print(f"Phrases tested (n >= {MIN_BUR_VALUES}): {null['n_phrases']}")
+    print(f"Shuffles per block: {null['block_size']} (fixed by the corpus size, not the worker count)")
+    print(f"Significance criterion: {criterion}")
+    print()
+    print("=" * 60)
+    print("OVERALL RESULTS")
+    print("=" * 60)
+    print(f"Observed significant increase rate: {100 * null['observed_rate']:.2f}%")
+    print(f"Null mean rate:                     {100 * null_rates.mean():.2f}%")
+    print(f"Null 95th percentile:               {100 * pd.Series(null_rates).quantile(0.95):.2f}%")
+    print(f"Empirical p-value:                  {null['p_value']:.4f}")
+    print()
+
+    artist_df = pd.DataFrame({
+        'artist': phrases['artists'],
+        'n_phrases': null['artist_phrases'],
+        'observed_rate': null['observed_artist_rates'],
+        'null_mean_rate': null['null_artist_rates'].mean(axis=0),
+        'null_p95_rate': pd.DataFrame(null['null_artist_rates']).quantile(0.95).to_numpy(),
+        'p_value': null['artist_p_values']
+    })
+    artist_df = artist_df[artist_df['n_phrases'] > 0].sort_values('n_phrases', ascending=False)
+
+    print("=" * 60)
+    print(f"Top {n_top} performers (by phrase count):")
+    print("=" * 60)
+    for row in artist_df.head(n_top).itertuples():
+        print(f"{row.artist}:")
+        print(f"  Phrases: {row.n_phrases}")
+        print(f"  Observed increase: {100 * row.observed_rate:.1f}% (null mean {100 * row.null_mean_rate:.1f}%)")
+        print(f"  Empirical p-value: {row.p_value:.4f}")
+        print()
+
+    output_file = write_results(artist_df, output_dir, 'bur_null_model_artists')
+    print("=" * 60)
+    print(f"Per-artist null model results saved to: {output_file}")
+    print("=" * 60)
+
+    return artist_df
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare surge rates against within-phrase shuffle null models'
+    )
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--permutations', '-p', type=int, default=DEFAULT_PERMUTATIONS,
+                        help=f'Number of shuffles (default: {DEFAULT_PERMUTATIONS})')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                        help='Worker processes (default: all cores)')
+    parser.add_argument('--uncorrected', action='store_true',
+                        help=f'Count raw p < {FDR_ALPHA} instead of FDR-significant phrases')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                        help=f'Performers to display (default: {DEFAULT_TOP_N})')
+    args = parser.parse_args()
+
+    run_null_models(
+        load_phrasebur_phrases(args.input),
+        n_permutations=args.permutations,
+        seed=args.seed,
+        n_workers=args.workers,
+        uncorrected=args.uncorrected,
+        n_top=args.top
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+BUR Rank Trend CLI
+
+Outlier-resistant version of the surge analysis: detects within-phrase BUR
+trends with rank-based tests instead of the OLS slope test.
+
+Statistical Approach:
+- Theil-Sen slope (median of pairwise slopes) with its Kendall-based CI
+- Mann-Kendall test (default) or Spearman rank correlation for each phrase
+- Benjamini-Hochberg FDR correction of the chosen test's p-values
+- Agreement with the OLS surge test on the same phrases
+
+Usage:
+    python -m cli.bur_rank_trend_cli --test mann-kendall --top 20
+"""
+
+import argparse
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_store import cached_phrase_results, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_rank_trends import rank_trend_batch, RANK_TREND_PARAMS
+from analysis.bur_surge_analysis import linear_trend_analysis_batch, fdr_correction
+from utils.config import DEFAULT_TOP_N, FDR_ALPHA, MIN_BUR_VALUES
+
+# Rank test -> (p-value column, statistic whose sign gives the direction)
+RANK_TESTS = {
+    'mann-kendall': ('mk_p_value', 'mk_s'),
+    'spearman': ('spearman_p_value', 'spearman_rho')
+}
+
+
+def run_rank_trends(phrases, test='mann-kendall', n_top=DEFAULT_TOP_N, output_dir="outputs",
+                    store_dir=DEFAULT_STORE_DIR, output_format='csv'):
+    """
+    Run the rank-based trend analysis and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        test: 'mann-kendall' (default) or 'spearman'; its p-values are FDR-corrected
+        n_top: Performers to display (default from config: 20)
+        output_dir: Directory for bur_rank_trends.csv (default: outputs)
+        store_dir: Per-phrase results store (default: <output_dir>/.phrase_results;
+                   None = recompute every phrase)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        DataFrame of per-phrase results as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    store_dir = resolve_store_dir(store_dir, output_dir)
+    if test not in RANK_TESTS:
+        raise ValueError(f"test must be one of {tuple(RANK_TESTS)}, got {test!r}")
+    p_value_column, statistic_column = RANK_TESTS[test]
+
+    print("\nAnalyzing rank-based BUR trends across phrases...")
+    print("=" * 60)
+    if store_dir is None:
+        ranks = rank_trend_batch(phrases['values'], phrases['offsets'])
+    else:
+        ranks, n_computed = cached_phrase_results(
+            'rank_trend', rank_trend_batch, phrases['values'], phrases['offsets'], RANK_TREND_PARAMS, store_dir
+        )
+        print(f"Computed {n_computed} new or changed phrases (others reused from {store_dir})")
+    ols = linear_trend_analysis_batch(phrases['values'], phrases['offsets'])
+    keep = ranks['n_values'] >= MIN_BUR_VALUES
+    artist_code = phrase_artist_codes(phrases)[keep]
+
+    results = pd.DataFrame({
+        'id': phrases['solo_ids'][phrases['solo_code'][keep]],
+        'seg_id': phrases['seg_id'][keep],
+        'artist': phrases['artists'][artist_code],
+        **{key: column[keep] for key, column in ranks.items()},
+        'ols_slope': ols['slope'][keep],
+        'ols_p_value': ols['p_value'][keep]
+    })
+
+    total = len(results)
+    reject, p_corrected = fdr_correction(results[p_value_column].to_numpy(), alpha=FDR_ALPHA)
+    results['p_value_corrected'] = p_corrected
+    results['significant_fdr'] = np.asarray(reject, dtype=bool)
+    ols_reject, _ = fdr_correction(results['ols_p_value'].to_numpy(), alpha=FDR_ALPHA)
+    ols_reject = np.asarray(ols_reject, dtype=bool)
+
+    significant = results['significant_fdr'].to_numpy()
+    statistic = results[statistic_column].to_numpy()
+    increase = significant & (statistic > 0)
+    decrease = significant & (statistic < 0)
+    print(f"Analyzed {total} phrases with n >= {MIN_BUR_VALUES} BUR values")
+    print(f"FDR correction of {test} p-values (α = {FDR_ALPHA})")
+    print()
+    print("=" * 60)
+    print("OVERALL RESULTS")
+    print("=" * 60)
+    print(f"Significant increase: {int(increase.sum())} / {total} ({100 * increase.sum() / max(total, 1):.1f}%)")
+    print(f"Significant decrease: {int(decrease.sum())} / {total} ({100 * decrease.sum() / max(total, 1):.1f}%)")
+    print(f"Also significant under the OLS test: {int((significant & ols_reject).sum())}; "
+          f"OLS only: {int((ols_reject & ~significant).sum())}")
+    theil_up = int((results['theil_ci_lower'] > 0).sum())
+    theil_down = int((results['theil_ci_upper'] < 0).sum())
+    print(f"Theil-Sen slope CI excludes zero (uncorrected): {theil_up} increase, {theil_down} decrease")
+    print(f"Median Theil-Sen slope: {results['theil_slope'].median():+.4f} "
+          f"(median OLS slope {results['ols_slope'].median():+.4f})")
+    print()
+
+    # Per-artist increase rates with one bincount over the artist codes
+    n_artists = len(phrases['artists'])
+    counts = np.bincount(artist_code, minlength=n_artists)
+    n_increase = np.bincount(artist_code, weights=increase, minlength=n_artists)
+    n_decrease = np.bincount(artist_code, weights=decrease, minlength=n_artists)
+    present = np.flatnonzero(counts)
+    order = present[np.lexsort((-counts[present], -n_increase[present] / counts[present]))]
+    print("=" * 60)
+    print(f"Top {n_top} performers (by significant increase rate):")
+    print("=" * 60)
+    for code in order[:n_top]:
+        print(f"{phrases['artists'][code]}: {100 * n_increase[code] / counts[code]:.1f}% increase, "
+              f"{100 * n_decrease[code] / counts[code]:.1f}% decrease ({counts[code]} phrases)")
+
+    output_file = write_results(results, output_dir, 'bur_rank_trends', output_format)
+    print()
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print()
+    print("Statistical Notes:")
+    print("- theil_slope: Median pairwise slope (robust to outlying BUR values)")
+    print("- mk_p_value: Mann-Kendall test (normal approximation, tie-corrected)")
+    print("- spearman_p_value: Spearman rank correlation, t-test on n-2 d.f.")
+    print(f"- significant_fdr: True if FDR-corrected {test} p < {FDR_ALPHA}")
+    print("=" * 60)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect BUR trends with rank-based tests')
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--test', choices=tuple(RANK_TESTS), default='mann-kendall',
+                        help='Rank test whose p-values are FDR-corrected (default: mann-kendall)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                        help=f'Performers to display (default: {DEFAULT_TOP_N})')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    run_rank_trends(
+        load_phrasebur_phrases(args.input),
+        test=args.test,
+        n_top=args.top,
+        output_format=args.format
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+BUR Sensitivity Sweep CLI
+
+Shows how the surge headline numbers change with the thresholds in
+utils/config.py, without re-cleaning the data or rerunning the surge
+analysis once per setting.
+
+Approach:
+- Fit every phrase of the raw (unfiltered) corpus once
+- For each minimum phrase length, alpha and confidence level on the grid,
+  select phrases, rerun Benjamini-Hochberg and recount
+- Write one row per grid point
+
+Usage:
+    python -m cli.bur_sensitivity_cli --min-lengths 4 6 8 10 --alphas 0.01 0.05 0.1
+"""
+
+import argparse
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_surge_analysis import linear_trend_analysis_batch, hac_trend_analysis_batch
+from analysis.bur_sensitivity import sensitivity_sweep, MIN_SWEEP_LENGTH
+from utils.config import MIN_BUR_VALUES, FDR_ALPHA, CONFIDENCE_LEVEL
+
+# Default grid: 7 x 3 x 3 = 63 settings around the configured values
+DEFAULT_MIN_LENGTHS = (4, 5, 6, 7, 8, 10, 12)
+DEFAULT_ALPHAS = (0.01, 0.05, 0.10)
+DEFAULT_CONFIDENCE_LEVELS = (0.90, 0.95, 0.99)
+
+
+def run_sensitivity_sweep(phrases, min_lengths=DEFAULT_MIN_LENGTHS, alphas=DEFAULT_ALPHAS,
+                          confidence_levels=DEFAULT_CONFIDENCE_LEVELS, robust=False, output_dir="outputs",
+                          output_format='csv'):
+    """
+    Sweep the surge thresholds and print the report.
+
+    Args:
+        phrases: Grouped phrase dict of the unfiltered corpus (see
+                 utils.data_utils.load_phrasebur_phrases)
+        min_lengths: Minimum phrase lengths to try (default: 4-12)
+        alphas: FDR levels to try (default: 0.01, 0.05, 0.10)
+        confidence_levels: Slope CI levels to try (default: 0.90, 0.95, 0.99)
+        robust: Use the Newey-West (HAC) p-values and standard errors
+        output_dir: Directory for bur_sensitivity.csv (default: outputs)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        DataFrame with one row per grid point, as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    min_lengths = sorted(set(min_lengths))
+    alphas = sorted(set(alphas))
+    confidence_levels = sorted(set(confidence_levels))
+    fit_from = min(min_lengths)
+
+    print(f"\nFitting {len(phrases['offsets']) - 1} phrases once (n >= {fit_from})...")
+    trends = linear_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=fit_from)
+    if robust:
+        trends.update(hac_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=fit_from))
+
+    results = pd.DataFrame(sensitivity_sweep(
+        trends, phrases['solo_code'], phrase_artist_codes(phrases),
+        min_lengths, alphas, confidence_levels, robust=robust
+    ))
+    print(f"Evaluated {len(results)} settings "
+          f"({len(min_lengths)} min lengths x {len(alphas)} alphas x {len(confidence_levels)} confidence levels)")
+    print("=" * 60)
+
+    # FDR counts do not depend on the confidence level, CI counts not on alpha
+    fdr = results.drop_duplicates(['min_length', 'alpha'])
+    print(f"FDR-significant phrases (increase/decrease){', Newey-West p-values' if robust else ''}:")
+    table = fdr.pivot(index='min_length', columns='alpha', values='n_significant')
+    increase = fdr.pivot(index='min_length', columns='alpha', values='n_increase')
+    decrease = fdr.pivot(index='min_length', columns='alpha', values='n_decrease')
+    phrase_counts = fdr.drop_duplicates('min_length').set_index('min_length')['n_phrases']
+    print(f"{'min_length':>10} {'phrases':>8}" + ''.join(f"{f'α = {alpha:g}':>16}" for alpha in alphas))
+    for min_length in min_lengths:
+        cells = ''.join(
+            f"{f'{table.at[min_length, alpha]} ({increase.at[min_length, alpha]}/{decrease.at[min_length, alpha]})':>16}"
+            for alpha in alphas
+        )
+        marker = '  <- config' if min_length == MIN_BUR_VALUES else ''
+        print(f"{min_length:>10} {phrase_counts[min_length]:>8}{cells}{marker}")
+    print()
+
+    ci = results.drop_duplicates(['min_length', 'confidence_level']).pivot(
+        index='min_length', columns='confidence_level', values='n_ci_excludes_zero'
+    )
+    print("Phrases whose slope CI excludes zero (uncorrected):")
+    print(f"{'min_length':>10}" + ''.join(f"{f'{100 * level:g}% CI':>12}" for level in confidence_levels))
+    for min_length in min_lengths:
+        print(f"{min_length:>10}" + ''.join(f"{ci.at[min_length, level]:>12}" for level in confidence_levels))
+    print()
+
+    output_file = write_results(results, output_dir, 'bur_sensitivity', output_format)
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print(f"(configured: MIN_BUR_VALUES = {MIN_BUR_VALUES}, FDR_ALPHA = {FDR_ALPHA}, "
+          f"CONFIDENCE_LEVEL = {CONFIDENCE_LEVEL})")
+    print("=" * 60)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep the surge thresholds over a grid of settings')
+    parser.add_argument('--input', '-i', default='data/phrasebur_raw.csv',
+                        help='Unfiltered PhraseBur CSV (default: data/phrasebur_raw.csv)')
+    parser.add_argument('--min-lengths', type=int, nargs='+', default=list(DEFAULT_MIN_LENGTHS),
+                        help=f'Minimum phrase lengths (each >= {MIN_SWEEP_LENGTH}; default: 4 5 6 7 8 10 12)')
+    parser.add_argument('--alphas', type=float, nargs='+', default=list(DEFAULT_ALPHAS),
+                        help='FDR levels (default: 0.01 0.05 0.1)')
+    parser.add_argument('--confidence-levels', type=float, nargs='+', default=list(DEFAULT_CONFIDENCE_LEVELS),
+                        help='Slope CI levels (default: 0.9 0.95 0.99)')
+    parser.add_argument('--hac', action='store_true',
+                        help='Use Newey-West (HAC) p-values and standard errors')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    if min(args.min_lengths) < MIN_SWEEP_LENGTH:
+        parser.error(f"--min-lengths must be at least {MIN_SWEEP_LENGTH}")
+    run_sensitivity_sweep(
+        load_phrasebur_phrases(args.input),
+        min_lengths=args.min_lengths,
+        alphas=args.alphas,
+        confidence_levels=args.confidence_levels,
+        robust=args.hac,
+        output_format=args.format
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+BUR Sharded Surge Analysis CLI
+
+Runs the surge analysis as independent map jobs plus one reduce job, so the
+per-phrase fits can be spread over machines (or several corpora fitted
+separately) and still be FDR-corrected together.
+
+- map:    fit the phrases of one shard of whole solos and write a shard file
+- reduce: merge shard files, apply Benjamini-Hochberg once over all of them
+          and write bur_surge_results_fdr
+
+Usage:
+    python -m cli.bur_shard_cli map --shard 0 --shards 4 --output-dir outputs/shards
+    ...
+    python -m cli.bur_shard_cli map --shard 3 --shards 4 --output-dir outputs/shards
+    python -m cli.bur_shard_cli reduce outputs/shards/*.npz
+
+Notes:
+    - Shard files are npz result tables (see utils.results_io) holding one
+      row per testable phrase with the uncorrected statistics
+    - The merged output equals a single-process surge run on the same corpus
+      (bit for bit; shards are merged in corpus order)
+    - Shard files of several corpora can be reduced together; the FDR
+      correction then covers all of their phrases
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_io import write_results, load_results, check_results_format, RESULT_FORMATS
+from analysis.bur_surge_analysis import phrase_trend_stats
+from analysis.bur_sharding import shard_bounds, take_phrases, sharded_fdr_correction
+from cli.bur_surge_cli import result_columns
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES
+
+# <corpus>.shard-<index>-of-<count>.npz
+SHARD_FILE_PATTERN = re.compile(r'^(?P<corpus>.+)\.shard-(?P<index>\d+)-of-(?P<count>\d+)\.npz$')
+
+
+def shard_file_name(input_csv, shard, n_shards):
+    """Shard file name (without directory) for one shard of a corpus."""
+    corpus = os.path.splitext(os.path.basename(input_csv))[0]
+    return f"{corpus}.shard-{shard:04d}-of-{n_shards:04d}"
+
+
+def run_shard_map(input_csv, shard, n_shards, output_dir="outputs/shards"):
+    """
+    Fit one shard of a corpus and write its shard file.
+
+    Args:
+        input_csv: PhraseBur CSV
+        shard: Shard index, 0 <= shard < n_shards
+        n_shards: Number of shards the corpus is split into
+        output_dir: Directory for the shard file (default: outputs/shards)
+
+    Returns:
+        str: Path of the written shard file
+    """
+    import pandas as pd
+
+    if not 0 <= shard < n_shards:
+        raise ValueError(f"shard must be in 0..{n_shards - 1}, got {shard}")
+    phrases = load_phrasebur_phrases(input_csv)
+    bounds = shard_bounds(phrases, n_shards)
+    part = take_phrases(phrases, bounds[shard], bounds[shard + 1])
+
+    trends = phrase_trend_stats(part['values'], part['offsets'])
+    keep = trends['n_values'] >= MIN_BUR_VALUES
+    artist_code = phrase_artist_codes(part)[keep]
+    table = pd.DataFrame({
+        'id': part['solo_ids'][part['solo_code'][keep]],
+        'seg_id': part['seg_id'][keep],
+        'artist': part['artists'][artist_code],
+        **{key: column[keep] for key, column in trends.items()}
+    })
+
+    path = write_results(table, output_dir, shard_file_name(input_csv, shard, n_shards), 'npz')
+    print(f"Shard {shard + 1}/{n_shards}: phrases {bounds[shard]}-{bounds[shard + 1]} "
+          f"({len(table)} with n >= {MIN_BUR_VALUES}) -> {path}")
+    return path
+
+
+def _order_shard_files(paths):
+    """Shard files sorted by corpus then shard index; raises if a corpus is missing shards."""
+    parsed = {}
+    for path in paths:
+        match = SHARD_FILE_PATTERN.match(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"Not a shard file name: {path}")
+        key = (match['corpus'], int(match['count']))
+        parsed.setdefault(key, {})[int(match['index'])] = path
+
+    corpora = [corpus for corpus, _ in parsed]
+    clashing = sorted({corpus for corpus in corpora if corpora.count(corpus) > 1})
+    if clashing:
+        raise ValueError(f"Shard files with different shard counts for: {', '.join(clashing)}")
+    ordered = []
+    for (corpus, count), shards in sorted(parsed.items()):
+        missing = sorted(set(range(count)) - set(shards))
+        if missing:
+            raise ValueError(f"{corpus}: missing shard(s) {', '.join(map(str, missing))} of {count}")
+        ordered.extend(shards[index] for index in range(count))
+    return ordered
+
+
+def run_shard_reduce(shard_files, output_dir="outputs", output_format='csv', robust=False):
+    """
+    Merge shard files and apply the FDR correction over all of their phrases.
+
+    Args:
+        shard_files: Shard file paths written by run_shard_map (any order)
+        output_dir: Directory for bur_surge_results_fdr (default: outputs)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+        robust: Correct the Newey-West (HAC) p-values instead of the OLS p-values
+
+    Returns:
+        DataFrame of per-phrase results as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    paths = _order_shard_files(shard_files)
+    print(f"\nMerging {len(paths)} shard files...")
+    print("=" * 60)
+
+    tables = [load_results(path) for path in paths]
+    p_value_column = 'hac_p_value' if robust else 'p_value'
+    corrected = sharded_fdr_correction([table[p_value_column].to_numpy() for table in tables], alpha=FDR_ALPHA)
+
+    # String columns come back as per-shard categoricals; merge them as plain strings
+    results = pd.concat(
+        [table.astype({name: str for name in table.columns if isinstance(table[name].dtype, pd.CategoricalDtype)})
+         for table in tables],
+        ignore_index=True
+    )
+    results['p_value_corrected'] = np.concatenate([p_corrected for _, p_corrected in corrected])
+    results['significant_fdr'] = np.concatenate([reject for reject, _ in corrected])
+    results['conf_interval'] = list(zip(results['ci_lower'], results['ci_upper']))
+
+    total = len(results)
+    significant = results['significant_fdr']
+    sig_increase = int((significant & (results['direction'] == 'increase')).sum())
+    sig_decrease = int((significant & (results['direction'] == 'decrease')).sum())
+    print(f"Phrases: {total} (n >= {MIN_BUR_VALUES}) from {results['id'].nunique()} solos")
+    print(f"FDR correction over all shards (α = {FDR_ALPHA}"
+          f"{', Newey-West p-values' if robust else ''})")
+    print(f"Significant increase: {sig_increase} / {total} ({100 * sig_increase / max(total, 1):.1f}%)")
+    print(f"Significant decrease: {sig_decrease} / {total} ({100 * sig_decrease / max(total, 1):.1f}%)")
+
+    df_results = results[result_columns(output_format)]
+    output_file = write_results(df_results, output_dir, 'bur_surge_results_fdr', output_format)
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print("=" * 60)
+    return df_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the surge analysis as sharded map jobs and one reduce job')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    map_parser = subparsers.add_parser('map', help='Fit one shard and write its shard file')
+    map_parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                            help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    map_parser.add_argument('--shard', type=int, required=True, help='Shard index (0-based)')
+    map_parser.add_argument('--shards', type=int, required=True, help='Number of shards')
+    map_parser.add_argument('--output-dir', '-o', default='outputs/shards',
+                            help='Shard file directory (default: outputs/shards)')
+
+    reduce_parser = subparsers.add_parser('reduce', help='Merge shard files and apply the FDR correction')
+    reduce_parser.add_argument('shard_files', nargs='+', help='Shard files written by map')
+    reduce_parser.add_argument('--output-dir', '-o', default='outputs',
+                               help='Output directory (default: outputs)')
+    reduce_parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                               help='Results file format (default: csv)')
+    reduce_parser.add_argument('--hac', action='store_true',
+                               help='FDR-correct the Newey-West (HAC) p-values instead of the OLS p-values')
+    args = parser.parse_args()
+
+    if args.command == 'map':
+        run_shard_map(args.input, args.shard, args.shards, output_dir=args.output_dir)
+    else:
+        run_shard_reduce(args.shard_files, output_dir=args.output_dir, output_format=args.format, robust=args.hac)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,68 +8,123 @@ multiple testing.
 
 Statistical Approach:
 - Linear regression on BUR vs. position for each phrase
-- FDR correction (Benjamini-Hochberg) for multiple comparisons
+- Exponential and logarithmic fits compared by AIC
+- FDR correction (Benjamini-Hochberg) for multiple comparisons, optionally
+  on Newey-West (HAC) p-values that allow for autocorrelated residuals
 - Reports slopes, confidence intervals, and corrected p-values
+- Per-artist increase/decrease rates with bootstrap confidence intervals
 """
 
-import pandas as pd
-from collections import defaultdict
-
-from utils.data_utils import load_phrasebur_csv, get_artist_from_id, ensure_output_dir
-from analysis.bur_surge_analysis import linear_trend_analysis, fdr_correction
-from utils.config import FDR_ALPHA, MIN_BUR_VALUES, DW_AUTOCORR_THRESHOLD
-
-
-def main():
-    # Load the CSV
-    df = load_phrasebur_csv()
-
-    results = []
-    all_p_values = []
-
+import argparse
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes, ensure_output_dir
+from utils.results_store import cached_phrase_results, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_surge_analysis import phrase_trend_stats, fdr_correction, TREND_MODELS, TREND_STATS_PARAMS
+from analysis.bur_bootstrap import grouped_bootstrap_means, DEFAULT_RESAMPLES
+from analysis.bur_sharding import sharded_phrase_trend_stats
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES, DW_AUTOCORR_THRESHOLD, CONFIDENCE_LEVEL
+
+
+# Columns of bur_surge_results_fdr, in order
+RESULT_COLUMNS = ['id', 'seg_id', 'artist', 'n_values', 'slope', 'conf_interval',
+                  'r2', 'p_value', 'p_value_corrected', 'significant_fdr', 'direction',
+                  'durbin_watson', 'hac_std_err', 'hac_p_value', 'hac_lags', 'ar1_rho', 'n_effective',
+                  'std_err', 'intercept',
+                  'exp_rate', 'exp_r2', 'exp_p_value', 'log_slope', 'log_r2', 'log_p_value',
+                  'aic_linear', 'aic_exponential', 'aic_logarithmic', 'best_model']
+
+
+def result_columns(output_format='csv'):
+    """Output columns; typed formats store the slope interval as two float columns."""
+    if output_format == 'csv':
+        return list(RESULT_COLUMNS)
+    cols = list(RESULT_COLUMNS)
+    ci_index = cols.index('conf_interval')
+    cols[ci_index:ci_index + 1] = ['ci_lower', 'ci_upper']
+    return cols
+
+
+def run_surge_analysis(phrases, n_top=None, output_dir="outputs", store_dir=DEFAULT_STORE_DIR,
+                       n_bootstrap=DEFAULT_RESAMPLES, seed=0, output_format='csv', robust=False, n_shards=None,
+                       n_workers=None):
+    """
+    Run the surge analysis on grouped phrases and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        n_top: Performers to display (default: ask interactively)
+        output_dir: Directory for bur_surge_results_fdr.csv (default: outputs)
+        store_dir: Per-phrase results store (default: <output_dir>/.phrase_results;
+                   None = refit every phrase)
+        n_bootstrap: Resamples for per-artist rate CIs (default: 10000; 0 = no CIs)
+        seed: Bootstrap random seed (default: 0)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+                       (see utils.results_io)
+        robust: Run the FDR correction on the Newey-West (HAC) p-values
+                instead of the OLS p-values
+        n_shards: Fit shards of whole solos in a process pool instead of using
+                  the results store (see analysis.bur_sharding; default: off)
+        n_workers: Worker processes for the shards (default: os.cpu_count())
+
+    Returns:
+        DataFrame of per-phrase results as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    store_dir = resolve_store_dir(store_dir, output_dir)
     print("\nAnalyzing BUR trends across phrases...")
     print("=" * 60)
 
-    # First pass: collect all trend analyses
-    for (solo_id, phrase_id), group in df.groupby(['id', 'seg_id']):
-        bur_values = group['swing_ratios'].astype(float).tolist()
-        
-        trend = linear_trend_analysis(bur_values)
-        if trend is None:
-            continue
-        
-        artist = get_artist_from_id(solo_id)
-        
-        results.append({
-            'id': solo_id,
-            'seg_id': phrase_id,
-            'artist': artist,
-            **trend
-        })
-        
-        all_p_values.append(trend['p_value'])
+    # First pass: fit every phrase at once over the flat BUR array,
+    # reusing stored results for phrases seen in earlier runs
+    if n_shards:
+        trends = sharded_phrase_trend_stats(phrases, n_shards=n_shards, n_workers=n_workers)
+        print(f"Fitted {n_shards} shards of whole solos")
+    elif store_dir is None:
+        trends = phrase_trend_stats(phrases['values'], phrases['offsets'])
+    else:
+        trends, n_computed = cached_phrase_results(
+            'trend', phrase_trend_stats, phrases['values'], phrases['offsets'], TREND_STATS_PARAMS, store_dir
+        )
+        print(f"Fitted {n_computed} new or changed phrases (others reused from {store_dir})")
+    keep = trends['n_values'] >= MIN_BUR_VALUES
+    artist_code = phrase_artist_codes(phrases)[keep]
+
+    results = pd.DataFrame({
+        'id': phrases['solo_ids'][phrases['solo_code'][keep]],
+        'seg_id': phrases['seg_id'][keep],
+        'artist': phrases['artists'][artist_code],
+        **{key: column[keep] for key, column in trends.items()}
+    })
+    results['conf_interval'] = list(zip(results['ci_lower'], results['ci_upper']))
 
     total_phrases = len(results)
     print(f"Analyzed {total_phrases} phrases with n >= {MIN_BUR_VALUES} BUR values")
     print()
 
-    # Apply FDR correction
+    # Apply FDR correction (always redone over the merged per-phrase results)
+    p_value_column = 'hac_p_value' if robust else 'p_value'
     print("Applying False Discovery Rate (FDR) correction...")
-    reject, p_corrected = fdr_correction(all_p_values, alpha=FDR_ALPHA)
-    
-    # Add corrected p-values to results
-    for i, result in enumerate(results):
-        result['p_value_corrected'] = p_corrected[i]
-        result['significant_fdr'] = reject[i]
+    if robust:
+        print("Using autocorrelation-robust Newey-West (HAC) p-values")
+    reject, p_corrected = fdr_correction(results[p_value_column].tolist(), alpha=FDR_ALPHA)
+    results['p_value_corrected'] = p_corrected
+    results['significant_fdr'] = reject
 
     # Count significant trends
-    sig_increase = sum(1 for r in results if r['significant_fdr'] and r['direction'] == 'increase')
-    sig_decrease = sum(1 for r in results if r['significant_fdr'] and r['direction'] == 'decrease')
+    is_sig_increase = (results['significant_fdr'] & (results['direction'] == 'increase')).to_numpy()
+    is_sig_decrease = (results['significant_fdr'] & (results['direction'] == 'decrease')).to_numpy()
+    sig_increase = int(is_sig_increase.sum())
+    sig_decrease = int(is_sig_decrease.sum())
 
     # Calculate Durbin-Watson statistics
-    dw_values = [r['durbin_watson'] for r in results]
-    mean_dw = sum(dw_values) / len(dw_values)
-    autocorr_phrases = sum(1 for dw in dw_values if dw < DW_AUTOCORR_THRESHOLD)  # Strong positive autocorrelation
+    dw_values = results['durbin_watson']
+    mean_dw = dw_values.mean()
+    autocorr_phrases = int((dw_values < DW_AUTOCORR_THRESHOLD).sum())  # Strong positive autocorrelation
 
     print(f"FDR correction complete (α = {FDR_ALPHA})")
     print()
@@ -83,62 +138,69 @@ def main():
     print(f"Mean Durbin-Watson statistic: {mean_dw:.3f}")
     print(f"  (2.0 = no autocorrelation, <2.0 = positive, >2.0 = negative)")
     print(f"Phrases with strong autocorrelation (DW < {DW_AUTOCORR_THRESHOLD}): {autocorr_phrases} ({100*autocorr_phrases/total_phrases:.1f}%)")
+    print(f"Median lag-1 residual autocorrelation: {results['ar1_rho'].median():.3f}")
+    print(f"Median AR(1) effective sample size: {results['n_effective'].median():.1f} "
+          f"(median phrase length {results['n_values'].median():.0f})")
+    print()
+    print("Best-fitting trend model (lowest AIC):")
+    for model in TREND_MODELS:
+        model_count = int((results['best_model'] == model).sum())
+        print(f"  {model.capitalize()}: {model_count} ({100*model_count/total_phrases:.1f}%)")
     print()
 
-    # Per-artist statistics
-    artist_phrase_counts = defaultdict(int)
-    artist_sig_counts_increase = defaultdict(int)
-    artist_sig_counts_decrease = defaultdict(int)
+    # Per-artist statistics: one bincount per tally over the artist codes
+    n_artists = len(phrases['artists'])
+    artist_phrase_counts = np.bincount(artist_code, minlength=n_artists)
+    artist_sig_counts_increase = np.bincount(artist_code, weights=is_sig_increase, minlength=n_artists).astype(int)
+    artist_sig_counts_decrease = np.bincount(artist_code, weights=is_sig_decrease, minlength=n_artists).astype(int)
 
-    for result in results:
-        artist = result['artist']
-        artist_phrase_counts[artist] += 1
-        
-        if result['significant_fdr']:
-            if result['direction'] == 'increase':
-                artist_sig_counts_increase[artist] += 1
-            elif result['direction'] == 'decrease':
-                artist_sig_counts_decrease[artist] += 1
+    # Bootstrap CIs for the per-artist rates from the per-phrase indicators
+    ci_label = f"{100 * CONFIDENCE_LEVEL:.0f}% CI"
+    if n_bootstrap:
+        artist_ci = grouped_bootstrap_means(
+            np.column_stack([is_sig_increase, is_sig_decrease]), artist_code, n_groups=n_artists,
+            n_resamples=n_bootstrap, seed=seed
+        )
 
     # Sort artists by total phrase count
-    sorted_artists = sorted(
-        artist_phrase_counts.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )
+    sorted_artists = np.argsort(-artist_phrase_counts, kind='stable')
 
     # Display top performers
-    n_top = int(input(f"How many top performers to display? (default 20): ") or "20")
+    if n_top is None:
+        n_top = int(input(f"How many top performers to display? (default 20): ") or "20")
     
     print()
     print("=" * 60)
     print(f"Top {n_top} performers (by phrase count):")
     print("=" * 60)
     
-    for artist, count in sorted_artists[:n_top]:
-        inc = artist_sig_counts_increase[artist]
-        dec = artist_sig_counts_decrease[artist]
-        inc_pct = 100 * inc / count if count > 0 else 0
-        dec_pct = 100 * dec / count if count > 0 else 0
+    for code in sorted_artists[:n_top]:
+        count = artist_phrase_counts[code]
+        if count == 0:
+            break
+        inc = artist_sig_counts_increase[code]
+        dec = artist_sig_counts_decrease[code]
+        inc_pct = 100 * inc / count
+        dec_pct = 100 * dec / count
         
-        print(f"{artist}:")
+        print(f"{phrases['artists'][code]}:")
         print(f"  Phrases: {count}")
-        print(f"  Increase: {inc} ({inc_pct:.1f}%)")
-        print(f"  Decrease: {dec} ({dec_pct:.1f}%)")
+        if n_bootstrap:
+            lower = 100 * artist_ci['ci_lower'][code]
+            upper = 100 * artist_ci['ci_upper'][code]
+            print(f"  Increase: {inc} ({inc_pct:.1f}%, {ci_label} {lower[0]:.1f}-{upper[0]:.1f}%)")
+            print(f"  Decrease: {dec} ({dec_pct:.1f}%, {ci_label} {lower[1]:.1f}-{upper[1]:.1f}%)")
+        else:
+            print(f"  Increase: {inc} ({inc_pct:.1f}%)")
+            print(f"  Decrease: {dec} ({dec_pct:.1f}%)")
         print()
 
     # Save detailed results
-    ensure_output_dir()
-    df_results = pd.DataFrame(results)
+    ensure_output_dir(output_dir)
     
-    # Reorder columns for clarity
-    cols = ['id', 'seg_id', 'artist', 'n_values', 'slope', 'conf_interval', 
-            'r2', 'p_value', 'p_value_corrected', 'significant_fdr', 'direction', 
-            'durbin_watson', 'std_err', 'intercept']
-    df_results = df_results[cols]
+    df_results = results[result_columns(output_format)]
     
-    output_file = 'outputs/bur_surge_results_fdr.csv'
-    df_results.to_csv(output_file, index=False)
+    output_file = write_results(df_results, output_dir, 'bur_surge_results_fdr', output_format)
     print("=" * 60)
     print(f"Detailed results saved to: {output_file}")
     print()
@@ -146,16 +208,46 @@ def main():
     print("- Used linear regression to detect BUR trends")
     print(f"- Applied Benjamini-Hochberg FDR correction (α = {FDR_ALPHA})")
     print("- Slope: BUR change per position (negative = decrease)")
-    print("- conf_interval: 95% confidence interval for slope")
-    print(f"- significant_fdr: True if FDR-corrected p < {FDR_ALPHA}")
+    if output_format == 'csv':
+        print("- conf_interval: 95% confidence interval for slope")
+    else:
+        print("- ci_lower/ci_upper: 95% confidence interval for slope")
+    print(f"- significant_fdr: True if FDR-corrected p < {FDR_ALPHA}"
+          f"{' (from hac_p_value)' if robust else ''}")
+    if n_bootstrap:
+        print(f"- Per-artist CIs: percentile bootstrap over phrases ({n_bootstrap:,} resamples, seed {seed})")
     print("- durbin_watson: Autocorrelation test (2 = independent, <2 = positive autocorr)")
+    print("- hac_std_err/hac_p_value: Newey-West slope inference robust to autocorrelation")
+    print("- n_effective: AR(1)-adjusted effective sample size from the lag-1 residual autocorrelation")
+    print("- exp_*/log_*: Exponential (ln BUR vs position) and logarithmic (BUR vs ln position) fits")
+    print("- best_model: Trend model with the lowest AIC on the BUR scale")
     print()
     print("Limitations:")
     print("- Linear regression assumes independence (often violated by musical data)")
-    print("- Autocorrelation can lead to underestimated standard errors")
+    print("- Autocorrelation can lead to underestimated standard errors"
+          f"{'' if robust else ' (rerun with --hac for Newey-West p-values)'}")
     print("- P-values may be optimistic; true significance may be even rarer")
     print("=" * 60)
 
+    return df_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect linear BUR trends within phrases')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    parser.add_argument('--hac', action='store_true',
+                        help='FDR-correct the Newey-West (HAC) p-values instead of the OLS p-values')
+    parser.add_argument('--shards', type=int, default=None,
+                        help='Fit this many shards of whole solos in a process pool (default: off)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --shards (default: CPU count)')
+    args = parser.parse_args()
+
+    # Load the grouped phrases (memory-mapped from the cache when available)
+    run_surge_analysis(load_phrasebur_phrases(), output_format=args.format, robust=args.hac,
+                       n_shards=args.shards, n_workers=args.workers)
+
 
 if __name__ == '__main__':
     main()
@@ -8,54 +8,87 @@ indicates more consistent swing timing within a phrase.
 
 Output:
 - Overall average standard deviation across all phrases
-- Per-artist average standard deviation (sorted by highest variation)
-- CSV file with phrase-level variation statistics
+- Per-artist average standard deviation (sorted by highest variation), with
+  bootstrap confidence intervals over phrases
+- CSV file with phrase-level variation statistics (std, mean, CV, MAD,
+  quartiles, range and lag-1 autocorrelation)
 
 Note: This is descriptive statistics only (no hypothesis testing).
 """
 
-import pandas as pd
-import numpy as np
-from collections import defaultdict
+import argparse
 
-from utils.data_utils import load_phrasebur_csv, get_artist_from_id, ensure_output_dir
-from analysis.bur_variation_analysis import phrase_variation_stats
-from utils.config import DEFAULT_TOP_N
+import numpy as np
 
-def main():
-    # Load the CSV
-    df = load_phrasebur_csv()
-
-    results = []
-    artist_phrase_stds = defaultdict(list)
-    total_phrases = 0
-
-    for (solo_id, phrase_id), group in df.groupby(['id', 'seg_id']):
-        bur_values = group['swing_ratios'].astype(float).tolist()
-        stats = phrase_variation_stats(bur_values)
-        if stats is None:
-            continue
-            
-        artist = get_artist_from_id(solo_id)
-        artist_phrase_stds[artist].append(stats['std_bur'])
-        
-        results.append({
-            'id': solo_id,
-            'seg_id': phrase_id,
-            'artist': artist,
-            **stats
-        })
-        total_phrases += 1
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes, ensure_output_dir
+from utils.results_store import cached_phrase_results, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_variation_analysis import phrase_variation_stats_batch, VARIATION_STATS, VARIATION_STATS_PARAMS
+from analysis.bur_bootstrap import grouped_bootstrap_means, DEFAULT_RESAMPLES
+from utils.config import DEFAULT_TOP_N, MIN_BUR_VALUES, CONFIDENCE_LEVEL
+
+def run_variation_analysis(phrases, sort_order=None, n_top=None, output_dir="outputs", store_dir=DEFAULT_STORE_DIR,
+                           n_bootstrap=DEFAULT_RESAMPLES, seed=0, output_format='csv'):
+    """
+    Run the variation analysis on grouped phrases and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        sort_order: 'desc' (highest variation first) or 'asc' (default: ask interactively)
+        n_top: Performers to display (default: ask interactively)
+        output_dir: Directory for phrase_bur_variation.csv (default: outputs)
+        store_dir: Per-phrase results store (default: <output_dir>/.phrase_results;
+                   None = recompute every phrase)
+        n_bootstrap: Resamples for per-artist mean CIs (default: 10000; 0 = no CIs)
+        seed: Bootstrap random seed (default: 0)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+                       (see utils.results_io)
+
+    Returns:
+        DataFrame of per-phrase variation statistics as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    store_dir = resolve_store_dir(store_dir, output_dir)
+    if store_dir is None:
+        stats = phrase_variation_stats_batch(phrases['values'], phrases['offsets'])
+    else:
+        stats, n_computed = cached_phrase_results(
+            'variation', phrase_variation_stats_batch, phrases['values'], phrases['offsets'],
+            VARIATION_STATS_PARAMS, store_dir
+        )
+        print(f"Computed {n_computed} new or changed phrases (others reused from {store_dir})")
+    keep = stats['n_values'] >= MIN_BUR_VALUES
+    artist_code = phrase_artist_codes(phrases)[keep]
 
     # Convert to DataFrame for easy sorting/analysis
-    variation_df = pd.DataFrame(results)
-
-    # Compute average phrase stddev per artist
-    artist_avg_std = []
-    for artist, stds in artist_phrase_stds.items():
-        avg_std = np.mean(stds) if stds else 0
-        count = len(stds)
-        artist_avg_std.append((artist, avg_std, count))
+    variation_df = pd.DataFrame({
+        'id': phrases['solo_ids'][phrases['solo_code'][keep]],
+        'seg_id': phrases['seg_id'][keep],
+        'artist': phrases['artists'][artist_code],
+        'n_values': stats['n_values'][keep],
+        **{key: stats[key][keep] for key in VARIATION_STATS}
+    })
+
+    # Compute average phrase stddev per artist with one bincount over the artist codes
+    n_artists = len(phrases['artists'])
+    artist_counts = np.bincount(artist_code, minlength=n_artists)
+    artist_std_sums = np.bincount(artist_code, weights=variation_df['std_bur'].to_numpy(), minlength=n_artists)
+    present = np.flatnonzero(artist_counts)
+    if n_bootstrap:
+        artist_ci = grouped_bootstrap_means(
+            variation_df['std_bur'].to_numpy(), artist_code, n_groups=n_artists,
+            n_resamples=n_bootstrap, seed=seed
+        )
+        ci_lower, ci_upper = artist_ci['ci_lower'], artist_ci['ci_upper']
+    else:
+        ci_lower = ci_upper = np.full(n_artists, np.nan)
+    artist_avg_std = [
+        (phrases['artists'][code], artist_std_sums[code] / artist_counts[code], artist_counts[code],
+         ci_lower[code], ci_upper[code])
+        for code in present
+    ]
 
     # Print total phrase average std deviation
     if len(variation_df) > 0:
@@ -64,12 +97,14 @@ def main():
         print("(Note: Simple average across phrases; does not account for phrase length differences)")
 
     # Ask user for sorting preference
-    print("\nSort order:")
-    print("  1. Highest variation first (most variable swing)")
-    print("  2. Lowest variation first (most consistent swing)")
-    sort_choice = input("Enter choice (default 1): ").strip() or "1"
+    if sort_order is None:
+        print("\nSort order:")
+        print("  1. Highest variation first (most variable swing)")
+        print("  2. Lowest variation first (most consistent swing)")
+        sort_choice = input("Enter choice (default 1): ").strip() or "1"
+        sort_order = 'asc' if sort_choice == "2" else 'desc'
     
-    if sort_choice == "2":
+    if sort_order == 'asc':
         # Sort ascending (lowest variation first)
         artist_avg_std.sort(key=lambda x: x[1], reverse=False)
         sort_label = "lowest variation (most consistent)"
@@ -79,10 +114,11 @@ def main():
         sort_label = "highest variation (most variable)"
 
     # Ask user for number of top performers to display
-    try:
-        n_top = int(input(f"How many top performers to display? (default {DEFAULT_TOP_N}): ") or DEFAULT_TOP_N)
-    except Exception:
-        n_top = DEFAULT_TOP_N
+    if n_top is None:
+        try:
+            n_top = int(input(f"How many top performers to display? (default {DEFAULT_TOP_N}): ") or DEFAULT_TOP_N)
+        except Exception:
+            n_top = DEFAULT_TOP_N
 
     print()
     print("=" * 60)
@@ -90,16 +126,32 @@ def main():
     print("=" * 60)
     print("Higher std = more variable swing, Lower std = more consistent swing")
     print()
-    for artist, avg_std, count in artist_avg_std[:n_top]:
-        print(f"{artist}: avg phrase stddev = {avg_std:.3f} ({count} phrases)")
+    for artist, avg_std, count, lower, upper in artist_avg_std[:n_top]:
+        if n_bootstrap:
+            ci_label = f"{100 * CONFIDENCE_LEVEL:.0f}% CI"
+            print(f"{artist}: avg phrase stddev = {avg_std:.3f} [{ci_label} {lower:.3f}-{upper:.3f}] ({count} phrases)")
+        else:
+            print(f"{artist}: avg phrase stddev = {avg_std:.3f} ({count} phrases)")
 
     # Save the phrase-level variation data
-    ensure_output_dir()
-    variation_df.to_csv("outputs/phrase_bur_variation.csv", index=False)
+    ensure_output_dir(output_dir)
+    output_file = write_results(variation_df, output_dir, "phrase_bur_variation", output_format)
     print()
     print("=" * 60)
-    print(f"Detailed results saved to: outputs/phrase_bur_variation.csv")
+    print(f"Detailed results saved to: {output_file}")
+    print("  (also per phrase: mean, CV, MAD, quartiles, min/max, lag-1 autocorrelation)")
     print("=" * 60)
 
+    return variation_df
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure BUR variation within phrases')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    # Load the grouped phrases (memory-mapped from the cache when available)
+    run_variation_analysis(load_phrasebur_phrases(), output_format=args.format)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+BUR Window Trends CLI
+
+Looks for BUR trends at phrase onset and close and inside sliding windows,
+rather than across the whole phrase.
+
+Statistical Approach:
+- Linear regression over the first k and last k BUR values of each phrase
+- Linear regression over every sliding window of width w
+- Reports the steepest significant increase per phrase and width
+
+Usage:
+    python -m cli.bur_window_cli --windows 4 6 8 --edge 6
+"""
+
+import argparse
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_io import write_results, check_results_format, RESULT_FORMATS
+from analysis.bur_window_trends import window_trend_scan
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES
+
+# Window widths scanned by default
+DEFAULT_WINDOWS = (MIN_BUR_VALUES,)
+
+
+def run_window_trends(phrases, windows=DEFAULT_WINDOWS, edge=MIN_BUR_VALUES, output_dir="outputs",
+                      output_format='csv'):
+    """
+    Scan onset, close and sliding-window trends and print the report.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.load_phrasebur_phrases)
+        windows: Sliding window widths to scan (default: MIN_BUR_VALUES)
+        edge: BUR values fitted at the onset and close (default from config: 6)
+        output_dir: Directory for bur_window_trends.csv (default: outputs)
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        DataFrame with one row per phrase and window width, as written to the output file
+    """
+    import pandas as pd
+
+    check_results_format(output_format)
+    n_values = np.diff(phrases['offsets'])
+    artist_code = phrase_artist_codes(phrases)
+
+    print(f"\nScanning BUR trends at phrase onset/close (first and last {edge} values)")
+    print(f"and in sliding windows of width {', '.join(str(w) for w in windows)}...")
+    print("=" * 60)
+
+    tables = []
+    for window in windows:
+        scan = window_trend_scan(phrases['values'], phrases['offsets'], window=window, edge=edge)
+        tables.append(pd.DataFrame({
+            'id': phrases['solo_ids'][phrases['solo_code']],
+            'seg_id': phrases['seg_id'],
+            'artist': phrases['artists'][artist_code],
+            'n_values': n_values,
+            'window': window,
+            'edge': edge,
+            **scan
+        }))
+    results = pd.concat(tables, ignore_index=True)
+
+    # Onset and close do not depend on the window width
+    edges = tables[0]
+    fitted = edges['onset_slope'].notna()
+    n_fitted = int(fitted.sum())
+    print(f"Phrases with n >= {edge}: {n_fitted}")
+    print()
+    print("=" * 60)
+    print("ONSET VS CLOSE")
+    print("=" * 60)
+    for name in ('onset', 'close'):
+        slope = edges.loc[fitted, f'{name}_slope']
+        significant = edges.loc[fitted, f'{name}_p_value'] < FDR_ALPHA
+        increase = int((significant & (slope > 0)).sum())
+        decrease = int((significant & (slope < 0)).sum())
+        print(f"{name.capitalize()}: mean slope {slope.mean():+.4f}, median {slope.median():+.4f}")
+        print(f"  Increase (p < {FDR_ALPHA}): {increase} ({100 * increase / max(n_fitted, 1):.1f}%)")
+        print(f"  Decrease (p < {FDR_ALPHA}): {decrease} ({100 * decrease / max(n_fitted, 1):.1f}%)")
+    print()
+
+    print("=" * 60)
+    print("SLIDING WINDOWS")
+    print("=" * 60)
+    for window, table in zip(windows, tables):
+        scanned = table['n_windows'] > 0
+        found = table['best_window_start'] >= 0
+        n_scanned = int(scanned.sum())
+        n_found = int(found.sum())
+        print(f"Width {window}: {n_scanned} phrases, {int(table['n_windows'].sum())} windows")
+        print(f"  Phrases with a significant increasing window: {n_found} ({100 * n_found / max(n_scanned, 1):.1f}%)")
+        if n_found:
+            relative_start = table.loc[found, 'best_window_start'] / (table.loc[found, 'n_values'] - window).clip(lower=1)
+            print(f"  Steepest such window: median slope {table.loc[found, 'best_window_slope'].median():+.4f}, "
+                  f"median start at {100 * relative_start.median():.0f}% of the phrase")
+    print()
+
+    output_file = write_results(results, output_dir, 'bur_window_trends', output_format)
+    print("=" * 60)
+    print(f"Detailed results saved to: {output_file}")
+    print()
+    print("Statistical Notes:")
+    print(f"- onset_*/close_*: Linear fit over the first/last {edge} BUR values")
+    print("- best_window_*: Window with the steepest increase among windows with p < "
+          f"{FDR_ALPHA} (-1/NaN if none)")
+    print("- Windows overlap and are selected by significance, so best-window")
+    print("  p-values are not corrected for multiple testing")
+    print("=" * 60)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan BUR trends at phrase onset/close and in sliding windows')
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--windows', '-w', type=int, nargs='+', default=list(DEFAULT_WINDOWS),
+                        help=f'Sliding window widths (default: {MIN_BUR_VALUES})')
+    parser.add_argument('--edge', '-k', type=int, default=MIN_BUR_VALUES,
+                        help=f'BUR values fitted at onset and close (default: {MIN_BUR_VALUES})')
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                        help='Results file format (default: csv)')
+    args = parser.parse_args()
+
+    run_window_trends(
+        load_phrasebur_phrases(args.input),
+        windows=args.windows,
+        edge=args.edge,
+        output_format=args.format
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+BUR Pipeline Runner
+
+Runs any combination of the analyses non-interactively on a single load of
+the corpus. Every interactive prompt of the individual CLIs is a flag here,
+so runs can be scheduled.
+
+Usage:
+    python -m cli run surge variation histograms --top 20 --sort desc
+    python -m cli run windows --windows 4 6 8 --edge 6
+    python -m cli run artists --top 20
+    python -m cli run changepoints --changepoint-model mean --penalty 10
+    python -m cli run surge ranks --rank-test spearman
+    python -m cli run surge null --input data/a.csv data/b.csv --permutations 10000
+
+Notes:
+    - Each corpus is parsed and grouped once, then shared by all analyses
+    - Analyses run concurrently in worker processes; forked workers inherit
+      the grouped phrases, others memory-map the same phrase cache
+    - Each analysis's report is printed in the order requested
+    - Per-phrase results are reused from the results store in
+      <output-dir>/.phrase_results, so only new or changed phrases are
+      recomputed (--no-store disables this; --prune-store drops phrases no
+      longer in any input)
+    - With several input files, outputs go to <output-dir>/<csv name>/
+    - --profile prints where the time and memory went (see utils/profiling.py)
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.data_utils import load_phrasebur_phrases
+from utils.config import DEFAULT_TOP_N, MIN_BUR_VALUES
+from utils.results_store import phrase_hashes, prune_store, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.results_io import RESULT_FORMATS
+from utils.profiling import (
+    enable_profiling,
+    profile_events,
+    profile_stage,
+    record_profile_events,
+    PROFILE_ENV_VAR
+)
+from analysis.bur_null_models import DEFAULT_PERMUTATIONS
+from analysis.bur_bootstrap import DEFAULT_RESAMPLES
+from cli.bur_surge_cli import run_surge_analysis
+from cli.bur_variation_cli import run_variation_analysis
+from cli.bur_histogram_cli import run_histograms
+from cli.bur_null_model_cli import run_null_models
+from cli.bur_window_cli import run_window_trends, DEFAULT_WINDOWS
+from cli.bur_artist_trend_cli import run_artist_trends
+from cli.bur_changepoint_cli import run_changepoints
+from analysis.bur_changepoints import CHANGEPOINT_MODELS
+from cli.bur_rank_trend_cli import run_rank_trends, RANK_TESTS
+
+# Analyses in their default run order
+ANALYSES = ('surge', 'variation', 'histograms', 'null', 'windows', 'artists', 'changepoints', 'ranks')
+
+# Grouped phrases of the corpus being processed (inherited by forked workers)
+_pipeline_phrases = None
+
+
+def _run_analysis(name, phrases, options):
+    """Run one analysis with every prompt answered from options."""
+    if name == 'surge':
+        run_surge_analysis(phrases, n_top=options['top'], output_dir=options['output_dir'],
+                           store_dir=options['store_dir'], n_bootstrap=options['bootstrap'], seed=options['seed'],
+                           output_format=options['format'], robust=options['hac'], n_shards=options['shards'],
+                           n_workers=options['workers'])
+    elif name == 'variation':
+        run_variation_analysis(phrases, sort_order=options['sort'], n_top=options['top'],
+                               output_dir=options['output_dir'], store_dir=options['store_dir'],
+                               n_bootstrap=options['bootstrap'], seed=options['seed'],
+                               output_format=options['format'])
+    elif name == 'histograms':
+        run_histograms(phrases, output_dir=options['output_dir'], force=options['force_histograms'],
+                       store_dir=options['store_dir'], n_workers=options['workers'])
+    elif name == 'null':
+        run_null_models(phrases, n_permutations=options['permutations'], seed=options['seed'],
+                        n_workers=options['workers'], uncorrected=options['uncorrected'], n_top=options['top'],
+                        output_dir=options['output_dir'])
+    elif name == 'windows':
+        run_window_trends(phrases, windows=options['windows'], edge=options['edge'],
+                          output_dir=options['output_dir'], output_format=options['format'])
+    elif name == 'artists':
+        run_artist_trends(phrases, n_top=options['top'], output_dir=options['output_dir'],
+                          store_dir=options['store_dir'], output_format=options['format'])
+    elif name == 'changepoints':
+        run_changepoints(phrases, model=options['changepoint_model'], penalty=options['penalty'],
+                         output_dir=options['output_dir'], output_format=options['format'])
+    elif name == 'ranks':
+        run_rank_trends(phrases, test=options['rank_test'], n_top=options['top'], output_dir=options['output_dir'],
+                        store_dir=options['store_dir'], output_format=options['format'])
+    else:
+        raise ValueError(f"Unknown analysis: {name}")
+
+
+def _run_captured(task):
+    """Worker entry point: run one analysis; returns its report, wall time and profile events."""
+    name, options = task
+    phrases = _pipeline_phrases
+    if phrases is None:
+        phrases = load_phrasebur_phrases(options['input'])
+
+    first_event = len(profile_events())
+    start = time.perf_counter()
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), profile_stage(f"analysis {name}"):
+        _run_analysis(name, phrases, options)
+    return buffer.getvalue(), time.perf_counter() - start, profile_events(first_event)
+
+
+def run_pipeline(analyses, input_csv="data/phrasebur_filtered.csv", jobs=None, **options):
+    """
+    Load one corpus and run the requested analyses on it.
+
+    Args:
+        analyses: Names from ANALYSES, run in the given order
+        input_csv: PhraseBur CSV to analyze (default: data/phrasebur_filtered.csv)
+        jobs: Analyses run at once (default: one per analysis; 1 = sequential)
+        **options: output_dir, format, store_dir, top, hac, shards, workers, sort, force_histograms,
+                   bootstrap, permutations, seed, uncorrected, windows, edge, changepoint_model,
+                   penalty, rank_test (see main() for defaults)
+
+    Returns:
+        Dictionary mapping each analysis name to its wall time in seconds
+
+    Note:
+        Histograms, null models and surge shards start their own process
+        pools; unless options['workers'] is given, each gets an equal share
+        of the CPUs, os.cpu_count() // jobs, so the run as a whole uses
+        about one process per CPU.
+    """
+    global _pipeline_phrases
+
+    options = {
+        'input': input_csv,
+        'output_dir': 'outputs',
+        'format': 'csv',
+        'store_dir': DEFAULT_STORE_DIR,
+        'top': DEFAULT_TOP_N,
+        'hac': False,
+        'shards': None,
+        'workers': None,
+        'sort': 'desc',
+        'force_histograms': False,
+        'bootstrap': DEFAULT_RESAMPLES,
+        'permutations': DEFAULT_PERMUTATIONS,
+        'seed': 0,
+        'uncorrected': False,
+        'windows': DEFAULT_WINDOWS,
+        'edge': MIN_BUR_VALUES,
+        'changepoint_model': 'linear',
+        'penalty': None,
+        'rank_test': 'mann-kendall',
+        **options
+    }
+    _pipeline_phrases = load_phrasebur_phrases(input_csv)
+    jobs = min(jobs or len(analyses), max(len(analyses), 1))
+    if options['workers'] is None:
+        options['workers'] = max(1, (os.cpu_count() or 1) // jobs)
+    tasks = [(name, options) for name in analyses]
+
+    try:
+        if jobs == 1 or len(tasks) <= 1:
+            results = [_run_captured(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_run_captured, tasks))
+            # Stages timed inside the workers
+            for _, _, events in results:
+                record_profile_events(events)
+    finally:
+        _pipeline_phrases = None
+
+    timings = {}
+    for name, (report, seconds, _) in zip(analyses, results):
+        print(report, end='')
+        timings[name] = seconds
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m cli',
+        description='Run BUR analyses non-interactively on a single load of the corpus'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Run one or more analyses')
+    run_parser.add_argument('analyses', nargs='*', metavar='analysis',
+                            help=f"Analyses to run: {', '.join(ANALYSES)} (default: surge variation histograms)")
+    run_parser.add_argument('--input', '-i', nargs='+', default=['data/phrasebur_filtered.csv'],
+                            help='One or more PhraseBur CSVs (default: data/phrasebur_filtered.csv)')
+    run_parser.add_argument('--output-dir', '-o', default='outputs',
+                            help='Output directory (default: outputs)')
+    run_parser.add_argument('--format', choices=RESULT_FORMATS, default='csv',
+                            help='Results file format for every analysis except histograms and null (default: csv)')
+    run_parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR,
+                            help=f'Per-phrase results store (default: {DEFAULT_STORE_DIR})')
+    run_parser.add_argument('--no-store', action='store_true',
+                            help='Recompute every phrase instead of reusing stored results')
+    run_parser.add_argument('--prune-store', action='store_true',
+                            help='After the run, drop stored phrases that are in none of the --input corpora')
+    run_parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                            help=f'Performers to display (default: {DEFAULT_TOP_N})')
+    run_parser.add_argument('--hac', action='store_true',
+                            help='Surge FDR uses Newey-West (HAC) p-values instead of OLS p-values')
+    run_parser.add_argument('--shards', type=int, default=None,
+                            help='Surge fits shards of whole solos in a process pool instead of using the store')
+    run_parser.add_argument('--sort', choices=('desc', 'asc'), default='desc',
+                            help='Variation ranking: desc = most variable first (default), asc = most consistent first')
+    run_parser.add_argument('--force-histograms', action='store_true',
+                            help='Redraw every histogram even if its data is unchanged')
+    run_parser.add_argument('--bootstrap', type=int, default=DEFAULT_RESAMPLES,
+                            help=f'Resamples for per-artist bootstrap CIs (default: {DEFAULT_RESAMPLES}; 0 = off)')
+    run_parser.add_argument('--permutations', type=int, default=DEFAULT_PERMUTATIONS,
+                            help=f'Null model shuffles (default: {DEFAULT_PERMUTATIONS})')
+    run_parser.add_argument('--seed', type=int, default=0, help='Bootstrap and null model random seed (default: 0)')
+    run_parser.add_argument('--uncorrected', action='store_true',
+                            help='Null models count raw p < alpha instead of FDR-significant phrases')
+    run_parser.add_argument('--windows', type=int, nargs='+', default=list(DEFAULT_WINDOWS),
+                            help=f'Sliding window widths for the windows analysis (default: {MIN_BUR_VALUES})')
+    run_parser.add_argument('--edge', type=int, default=MIN_BUR_VALUES,
+                            help=f'BUR values fitted at phrase onset/close (default: {MIN_BUR_VALUES})')
+    run_parser.add_argument('--changepoint-model', choices=CHANGEPOINT_MODELS, default='linear',
+                            help='Changepoint segment model: a line or a level per segment (default: linear)')
+    run_parser.add_argument('--penalty', type=float, default=None,
+                            help='Changepoint cost per added segment (default: BIC)')
+    run_parser.add_argument('--rank-test', choices=tuple(RANK_TESTS), default='mann-kendall',
+                            help='Rank test FDR-corrected by the ranks analysis (default: mann-kendall)')
+    run_parser.add_argument('--profile', action='store_true',
+                            help='Print per-stage time, rows and peak memory at exit')
+    run_parser.add_argument('--profile-json', metavar='PATH',
+                            help='Also write every profiled stage to a JSON trace (implies --profile)')
+    run_parser.add_argument('--cprofile', metavar='PATH',
+                            help='Also dump cProfile stats of the main process (implies --profile)')
+    run_parser.add_argument('--profile-memory', action='store_true',
+                            help='Also record tracemalloc peaks per stage (slower; implies --profile)')
+    run_parser.add_argument('--jobs', '-j', type=int, default=None,
+                            help='Analyses to run at once (default: all requested; 1 = sequential)')
+    args = parser.parse_args(argv)
+
+    # Checked here rather than with choices=, which rejects an empty nargs='*' list
+    unknown = [name for name in args.analyses if name not in ANALYSES]
+    if unknown:
+        run_parser.error(f"invalid analysis: {', '.join(unknown)} (choose from {', '.join(ANALYSES)})")
+
+    if args.profile or args.profile_json or args.cprofile or args.profile_memory:
+        enable_profiling(args.profile_json, args.cprofile, args.profile_memory)
+        # Workers started without fork enable themselves from the environment
+        os.environ[PROFILE_ENV_VAR] = '1'
+
+    # Keep the requested order but drop repeats
+    analyses = list(dict.fromkeys(args.analyses or ANALYSES[:3]))
+
+    # One store for every input, in the top-level output directory
+    store_dir = None if args.no_store else resolve_store_dir(args.store_dir, args.output_dir)
+
+    for input_csv in args.input:
+        output_dir = args.output_dir
+        if len(args.input) > 1:
+            output_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(input_csv))[0])
+
+        print(f"\nCorpus: {input_csv}")
+        print("=" * 60)
+        timings = run_pipeline(
+            analyses,
+            input_csv=input_csv,
+            jobs=args.jobs,
+            output_dir=output_dir,
+            format=args.format,
+            store_dir=store_dir,
+            top=args.top,
+            hac=args.hac,
+            shards=args.shards,
+            sort=args.sort,
+            force_histograms=args.force_histograms,
+            bootstrap=args.bootstrap,
+            permutations=args.permutations,
+            seed=args.seed,
+            uncorrected=args.uncorrected,
+            windows=args.windows,
+            edge=args.edge,
+            changepoint_model=args.changepoint_model,
+            penalty=args.penalty,
+            rank_test=args.rank_test
+        )
+        print()
+        print("Pipeline timings:")
+        for name, seconds in timings.items():
+            print(f"  {name}: {seconds:.2f} s")
+        print("=" * 60)
+
+    if args.prune_store and store_dir is not None:
+        import numpy as np
+
+        keys = []
+        for input_csv in args.input:
+            phrases = load_phrasebur_phrases(input_csv)
+            keys.append(phrase_hashes(phrases['values'], phrases['offsets']))
+        pruned = prune_store(store_dir, np.concatenate(keys))
+        print(f"\nPruned {store_dir}: removed {pruned['removed']:,} stored phrases, "
+              f"kept {pruned['kept']:,} across {pruned['files']} stage files")
+
+
+if __name__ == '__main__':
+    main()
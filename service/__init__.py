@@ -0,0 +1,24 @@
+"""
+Local query service: loads a corpus once and answers JSON queries over HTTP.
+
+Submodules are imported on first use of one of their names, so importing
+the package itself does not load numpy, pandas, scipy or statsmodels.
+"""
+
+from utils.lazy import lazy_exports
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    'load_corpus_state': 'queries',
+    'corpus_summary': 'queries',
+    'query_top_artists': 'queries',
+    'query_phrases': 'queries',
+    'query_artist_trends': 'queries',
+    'query_histogram': 'queries',
+    'QueryService': 'server',
+    'serve': 'server'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Entry point for ``python -m service``: load a corpus and serve queries on localhost.
+
+Usage:
+    python -m service --input data/phrasebur_filtered.csv --port 8765
+    curl 'http://127.0.0.1:8765/artists?top=10&sort=increase_rate&alpha=0.1'
+"""
+
+import argparse
+import asyncio
+import time
+
+from utils.results_store import resolve_store_dir, DEFAULT_STORE_DIR
+from service.queries import load_corpus_state
+from service.server import serve, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_CACHE_SIZE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m service',
+                                     description='Serve BUR corpus queries as JSON over local HTTP')
+    parser.add_argument('--input', '-i', default='data/phrasebur_filtered.csv',
+                        help='PhraseBur CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', '-p', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                        help='Threads computing uncached queries (default: 4)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f'Query results kept in the LRU cache (default: {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--output-dir', '-o', default='outputs',
+                        help='Pipeline output directory whose results store is reused (default: outputs)')
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR,
+                        help=f'Per-phrase results store (default: {DEFAULT_STORE_DIR})')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Compute every phrase instead of reusing stored results')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store_dir = None if args.no_store else resolve_store_dir(args.store_dir, args.output_dir)
+    state = load_corpus_state(args.input, store_dir=store_dir)
+    print(f"Loaded {len(state['n_values'])} phrases from {args.input} in {time.perf_counter() - start:.2f} s")
+
+    def ready(address):
+        print(f"Serving on http://{address[0]}:{address[1]}/ (Ctrl+C to stop)", flush=True)
+
+    try:
+        asyncio.run(serve(state, args.host, args.port, workers=args.workers, cache_size=args.cache_size,
+                          ready=ready))
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == '__main__':
+    main()
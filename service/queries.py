@@ -0,0 +1,345 @@
+"""
+Corpus queries answered from resident per-phrase statistics.
+
+load_corpus_state() loads and groups the corpus once and computes the
+per-phrase trend fits, variation statistics and histogram grid counts the
+queries need. Each query then only filters, FDR-corrects and aggregates
+those arrays, so it costs milliseconds instead of a full CLI run.
+
+Every query takes the state and plain keyword arguments and returns a
+JSON-ready dictionary.
+"""
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_phrases, phrase_artist_codes
+from utils.results_store import cached_phrase_results, DEFAULT_STORE_DIR
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES, DEFAULT_TOP_N
+from utils.profiling import profiled
+from analysis.bur_surge_analysis import phrase_trend_stats, fdr_correction, TREND_STATS_PARAMS
+from analysis.bur_variation_analysis import phrase_variation_stats_batch, VARIATION_STATS_PARAMS
+from analysis.bur_artist_trends import phrase_sufficient_stats, grouped_trend_estimates, SUFFICIENT_STATS_PARAMS
+from visualization.bur_histograms import phrase_histogram_bins, histogram_from_grid, HISTOGRAM_STORE_PARAMS
+
+# Orderings accepted by query_top_artists
+ARTIST_SORT_KEYS = ('increase_rate', 'decrease_rate', 'phrases', 'mean_std')
+
+# Phrases returned by query_phrases unless a limit is given
+DEFAULT_PHRASE_LIMIT = 100
+
+
+def _float(value):
+    """JSON-safe float: NaN and infinities become None."""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _stage(stage, compute, phrases, params, store_dir):
+    if store_dir is None:
+        return compute(phrases['values'], phrases['offsets'])
+    return cached_phrase_results(stage, compute, phrases['values'], phrases['offsets'], params, store_dir)[0]
+
+
+@profiled(rows=lambda state: len(state['n_values']))
+def load_corpus_state(input_csv="data/phrasebur_filtered.csv", store_dir=DEFAULT_STORE_DIR):
+    """
+    Load a corpus and the per-phrase statistics every query reads.
+
+    Args:
+        input_csv: PhraseBur CSV (default: data/phrasebur_filtered.csv)
+        store_dir: Per-phrase results store (default: outputs/.phrase_results;
+                   None = compute every phrase)
+
+    Returns:
+        Dictionary containing:
+            - input: The CSV path
+            - phrases: Grouped phrase dict (see utils.data_utils.group_phrases)
+            - artist_code: Artist code of every phrase
+            - n_values: Phrase lengths
+            - trends: Per-phrase arrays from phrase_trend_stats
+            - std_bur: Per-phrase BUR standard deviation
+            - grid_counts, bur_min, bur_max: Per-phrase histogram grid counts
+            - sufficient_stats: Per-phrase arrays from phrase_sufficient_stats
+
+    Note:
+        Treat the state as read-only; queries share it across threads.
+    """
+    phrases = load_phrasebur_phrases(input_csv)
+    trends = _stage('trend', phrase_trend_stats, phrases, TREND_STATS_PARAMS, store_dir)
+    variation = _stage('variation', phrase_variation_stats_batch, phrases, VARIATION_STATS_PARAMS, store_dir)
+    bins = _stage('histogram_bins', phrase_histogram_bins, phrases, HISTOGRAM_STORE_PARAMS, store_dir)
+    sufficient = _stage('sufficient_stats', phrase_sufficient_stats, phrases, SUFFICIENT_STATS_PARAMS, store_dir)
+    return {
+        'input': input_csv,
+        'phrases': phrases,
+        'artist_code': phrase_artist_codes(phrases),
+        'n_values': np.diff(phrases['offsets']),
+        'trends': trends,
+        'std_bur': variation['std_bur'],
+        'grid_counts': bins['grid_counts'],
+        'bur_min': bins['bur_min'],
+        'bur_max': bins['bur_max'],
+        'sufficient_stats': sufficient
+    }
+
+
+def artist_lookup(state, artist):
+    """
+    Artist code for a name ('Art Pepper') or id prefix ('ArtPepper'), case-insensitive.
+
+    Raises:
+        KeyError: If no artist matches
+    """
+    key = artist.replace(' ', '').lower()
+    for code, name in enumerate(state['phrases']['artists']):
+        if name.replace(' ', '').lower() == key:
+            return code
+    raise KeyError(f"Unknown artist: {artist}")
+
+
+def _selection(state, min_length, artist):
+    """Phrases with a trend fit, at least min_length values and (optionally) one artist."""
+    keep = state['n_values'] >= max(min_length, MIN_BUR_VALUES)
+    if artist is not None:
+        keep &= state['artist_code'] == artist_lookup(state, artist)
+    return np.flatnonzero(keep)
+
+
+def _significance(state, selected, alpha, robust):
+    """FDR decisions and corrected p-values over the selected phrases only."""
+    p_values = state['trends']['hac_p_value' if robust else 'p_value'][selected]
+    if len(selected) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0)
+    reject, p_corrected = fdr_correction(p_values, alpha=alpha)
+    return np.asarray(reject, dtype=bool), np.asarray(p_corrected, dtype=float)
+
+
+def corpus_summary(state):
+    """Corpus size and the artists available to filter on."""
+    phrases = state['phrases']
+    return {
+        'input': state['input'],
+        'n_values': int(len(phrases['values'])),
+        'n_phrases': int(len(state['n_values'])),
+        'n_testable': int((state['n_values'] >= MIN_BUR_VALUES).sum()),
+        'artists': phrases['artists'].tolist()
+    }
+
+
+@profiled()
+def query_top_artists(state, top=DEFAULT_TOP_N, sort='increase_rate', min_length=MIN_BUR_VALUES,
+                      alpha=FDR_ALPHA, robust=False, min_phrases=1):
+    """
+    Rank artists by surge rate, phrase count or mean phrase variation.
+
+    Args:
+        state: Corpus state from load_corpus_state
+        top: Artists to return (default from config: 20)
+        sort: One of ARTIST_SORT_KEYS, largest first (default: increase_rate)
+        min_length: Only phrases with at least this many BUR values (never below MIN_BUR_VALUES)
+        alpha: FDR level, applied over the selected phrases (default from config: 0.05)
+        robust: FDR-correct the Newey-West (HAC) p-values instead of the OLS ones
+        min_phrases: Skip artists with fewer selected phrases
+
+    Returns:
+        Dictionary with the query parameters, n_phrases, n_increase, n_decrease
+        and 'artists': one record per artist with phrases, increase, decrease,
+        increase_rate, decrease_rate and mean_std
+    """
+    if sort not in ARTIST_SORT_KEYS:
+        raise ValueError(f"sort must be one of {ARTIST_SORT_KEYS}, got {sort!r}")
+    selected = _selection(state, min_length, None)
+    reject, _ = _significance(state, selected, alpha, robust)
+    slope = state['trends']['slope'][selected]
+    increase = reject & (slope > 0)
+    decrease = reject & (slope < 0)
+
+    n_artists = len(state['phrases']['artists'])
+    code = state['artist_code'][selected]
+    counts = np.bincount(code, minlength=n_artists)
+    n_increase = np.bincount(code, weights=increase, minlength=n_artists)
+    n_decrease = np.bincount(code, weights=decrease, minlength=n_artists)
+    std_sum = np.bincount(code, weights=state['std_bur'][selected], minlength=n_artists)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        columns = {
+            'phrases': counts.astype(float),
+            'increase_rate': n_increase / counts,
+            'decrease_rate': n_decrease / counts,
+            'mean_std': std_sum / counts
+        }
+
+    eligible = np.flatnonzero(counts >= max(min_phrases, 1))
+    # Largest first; ties broken by phrase count, then name order
+    order = eligible[np.lexsort((-counts[eligible], -columns[sort][eligible]))]
+    return {
+        'sort': sort,
+        'min_length': min_length,
+        'alpha': alpha,
+        'hac': robust,
+        'n_phrases': int(len(selected)),
+        'n_increase': int(increase.sum()),
+        'n_decrease': int(decrease.sum()),
+        'artists': [
+            {
+                'artist': str(state['phrases']['artists'][i]),
+                'phrases': int(counts[i]),
+                'increase': int(n_increase[i]),
+                'decrease': int(n_decrease[i]),
+                'increase_rate': _float(columns['increase_rate'][i]),
+                'decrease_rate': _float(columns['decrease_rate'][i]),
+                'mean_std': _float(columns['mean_std'][i])
+            }
+            for i in order[:top]
+        ]
+    }
+
+
+@profiled()
+def query_artist_trends(state, artist=None, min_length=MIN_BUR_VALUES, alpha=FDR_ALPHA, top=DEFAULT_TOP_N):
+    """
+    Pooled and random-slope BUR trends per artist (see analysis.bur_artist_trends).
+
+    Args:
+        state: Corpus state from load_corpus_state
+        artist: Only this artist (name or id prefix; default: all)
+        min_length: Only phrases with at least this many BUR values (never below MIN_BUR_VALUES)
+        alpha: FDR level, applied over the random-slope p-values of all artists
+        top: Artists to return, steepest random-slope increase first
+
+    Returns:
+        Dictionary with the query parameters and 'artists': records with
+        artist, n_phrases, slope, std_err, ci_lower, ci_upper, p_value,
+        p_value_corrected, significant_fdr, tau2, i2, pooled_slope and
+        pooled_p_value
+
+    Note:
+        Only sums the stored per-phrase sufficient statistics per artist, so
+        any min_length costs one pass over the phrases.
+    """
+    n_artists = len(state['phrases']['artists'])
+    estimates = grouped_trend_estimates(state['sufficient_stats'], state['artist_code'], n_artists,
+                                        min_values=max(min_length, MIN_BUR_VALUES))
+    testable = np.flatnonzero(~np.isnan(estimates['p_value']))
+    reject = np.zeros(n_artists, dtype=bool)
+    p_corrected = np.full(n_artists, np.nan)
+    if len(testable):
+        testable_reject, testable_p = fdr_correction(estimates['p_value'][testable], alpha=alpha)
+        reject[testable] = testable_reject
+        p_corrected[testable] = testable_p
+
+    present = np.flatnonzero(estimates['n_phrases'] > 0)
+    if artist is not None:
+        present = present[present == artist_lookup(state, artist)]
+    order = present[np.lexsort((-estimates['n_phrases'][present], -np.nan_to_num(estimates['slope'][present],
+                                                                                  nan=-np.inf)))]
+    return {
+        'artist': artist,
+        'min_length': min_length,
+        'alpha': alpha,
+        'artists': [
+            {
+                'artist': str(state['phrases']['artists'][i]),
+                'n_phrases': int(estimates['n_phrases'][i]),
+                **{key: _float(estimates[key][i]) for key in ('slope', 'std_err', 'ci_lower', 'ci_upper', 'p_value')},
+                'p_value_corrected': _float(p_corrected[i]),
+                'significant_fdr': bool(reject[i]),
+                **{key: _float(estimates[key][i]) for key in ('tau2', 'i2', 'pooled_slope', 'pooled_p_value')}
+            }
+            for i in order[:top]
+        ]
+    }
+
+
+@profiled()
+def query_phrases(state, artist=None, min_length=MIN_BUR_VALUES, alpha=FDR_ALPHA, robust=False,
+                  significant=False, limit=DEFAULT_PHRASE_LIMIT):
+    """
+    Per-phrase trend results, FDR-corrected over the selected phrases.
+
+    Args:
+        state: Corpus state from load_corpus_state
+        artist: Only this artist's phrases (name or id prefix; default: all)
+        min_length: Only phrases with at least this many BUR values (never below MIN_BUR_VALUES)
+        alpha: FDR level (default from config: 0.05)
+        robust: FDR-correct the Newey-West (HAC) p-values instead of the OLS ones
+        significant: Only return FDR-significant phrases
+        limit: Phrases to return, smallest corrected p-value first (None = all)
+
+    Returns:
+        Dictionary with the query parameters, n_phrases, n_significant and
+        'phrases': records with id, seg_id, artist, n_values, slope, p_value,
+        hac_p_value, p_value_corrected, significant_fdr, std_bur and best_model
+
+    Note:
+        FDR correction runs over the selected phrases, so restricting to one
+        artist corrects for that artist's tests only.
+    """
+    selected = _selection(state, min_length, artist)
+    reject, p_corrected = _significance(state, selected, alpha, robust)
+    order = np.argsort(p_corrected, kind='stable')
+    if significant:
+        order = order[reject[order]]
+    if limit is not None:
+        order = order[:limit]
+
+    phrases = state['phrases']
+    trends = state['trends']
+    records = []
+    for i in order:
+        phrase = selected[i]
+        records.append({
+            'id': str(phrases['solo_ids'][phrases['solo_code'][phrase]]),
+            'seg_id': int(phrases['seg_id'][phrase]),
+            'artist': str(phrases['artists'][state['artist_code'][phrase]]),
+            'n_values': int(state['n_values'][phrase]),
+            'slope': _float(trends['slope'][phrase]),
+            'p_value': _float(trends['p_value'][phrase]),
+            'hac_p_value': _float(trends['hac_p_value'][phrase]),
+            'p_value_corrected': _float(p_corrected[i]),
+            'significant_fdr': bool(reject[i]),
+            'std_bur': _float(state['std_bur'][phrase]),
+            'best_model': str(trends['best_model'][phrase])
+        })
+    return {
+        'artist': artist,
+        'min_length': min_length,
+        'alpha': alpha,
+        'hac': robust,
+        'n_phrases': int(len(selected)),
+        'n_significant': int(reject.sum()),
+        'phrases': records
+    }
+
+
+@profiled()
+def query_histogram(state, artist, min_length=1):
+    """
+    One performer's BUR histogram, binned as in the histogram CLI.
+
+    Args:
+        state: Corpus state from load_corpus_state
+        artist: Artist name or id prefix
+        min_length: Only phrases with at least this many BUR values (default: all)
+
+    Returns:
+        Dictionary with artist, n_phrases, n_values, bin_edges and counts
+        (empty lists if no phrase is selected)
+    """
+    code = artist_lookup(state, artist)
+    selected = np.flatnonzero((state['artist_code'] == code) & (state['n_values'] >= max(min_length, 1)))
+    result = {
+        'artist': str(state['phrases']['artists'][code]),
+        'n_phrases': int(len(selected)),
+        'n_values': int(state['n_values'][selected].sum()),
+        'bin_edges': [],
+        'counts': []
+    }
+    if len(selected):
+        bin_edges, counts = histogram_from_grid(
+            state['grid_counts'][selected].sum(axis=0),
+            state['bur_min'][selected].min(),
+            state['bur_max'][selected].max()
+        )
+        result['bin_edges'] = np.round(bin_edges, 1).tolist()
+        result['counts'] = np.asarray(counts).tolist()
+    return result
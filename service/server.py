@@ -0,0 +1,365 @@
+"""
+Local HTTP/JSON query service.
+
+Loads a corpus once (see service.queries.load_corpus_state) and answers
+GET requests from an asyncio front end:
+
+    /corpus                     corpus size and artist names
+    /artists?top=&sort=&min_length=&alpha=&hac=&min_phrases=
+    /phrases?artist=&min_length=&alpha=&hac=&significant=&limit=
+    /artist_trends?artist=&min_length=&alpha=&top=
+    /histogram?artist=&min_length=
+    /stats                      cache and request counters
+
+Concurrency:
+- One event loop parses requests and serves cache hits directly
+- Cache misses run in a thread pool; the per-phrase arrays are shared
+  read-only and numpy releases the GIL for the heavy parts
+- Identical queries that arrive while one is being computed wait for it
+  instead of computing it again
+- Results are kept in a bounded LRU cache keyed by the normalized query
+
+The service binds to localhost by default and has no authentication; do not
+expose it beyond the local machine.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES, DEFAULT_TOP_N
+from .queries import (
+    corpus_summary,
+    query_top_artists,
+    query_phrases,
+    query_artist_trends,
+    query_histogram,
+    DEFAULT_PHRASE_LIMIT
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Query results kept in the LRU cache
+DEFAULT_CACHE_SIZE = 1024
+
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15
+
+# Largest request head (request line + headers) accepted, in bytes
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class QueryCache:
+    """Bounded LRU cache of query results; used from the event loop thread only."""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def _flag(value):
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off', ''):
+        return False
+    raise ValueError(f"expected a boolean, got {value!r}")
+
+
+def _count(value):
+    count = int(value)
+    if count < 0:
+        raise ValueError(f"expected a non-negative integer, got {value!r}")
+    return count
+
+
+def _optional_count(value):
+    return None if value.lower() in ('', 'all', 'none') else _count(value)
+
+
+def _alpha(value):
+    alpha = float(value)
+    if not 0 < alpha < 1:
+        raise ValueError(f"expected a number between 0 and 1, got {value!r}")
+    return alpha
+
+
+# Route -> (query function, {parameter: (keyword, parser, default)})
+ROUTES = {
+    '/artists': (query_top_artists, {
+        'top': ('top', _count, DEFAULT_TOP_N),
+        'sort': ('sort', str, 'increase_rate'),
+        'min_length': ('min_length', _count, MIN_BUR_VALUES),
+        'alpha': ('alpha', _alpha, FDR_ALPHA),
+        'hac': ('robust', _flag, False),
+        'min_phrases': ('min_phrases', _count, 1)
+    }),
+    '/phrases': (query_phrases, {
+        'artist': ('artist', str, None),
+        'min_length': ('min_length', _count, MIN_BUR_VALUES),
+        'alpha': ('alpha', _alpha, FDR_ALPHA),
+        'hac': ('robust', _flag, False),
+        'significant': ('significant', _flag, False),
+        'limit': ('limit', _optional_count, DEFAULT_PHRASE_LIMIT)
+    }),
+    '/artist_trends': (query_artist_trends, {
+        'artist': ('artist', str, None),
+        'min_length': ('min_length', _count, MIN_BUR_VALUES),
+        'alpha': ('alpha', _alpha, FDR_ALPHA),
+        'top': ('top', _count, DEFAULT_TOP_N)
+    }),
+    '/histogram': (query_histogram, {
+        'artist': ('artist', str, None),
+        'min_length': ('min_length', _count, 1)
+    })
+}
+
+
+def parse_query(path, query_string):
+    """
+    Keyword arguments for a route's query function from a URL query string.
+
+    Returns:
+        Tuple of (query function, kwargs)
+
+    Raises:
+        LookupError: Unknown route
+        ValueError: Unknown, repeated, malformed, out-of-range or missing parameter
+            (alpha must be in (0, 1); counts and lengths must be >= 0)
+    """
+    if path not in ROUTES:
+        raise LookupError(f"Unknown path: {path}")
+    func, spec = ROUTES[path]
+    given = parse_qsl(query_string, keep_blank_values=True)
+    names = [name for name, _ in given]
+    unknown = sorted(set(names) - set(spec))
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for {path}: {', '.join(unknown)} (expected {', '.join(spec)})")
+    repeated = sorted({name for name in names if names.count(name) > 1})
+    if repeated:
+        raise ValueError(f"Repeated parameter(s): {', '.join(repeated)}")
+
+    kwargs = {keyword: default for keyword, _, default in spec.values()}
+    for name, raw in given:
+        keyword, parse, _ = spec[name]
+        try:
+            kwargs[keyword] = parse(raw)
+        except ValueError:
+            raise ValueError(f"Invalid value for {name}: {raw!r}") from None
+    if path == '/histogram' and kwargs['artist'] is None:
+        raise ValueError("/histogram needs an artist parameter")
+    return func, kwargs
+
+
+class QueryService:
+    """
+    Serves queries over one resident corpus state.
+
+    Args:
+        state: Corpus state from service.queries.load_corpus_state
+        workers: Threads computing cache misses (default: 4)
+        cache_size: Query results kept in the LRU cache (default: 1024; 0 = no cache)
+    """
+
+    def __init__(self, state, workers=4, cache_size=DEFAULT_CACHE_SIZE):
+        self.state = state
+        self.cache = QueryCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='phrasebur-query')
+        self.pending = {}
+        self.requests = 0
+        self.errors = 0
+        self.started = time.time()
+
+    async def answer(self, path, query_string):
+        """
+        JSON body bytes for one request.
+
+        Returns:
+            Tuple of (HTTPStatus, body bytes)
+        """
+        self.requests += 1
+        if path == '/corpus':
+            return HTTPStatus.OK, _encode(corpus_summary(self.state))
+        if path == '/stats':
+            return HTTPStatus.OK, _encode(self.stats())
+        try:
+            func, kwargs = parse_query(path, query_string)
+        except LookupError as error:
+            return self._error(HTTPStatus.NOT_FOUND, error)
+        except ValueError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, error)
+
+        key = (path, tuple(sorted(kwargs.items())))
+        body = self.cache.get(key)
+        if body is not None:
+            return HTTPStatus.OK, body
+
+        # Join an identical query that is already running; shielded so a
+        # client hanging up does not cancel the work for the others
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self._compute, func, kwargs)
+            self.pending[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        del self.pending[key]
+        if not future.cancelled() and future.exception() is None:
+            status, body = future.result()
+            if status == HTTPStatus.OK:
+                self.cache.put(key, body)
+
+    def _compute(self, func, kwargs):
+        try:
+            result = func(self.state, **kwargs)
+        except KeyError as error:
+            return self._error(HTTPStatus.NOT_FOUND, error.args[0])
+        except ValueError as error:
+            return self._error(HTTPStatus.BAD_REQUEST, error)
+        except Exception as error:
+            # Anything else is a bug; answer it rather than fail every waiting request
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(error).__name__}: {error}")
+        try:
+            return HTTPStatus.OK, _encode(result)
+        except (TypeError, ValueError) as error:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Result is not valid JSON: {error}")
+
+    def _error(self, status, message):
+        self.errors += 1
+        return status, _encode({'error': str(message)})
+
+    def stats(self):
+        return {
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': len(self.pending),
+            'cache': self.cache.stats()
+        }
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes or idles out."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await _respond(writer, *self._error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                                        'Request head too large'), keep_alive=False)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                parts = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    await _respond(writer, *self._error(HTTPStatus.BAD_REQUEST, 'Malformed request line'),
+                                   keep_alive=False)
+                    break
+                method, target, version = parts
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive')
+
+                if headers.get('content-length', '0') not in ('', '0') or 'transfer-encoding' in headers:
+                    # Queries have no body; refuse rather than leave it in the stream
+                    await _respond(writer, *self._error(HTTPStatus.BAD_REQUEST, 'Request bodies are not accepted'),
+                                   keep_alive=False)
+                    break
+                if method not in ('GET', 'HEAD'):
+                    status, body = self._error(HTTPStatus.METHOD_NOT_ALLOWED, 'Only GET and HEAD are supported')
+                    await _respond(writer, status, body, keep_alive=keep_alive, headers={'Allow': 'GET, HEAD'})
+                else:
+                    url = urlsplit(target)
+                    status, body = await self.answer(url.path.rstrip('/') or '/', url.query)
+                    await _respond(writer, status, body, keep_alive=keep_alive, head_only=method == 'HEAD')
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _encode(payload):
+    """Strict JSON: NaN and infinities raise ValueError instead of producing invalid JSON."""
+    return json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+
+
+async def _respond(writer, status, body, keep_alive=True, head_only=False, headers=None):
+    extra = ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"{extra}"
+        f"\r\n"
+    ).encode('latin-1')
+    writer.write(head if head_only else head + body)
+    await writer.drain()
+
+
+async def serve(state, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, cache_size=DEFAULT_CACHE_SIZE,
+                ready=None):
+    """
+    Serve queries over a loaded corpus until cancelled.
+
+    Args:
+        state: Corpus state from service.queries.load_corpus_state
+        host, port: Address to listen on (default: 127.0.0.1:8765; port 0 = any free port)
+        workers: Threads computing cache misses (default: 4)
+        cache_size: Query results kept in the LRU cache (default: 1024)
+        ready: Optional callback called with the bound (host, port) once listening
+    """
+    service = QueryService(state, workers=workers, cache_size=cache_size)
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+    try:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
@@ -0,0 +1,74 @@
+"""
+Shared fixtures: a small seeded corpus in the flat values/offsets layout.
+"""
+
+import numpy as np
+import pytest
+
+
+def make_corpus(seed=0, n_phrases=60, min_length=2, max_length=24):
+    """
+    Random BUR phrases with trends, noise, ties and a constant phrase.
+
+    Returns:
+        Tuple of (values, offsets) as used by the batch analyses
+    """
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(min_length, max_length + 1, size=n_phrases)
+    phrases = []
+    for index, n in enumerate(lengths):
+        x = np.arange(n)
+        y = 1.5 + rng.normal(0, 0.05, 1) * x + rng.lognormal(-1.5, 0.4, n)
+        if index % 7 == 0:
+            y = np.round(y, 1)  # ties, as in MeloSpy's rounded exports
+        phrases.append(y)
+    phrases.append(np.full(8, 1.25))
+    offsets = np.concatenate([[0], np.cumsum([len(y) for y in phrases])])
+    return np.concatenate(phrases), offsets
+
+
+@pytest.fixture
+def corpus():
+    return make_corpus()
+
+
+@pytest.fixture
+def phrase_list(corpus):
+    values, offsets = corpus
+    return [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+ARTISTS = ('ArtPepper', 'BenWebster', 'JohnColtrane', 'SonnyRollins')
+
+
+def make_corpus_frame(seed=0, n_solos=12, phrases_per_solo=8):
+    """
+    PhraseBur rows (id;seg_type;seg_id;swing_ratios) for a few solos per artist.
+
+    About a third of the phrases carry a strong upward trend, so the FDR
+    step has something to find.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    for solo in range(n_solos):
+        solo_id = f'{ARTISTS[solo % len(ARTISTS)]}_Tune{solo:02d}_FINAL.sv'
+        for seg_id in range(1, phrases_per_solo + 1):
+            n = int(rng.integers(3, 20))
+            slope = 0.08 if rng.random() < 0.35 else 0.0
+            bur = 1.4 + slope * np.arange(n) + rng.normal(0, 0.12, n)
+            rows.extend((solo_id, 'phrases', seg_id, value) for value in bur)
+    return pd.DataFrame(rows, columns=['id', 'seg_type', 'seg_id', 'swing_ratios'])
+
+
+@pytest.fixture
+def corpus_frame():
+    return make_corpus_frame()
+
+
+@pytest.fixture
+def corpus_csv(tmp_path, corpus_frame):
+    path = tmp_path / 'phrasebur_filtered.csv'
+    corpus_frame.to_csv(path, sep=';', index=False)
+    return str(path)
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from scipy import stats
+from statsmodels.stats.meta_analysis import combine_effects
+
+from analysis.bur_artist_trends import grouped_trend_estimates, phrase_sufficient_stats
+from utils.config import CONFIDENCE_LEVEL, MIN_BUR_VALUES
+from utils.data_utils import group_phrases, phrase_artist_codes
+
+
+@pytest.fixture
+def artist_phrases(corpus_frame):
+    phrases = group_phrases(corpus_frame)
+    artist_code = phrase_artist_codes(phrases)
+    offsets = phrases['offsets']
+    phrase_list = [phrases['values'][start:stop].astype(float) for start, stop in zip(offsets[:-1], offsets[1:])]
+    return phrases, artist_code, phrase_list
+
+
+def test_sufficient_stats_match_direct_sums(corpus, phrase_list):
+    sufficient = phrase_sufficient_stats(*corpus)
+    for index, y in enumerate(phrase_list):
+        x = np.arange(len(y), dtype=float)
+        np.testing.assert_allclose(
+            [sufficient[key][index] for key in ('sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'sum_yy')],
+            [x.sum(), y.sum(), (x * x).sum(), (x * y).sum(), (y * y).sum()], rtol=1e-12
+        )
+
+
+def test_pooled_slope_matches_fixed_effects_ols(artist_phrases):
+    phrases, artist_code, phrase_list = artist_phrases
+    n_artists = len(phrases['artists'])
+    result = grouped_trend_estimates(phrase_sufficient_stats(phrases['values'], phrases['offsets']),
+                                     artist_code, n_artists)
+
+    for artist in range(n_artists):
+        members = [y for y, code in zip(phrase_list, artist_code) if code == artist and len(y) >= MIN_BUR_VALUES]
+        assert result['n_phrases'][artist] == len(members)
+        assert result['n_values'][artist] == sum(len(y) for y in members)
+        # BUR on position with one dummy per phrase (no global constant)
+        x = np.concatenate([np.arange(len(y), dtype=float) for y in members])
+        dummies = np.repeat(np.eye(len(members)), [len(y) for y in members], axis=0)
+        fit = sm.OLS(np.concatenate(members), np.column_stack([x, dummies])).fit()
+        np.testing.assert_allclose(result['pooled_slope'][artist], fit.params[0], rtol=1e-9)
+        np.testing.assert_allclose(result['pooled_std_err'][artist], fit.bse[0], rtol=1e-9)
+        np.testing.assert_allclose(result['pooled_p_value'][artist], fit.pvalues[0], rtol=1e-6, atol=1e-300)
+
+
+def test_random_slope_matches_dersimonian_laird(artist_phrases):
+    phrases, artist_code, phrase_list = artist_phrases
+    n_artists = len(phrases['artists'])
+    result = grouped_trend_estimates(phrase_sufficient_stats(phrases['values'], phrases['offsets']),
+                                     artist_code, n_artists)
+
+    for artist in range(n_artists):
+        fits = [stats.linregress(np.arange(len(y)), y) for y, code in zip(phrase_list, artist_code)
+                if code == artist and len(y) >= MIN_BUR_VALUES]
+        meta = combine_effects(np.array([fit.slope for fit in fits]),
+                               np.array([fit.stderr ** 2 for fit in fits]), method_re='dl')
+        np.testing.assert_allclose(result['slope'][artist], meta.mean_effect_re, rtol=1e-8)
+        np.testing.assert_allclose(result['std_err'][artist], meta.sd_eff_w_re, rtol=1e-8)
+        np.testing.assert_allclose(result['tau2'][artist], meta.tau2, rtol=1e-8, atol=1e-14)
+        np.testing.assert_allclose(result['q_statistic'][artist], meta.q, rtol=1e-8)
+        np.testing.assert_allclose(result['i2'][artist], max(meta.i2, 0.0), rtol=1e-8, atol=1e-14)
+        lower, upper = stats.norm.interval(CONFIDENCE_LEVEL, meta.mean_effect_re, meta.sd_eff_w_re)
+        np.testing.assert_allclose([result['ci_lower'][artist], result['ci_upper'][artist]], [lower, upper], rtol=1e-8)
+        np.testing.assert_allclose(result['p_value'][artist],
+                                   2 * stats.norm.sf(abs(meta.mean_effect_re / meta.sd_eff_w_re)), rtol=1e-6)
+
+
+def test_mask_equals_refit_on_subset(artist_phrases):
+    phrases, artist_code, _ = artist_phrases
+    n_artists = len(phrases['artists'])
+    sufficient = phrase_sufficient_stats(phrases['values'], phrases['offsets'])
+    mask = phrases['seg_id'] % 2 == 0
+    masked = grouped_trend_estimates(sufficient, artist_code, n_artists, mask=mask)
+    subset = grouped_trend_estimates({key: column[mask] for key, column in sufficient.items()},
+                                     artist_code[mask], n_artists)
+    for key in ('pooled_slope', 'slope', 'std_err', 'tau2'):
+        np.testing.assert_allclose(masked[key], subset[key], rtol=1e-12)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from analysis.bur_bootstrap import grouped_bootstrap_means
+
+
+def reference_bootstrap(stats, group_code, n_resamples, seed, confidence):
+    """Loop version: each resample redraws every group's phrases from the same uniform stream."""
+    rng = np.random.default_rng(seed)
+    groups = np.unique(group_code)
+    members = {group: stats[group_code == group] for group in groups}
+    means = np.empty((n_resamples, len(groups)))
+    for resample in range(n_resamples):
+        uniforms = rng.random(len(stats))
+        start = 0
+        for column, group in enumerate(groups):
+            count = len(members[group])
+            index = (uniforms[start:start + count] * count).astype(np.int64)
+            means[resample, column] = members[group][index].mean()
+            start += count
+    tail = (1 - confidence) / 2
+    return groups, np.quantile(means, [tail, 1 - tail], axis=0)
+
+
+@pytest.fixture
+def grouped_stats():
+    rng = np.random.default_rng(7)
+    group_code = rng.integers(0, 5, 120)
+    group_code[group_code == 3] = 4  # an empty group
+    return rng.normal(1.5, 0.3, 120), group_code
+
+
+def test_matches_loop_reference(grouped_stats):
+    stats, group_code = grouped_stats
+    result = grouped_bootstrap_means(stats, group_code, n_groups=6, n_resamples=300, seed=11, confidence=0.9)
+    groups, (lower, upper) = reference_bootstrap(stats, group_code, 300, 11, 0.9)
+    np.testing.assert_allclose(result['ci_lower'][groups], lower, rtol=1e-12)
+    np.testing.assert_allclose(result['ci_upper'][groups], upper, rtol=1e-12)
+    for group in groups:
+        np.testing.assert_allclose(result['mean'][group], stats[group_code == group].mean())
+    assert result['n'].tolist() == np.bincount(group_code, minlength=6).tolist()
+    assert np.isnan(result['mean'][[3, 5]]).all() and np.isnan(result['ci_lower'][[3, 5]]).all()
+
+
+def test_chunking_does_not_change_intervals(grouped_stats):
+    stats, group_code = grouped_stats
+    stacked = np.column_stack([stats, stats > 1.5])
+    whole = grouped_bootstrap_means(stacked, group_code, n_resamples=200, seed=1)
+    chunked = grouped_bootstrap_means(stacked, group_code, n_resamples=200, seed=1, max_bytes=1)
+    for key in ('mean', 'ci_lower', 'ci_upper'):
+        np.testing.assert_array_equal(whole[key], chunked[key])
+
+
+def test_interval_width_matches_normal_approximation():
+    stats = np.random.default_rng(3).normal(0, 1, 400)
+    result = grouped_bootstrap_means(stats, np.zeros(400, dtype=int), n_resamples=4000, seed=0)
+    half_width = 1.959964 * stats.std() / np.sqrt(len(stats))
+    np.testing.assert_allclose(result['ci_upper'][0] - result['ci_lower'][0], 2 * half_width, rtol=0.1)
@@ -0,0 +1,96 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from analysis.bur_changepoints import multiple_changepoints_batch, single_changepoint_batch
+from utils.config import CHANGEPOINT_MIN_SEGMENT
+
+from .conftest import make_corpus
+
+
+def segment_rss(y, model):
+    """Residual sum of squares of a least-squares line or level."""
+    if model == 'mean':
+        return np.sum((y - y.mean()) ** 2)
+    x = np.arange(len(y))
+    slope, intercept = np.polyfit(x, y, 1)
+    return np.sum((y - slope * x - intercept) ** 2)
+
+
+def split_cost(y, breaks, model):
+    bounds = [0, *breaks, len(y)]
+    return sum(segment_rss(y[start:stop], model) for start, stop in zip(bounds[:-1], bounds[1:]))
+
+
+def noise_variance(y):
+    diffs = np.diff(y)
+    variance = (stats.median_abs_deviation(diffs) / 0.6745) ** 2 / 2
+    variance = variance if variance > 0 else np.mean(diffs ** 2) / 2
+    return max(variance, np.finfo(float).tiny)
+
+
+@pytest.fixture
+def short_phrases():
+    values, offsets = make_corpus(seed=5, n_phrases=40, min_length=4, max_length=16)
+    return values, offsets, [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+
+@pytest.mark.parametrize('model', ['linear', 'mean'])
+def test_single_break_matches_exhaustive_search(short_phrases, model):
+    values, offsets, phrase_list = short_phrases
+    m = CHANGEPOINT_MIN_SEGMENT
+    result = single_changepoint_batch(values, offsets, model=model)
+
+    for index, y in enumerate(phrase_list):
+        if len(y) < 2 * m:
+            assert result['break_position'][index] == -1 and np.isnan(result['lr_statistic'][index])
+            continue
+        if np.ptp(y) == 0:
+            assert np.isnan(result['lr_statistic'][index])  # 0 / 0: nothing to explain
+            continue
+        costs = {b: split_cost(y, [b], model) for b in range(m, len(y) - m + 1)}
+        position = result['break_position'][index]
+        best_cost = min(costs.values())
+        np.testing.assert_allclose(costs[position], best_cost, rtol=1e-9, atol=1e-12)
+        pre, post = y[:position], y[position:]
+        np.testing.assert_allclose(result['pre_mean'][index], pre.mean(), rtol=1e-12)
+        np.testing.assert_allclose(result['post_mean'][index], post.mean(), rtol=1e-12)
+        np.testing.assert_allclose(result['pre_slope'][index], stats.linregress(np.arange(len(pre)), pre).slope,
+                                   rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(result['post_slope'][index], stats.linregress(np.arange(len(post)), post).slope,
+                                   rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(result['lr_statistic'][index],
+                                   len(y) * np.log(segment_rss(y, model) / best_cost), rtol=1e-7, atol=1e-10)
+
+
+@pytest.mark.parametrize('model, penalty', [('linear', None), ('mean', None), ('mean', 1.0)])
+def test_multiple_breaks_match_exhaustive_search(short_phrases, model, penalty):
+    values, offsets, phrase_list = short_phrases
+    m = CHANGEPOINT_MIN_SEGMENT
+    result = multiple_changepoints_batch(values, offsets, model=model, penalty=penalty)
+
+    for index, y in enumerate(phrase_list):
+        found = result['breaks'][result['break_offsets'][index]:result['break_offsets'][index + 1]]
+        assert len(found) == result['n_breaks'][index]
+        if len(y) < 2 * m:
+            assert len(found) == 0
+            continue
+        beta = penalty if penalty is not None else (3 if model == 'linear' else 2) * np.log(len(y))
+        if np.ptp(y) == 0:
+            assert len(found) == 0
+            continue
+        sigma2 = noise_variance(y)
+
+        def objective(breaks):
+            return split_cost(y, breaks, model) / sigma2 + beta * len(breaks)
+
+        candidates = [
+            breaks for k in range(len(y) // m)
+            for breaks in combinations(range(m, len(y) - m + 1), k)
+            if all(b - a >= m for a, b in zip((0, *breaks), (*breaks, len(y))))
+        ]
+        best = min(objective(breaks) for breaks in candidates)
+        assert (np.diff(found) >= m).all()
+        np.testing.assert_allclose(objective(tuple(found)), best, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,56 @@
+import filecmp
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.clean_data as clean_data
+from utils.clean_data import clean_phrasebur_data, clean_phrasebur_data_streaming
+
+
+def export_frame(solo_ids, seed=0):
+    """Rows of an export listing each solo's phrases in seg_id order."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for solo_id in solo_ids:
+        for seg_id in range(1, rng.integers(2, 6)):
+            for _ in range(rng.integers(1, 12)):
+                rows.append((solo_id, 'phrases', seg_id, rng.uniform(0.8, 3.0)))
+    return pd.DataFrame(rows, columns=['id', 'seg_type', 'seg_id', 'swing_ratios'])
+
+
+SOLOS = ['ArtPepper_Anthropology_FINAL.sv', 'BenWebster_ByeByeBlackbird_FINAL.sv',
+         'BennyGoodman_Whispering_FINAL.sv', 'JohnColtrane_BlueTrain_FINAL.sv',
+         'JohnColtrane_BluesByFive_FINAL.sv', 'SonnyRollins_Airegin_FINAL.sv']
+
+
+@pytest.fixture
+def no_fallback(monkeypatch):
+    def fail(*args):
+        raise AssertionError('fell back to the two-pass cleaner')
+    monkeypatch.setattr(clean_data, '_clean_two_pass_stream', fail)
+
+
+@pytest.mark.parametrize('order', [sorted, lambda ids: sorted(ids, key=str.casefold)])
+@pytest.mark.parametrize('chunksize', [7, 50, 100_000])
+def test_sorted_input_streams_in_one_pass(tmp_path, no_fallback, order, chunksize):
+    raw = tmp_path / 'raw.csv'
+    export_frame(order(SOLOS)).to_csv(raw, sep=';', index=False)
+    expected = clean_phrasebur_data(str(raw), str(tmp_path / 'expected.csv'))
+    stats = clean_phrasebur_data_streaming(str(raw), str(tmp_path / 'streamed.csv'), chunksize=chunksize)
+    assert stats == expected
+    assert filecmp.cmp(tmp_path / 'expected.csv', tmp_path / 'streamed.csv', shallow=False)
+
+
+@pytest.mark.parametrize('chunksize', [7, 100_000])
+def test_unsorted_input_falls_back_to_two_passes(tmp_path, chunksize):
+    df = export_frame(sorted(SOLOS))
+    # Move one solo's first phrase to the end, so that phrase id repeats
+    repeated = df[(df['id'] == SOLOS[0]) & (df['seg_id'] == 1)]
+    df = pd.concat([df.drop(repeated.index), repeated, repeated.iloc[:1]])
+    raw = tmp_path / 'raw.csv'
+    df.to_csv(raw, sep=';', index=False)
+    expected = clean_phrasebur_data(str(raw), str(tmp_path / 'expected.csv'))
+    stats = clean_phrasebur_data_streaming(str(raw), str(tmp_path / 'streamed.csv'), chunksize=chunksize)
+    assert stats == expected
+    assert filecmp.cmp(tmp_path / 'expected.csv', tmp_path / 'streamed.csv', shallow=False)
@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from analysis.bur_surge_analysis import linear_trend_analysis, fdr_correction
+from analysis.bur_variation_analysis import phrase_variation_stats
+from cli.bur_surge_cli import run_surge_analysis
+from cli.bur_variation_cli import run_variation_analysis
+from utils.config import MIN_BUR_VALUES
+from utils.data_utils import group_phrases, get_artist_from_id
+
+
+def reference_phrases(frame):
+    """Phrases long enough to analyze, in groupby order, with their artist."""
+    for (solo_id, seg_id), group in frame.groupby(['id', 'seg_id']):
+        bur = group['swing_ratios'].to_numpy()
+        if len(bur) >= MIN_BUR_VALUES:
+            yield solo_id, seg_id, get_artist_from_id(solo_id), bur
+
+
+def test_surge_tallies_match_groupby(corpus_frame, tmp_path, capsys):
+    results = run_surge_analysis(group_phrases(corpus_frame), n_top=10, output_dir=str(tmp_path),
+                                 store_dir=None, n_bootstrap=0)
+    report = capsys.readouterr().out
+
+    rows = []
+    for solo_id, seg_id, artist, bur in reference_phrases(corpus_frame):
+        fit = linear_trend_analysis(bur)
+        rows.append({'id': solo_id, 'seg_id': seg_id, 'artist': artist, 'p_value': fit['p_value'],
+                     'direction': fit['direction']})
+    expected = pd.DataFrame(rows)
+    expected['significant_fdr'] = fdr_correction(expected['p_value'].tolist())[0]
+
+    assert results['id'].tolist() == expected['id'].tolist()
+    assert results['artist'].tolist() == expected['artist'].tolist()
+    np.testing.assert_allclose(results['p_value'], expected['p_value'], rtol=1e-9)
+    np.testing.assert_array_equal(results['significant_fdr'], expected['significant_fdr'])
+
+    for artist, group in expected.groupby('artist'):
+        increase = int((group['significant_fdr'] & (group['direction'] == 'increase')).sum())
+        decrease = int((group['significant_fdr'] & (group['direction'] == 'decrease')).sum())
+        block = re.search(rf"^{artist}:\n  Phrases: (\d+)\n  Increase: (\d+) .*\n  Decrease: (\d+)", report, re.M)
+        assert block and tuple(map(int, block.groups())) == (len(group), increase, decrease)
+    assert expected['significant_fdr'].any()
+
+
+def test_variation_means_match_groupby(corpus_frame, tmp_path, capsys):
+    run_variation_analysis(group_phrases(corpus_frame), sort_order='desc', n_top=10, output_dir=str(tmp_path),
+                           store_dir=None, n_bootstrap=0)
+    report = capsys.readouterr().out
+
+    stds = pd.DataFrame([
+        {'artist': artist, 'std_bur': phrase_variation_stats(bur)['std_bur']}
+        for _, _, artist, bur in reference_phrases(corpus_frame)
+    ]).groupby('artist')['std_bur'].agg(['mean', 'size']).sort_values('mean', ascending=False)
+    printed = re.findall(r"^(.+): avg phrase stddev = ([\d.]+) \((\d+) phrases\)", report, re.M)
+    assert [artist for artist, _, _ in printed] == stds.index.tolist()
+    for (artist, mean, count), (_, expected) in zip(printed, stds.iterrows()):
+        assert float(mean) == round(expected['mean'], 3)
+        assert int(count) == expected['size']
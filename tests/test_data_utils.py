@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+from utils.data_utils import load_phrasebur_csv, load_phrasebur_phrases, group_phrases
+from utils.phrase_cache import cache_dir_for
+
+
+def write_export(path, rows):
+    path.write_text('id;seg_type;seg_id;swing_ratios\n' + ''.join(f'{row}\n' for row in rows))
+    return str(path)
+
+
+ROWS = [
+    'SonnyRollins_Airegin_FINAL.sv;phrases;3;1.5',
+    'ArtPepper_Anthropology_FINAL.sv;phrases;2;2.25',
+    'SonnyRollins_Airegin_FINAL.sv;phrases;1;1.75',
+    'ArtPepper_Anthropology_FINAL.sv;phrases;2;1.125',
+    'ArtPepper_Anthropology_FINAL.sv;phrases;1;1.0'
+]
+
+
+def test_load_csv_keeps_file_order_and_writes_no_cache(tmp_path):
+    csv = write_export(tmp_path / 'export.csv', ROWS)
+    df = load_phrasebur_csv(csv)
+    assert list(df.columns) == ['id', 'seg_type', 'seg_id', 'swing_ratios']
+    assert df['swing_ratios'].tolist() == [1.5, 2.25, 1.75, 1.125, 1.0]
+    assert df['seg_id'].dtype == np.int32
+    assert not (tmp_path / 'export.cache').exists()
+
+
+def test_cached_frame_is_opt_in_and_grouped(tmp_path):
+    csv = write_export(tmp_path / 'export.csv', ROWS)
+    df = load_phrasebur_csv(csv, use_cache=True)
+    assert df['swing_ratios'].tolist() == [1.0, 2.25, 1.125, 1.75, 1.5]
+    assert df['artist'].astype(str).tolist()[:3] == ['Art Pepper'] * 3
+    assert os.path.isdir(cache_dir_for(csv))
+
+
+def test_phrase_cache_round_trip(tmp_path):
+    csv = write_export(tmp_path / 'export.csv', ROWS)
+    expected = group_phrases(load_phrasebur_csv(csv))
+    load_phrasebur_phrases(csv)
+    cached = load_phrasebur_phrases(csv)
+    assert set(cached) == set(expected)
+    for key, column in expected.items():
+        np.testing.assert_array_equal(cached[key], column)
+    np.testing.assert_array_equal(cached['offsets'], [0, 1, 3, 4, 5])
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from visualization.bur_histograms import histogram_bins, histogram_from_grid, phrase_histogram_bins
+
+
+def reference_histogram(bur_values):
+    """The original per-performer binning: np.histogram on 0.1-wide edges clipped to 0.5-3.5."""
+    bin_min = max(0.5, np.floor(bur_values.min() * 10) / 10)
+    bin_max = min(3.5, np.ceil(bur_values.max() * 10) / 10)
+    bin_edges = np.round(np.arange(bin_min, bin_max + 0.05, 0.1), 1)
+    return bin_edges, np.histogram(bur_values, bins=bin_edges)[0]
+
+
+@pytest.mark.parametrize('low, high', [(0.9, 2.6), (0.2, 4.0), (1.0, 2.3)])
+def test_histogram_bins_match_np_histogram(low, high):
+    rng = np.random.default_rng(4)
+    bur_values = np.concatenate([rng.uniform(low, high, 500), [low, high, 2.3, 1.7]])
+    edges, counts = histogram_bins(bur_values)
+    expected_edges, expected_counts = reference_histogram(bur_values)
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected_counts)
+
+
+def test_summed_phrase_grids_equal_pooled_histogram(corpus):
+    values, offsets = corpus
+    bins = phrase_histogram_bins(values, offsets)
+    assert bins['grid_counts'].sum(axis=1).max() <= np.diff(offsets).max()
+    np.testing.assert_array_equal(bins['bur_min'], np.minimum.reduceat(values, offsets[:-1]))
+
+    edges, counts = histogram_from_grid(bins['grid_counts'].sum(axis=0), bins['bur_min'].min(), bins['bur_max'].max())
+    expected_edges, expected_counts = histogram_bins(values)
+    np.testing.assert_allclose(edges, expected_edges)
+    np.testing.assert_array_equal(counts, expected_counts)
+    np.testing.assert_array_equal(counts, reference_histogram(values)[1])
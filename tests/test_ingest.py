@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.clean_data import clean_phrasebur_data
+from utils.ingest import ingest_exports
+
+STAT_KEYS = ('original_rows', 'cleaned_rows', 'rows_removed', 'rows_removed_pct', 'original_phrases',
+             'cleaned_phrases', 'phrases_removed', 'phrases_removed_pct', 'min_bur_values')
+
+
+@pytest.fixture
+def exports(tmp_path, corpus_frame):
+    """Three exports: b.csv repeats two of a.csv's solos (one with different rows)."""
+    solos = list(dict.fromkeys(corpus_frame['id']))
+    first = corpus_frame[corpus_frame['id'].isin(solos[:6])]
+    second = corpus_frame[corpus_frame['id'].isin(solos[4:9])].copy()
+    second.loc[second['id'] == solos[5], 'swing_ratios'] += 0.01
+    third = corpus_frame[corpus_frame['id'].isin(solos[9:])]
+    os.makedirs(tmp_path / 'exports' / 'later')
+    first.to_csv(tmp_path / 'exports' / 'a.csv', sep=';', index=False)
+    second.to_csv(tmp_path / 'exports' / 'b.csv', sep=';', index=False)
+    third.to_csv(tmp_path / 'exports' / 'later' / 'c.csv', sep=';', index=False)
+    deduplicated = pd.concat([first, second[~second['id'].isin(solos[4:6])], third])
+    return tmp_path / 'exports', deduplicated, second[second['id'].isin(solos[4:6])]
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_stats_match_cleaning_the_deduplicated_corpus(tmp_path, exports, n_workers):
+    export_dir, deduplicated, dropped = exports
+    deduplicated.to_csv(tmp_path / 'merged_raw.csv', sep=';', index=False)
+    expected = clean_phrasebur_data(str(tmp_path / 'merged_raw.csv'), str(tmp_path / 'expected.csv'))
+
+    stats = ingest_exports([str(export_dir)], output_csv=str(tmp_path / 'ingested.csv'), n_workers=n_workers)
+    assert {key: stats[key] for key in STAT_KEYS} == {key: expected[key] for key in STAT_KEYS}
+    assert stats['n_files'] == 3
+    assert (stats['duplicate_solos'], stats['conflicting_solos']) == (2, 1)
+    assert stats['duplicate_rows'] == len(dropped)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'ingested.csv', sep=';'),
+                                  pd.read_csv(tmp_path / 'expected.csv', sep=';'))
+
+
+def test_rows_removed_counts_only_the_length_filter(tmp_path, exports):
+    export_dir, deduplicated, _ = exports
+    stats = ingest_exports([str(export_dir)], output_csv=str(tmp_path / 'ingested.csv'), n_workers=1)
+    phrase_sizes = deduplicated.groupby(['id', 'seg_id']).size()
+    assert stats['rows_removed'] == phrase_sizes[phrase_sizes < stats['min_bur_values']].sum()
+    assert stats['original_rows'] + stats['duplicate_rows'] == sum(
+        len(pd.read_csv(path, sep=';')) for path in export_dir.rglob('*.csv')
+    )
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from statsmodels.stats.multitest import multipletests
+
+from analysis.bur_null_models import fdr_reject_rows, null_block_size, surge_null_distribution, SHUFFLE_BYTES_PER_VALUE
+
+
+def test_fdr_reject_rows_matches_multipletests():
+    p_values = np.random.default_rng(2).uniform(0, 0.3, (20, 50)) ** 3
+    reject = fdr_reject_rows(p_values, alpha=0.05)
+    for row, p_row in zip(reject, p_values):
+        np.testing.assert_array_equal(row, multipletests(p_row, alpha=0.05, method='fdr_bh')[0])
+
+
+def test_block_size_follows_memory_budget():
+    assert null_block_size(10_000_000, 1000) == 1
+    assert null_block_size(1000, 1000, max_bytes=10 * 1000 * SHUFFLE_BYTES_PER_VALUE) == 10
+    assert null_block_size(10, 7) == 7
+
+
+@pytest.fixture
+def null_inputs(corpus):
+    values, offsets = corpus
+    artist_code = np.arange(len(offsets) - 1) % 4
+    return values, offsets, artist_code
+
+
+def test_results_do_not_depend_on_worker_count(null_inputs):
+    max_bytes = 8 * len(null_inputs[0]) * SHUFFLE_BYTES_PER_VALUE
+    inline = surge_null_distribution(*null_inputs, n_permutations=30, seed=3, n_workers=1, max_bytes=max_bytes)
+    pooled = surge_null_distribution(*null_inputs, n_permutations=30, seed=3, n_workers=2, max_bytes=max_bytes)
+    assert inline['block_size'] == pooled['block_size'] == 8
+    for key in ('null_rates', 'null_artist_rates', 'artist_p_values'):
+        np.testing.assert_array_equal(inline[key], pooled[key])
+    assert inline['p_value'] == pooled['p_value']
+
+
+def test_block_size_reproduces_result(null_inputs):
+    first = surge_null_distribution(*null_inputs, n_permutations=20, seed=5, n_workers=1)
+    again = surge_null_distribution(*null_inputs, n_permutations=20, seed=5, n_workers=1,
+                                    block_size=first['block_size'], max_bytes=1)
+    np.testing.assert_array_equal(first['null_rates'], again['null_rates'])
+
+
+def test_shuffles_keep_observed_rate_bounds(null_inputs):
+    result = surge_null_distribution(*null_inputs, n_permutations=50, seed=0, n_workers=1, correction=None)
+    assert result['n_phrases'] == int((np.diff(null_inputs[1]) >= 6).sum())
+    assert result['null_rates'].shape == (50,)
+    # Uncorrected tests at alpha: about half of the 5% false positives are increases
+    assert 0.0 <= result['null_rates'].mean() < 0.1
+    assert 1 / 51 <= result['p_value'] <= 1
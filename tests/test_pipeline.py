@@ -0,0 +1,26 @@
+import pytest
+
+import cli.pipeline as pipeline
+
+
+def test_run_without_analyses_uses_default_analyses(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline, 'run_pipeline', lambda analyses, **options: calls.append(analyses) or {})
+    pipeline.main(['run'])
+    assert calls == [['surge', 'variation', 'histograms']]
+
+
+def test_unknown_analysis_is_rejected(monkeypatch):
+    monkeypatch.setattr(pipeline, 'run_pipeline', lambda analyses, **options: {})
+    with pytest.raises(SystemExit):
+        pipeline.main(['run', 'surge', 'bogus'])
+
+
+@pytest.mark.parametrize('jobs, expected', [(1, 8), (2, 4), (None, 4)])
+def test_analyses_share_the_cpus(monkeypatch, capsys, corpus_csv, tmp_path, jobs, expected):
+    monkeypatch.setattr(pipeline.os, 'cpu_count', lambda: 8)
+    monkeypatch.setattr(pipeline, 'run_histograms', lambda phrases, n_workers, **kwargs: print(f'histograms {n_workers}'))
+    monkeypatch.setattr(pipeline, 'run_null_models', lambda phrases, n_workers, **kwargs: print(f'null {n_workers}'))
+    pipeline.run_pipeline(['histograms', 'null'], input_csv=corpus_csv, jobs=jobs, output_dir=str(tmp_path))
+    report = capsys.readouterr().out
+    assert f'histograms {expected}' in report and f'null {expected}' in report
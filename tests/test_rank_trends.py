@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from analysis.bur_rank_trends import rank_trend_batch
+from utils.config import CONFIDENCE_LEVEL, MIN_BUR_VALUES
+
+
+@pytest.mark.parametrize('confidence_level', [CONFIDENCE_LEVEL, 0.8])
+def test_batch_matches_scipy(corpus, phrase_list, confidence_level):
+    values, offsets = corpus
+    batch = rank_trend_batch(values, offsets, confidence_level=confidence_level)
+
+    for index, y in enumerate(phrase_list):
+        x = np.arange(len(y))
+        if len(y) < MIN_BUR_VALUES:
+            assert np.isnan(batch['theil_slope'][index]) and batch['direction'][index] == 'none'
+            continue
+        theil = stats.theilslopes(y, x, alpha=confidence_level, method='separate')
+        np.testing.assert_allclose(
+            [batch[key][index] for key in ('theil_slope', 'theil_intercept', 'theil_ci_lower', 'theil_ci_upper')],
+            [theil.slope, theil.intercept, theil.low_slope, theil.high_slope], rtol=1e-12, atol=1e-14
+        )
+        if np.ptp(y) == 0:
+            continue  # rank correlations undefined
+        tau = stats.kendalltau(x, y, method='asymptotic')
+        rho = stats.spearmanr(x, y)
+        np.testing.assert_allclose(batch['kendall_tau'][index], tau.statistic, rtol=1e-12)
+        np.testing.assert_allclose(batch['mk_p_value'][index], tau.pvalue, rtol=1e-9, atol=1e-15)
+        np.testing.assert_allclose(batch['spearman_rho'][index], rho.statistic, rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(batch['spearman_p_value'][index], rho.pvalue, rtol=1e-8, atol=1e-15)
+        signs = np.sign(y[None, :] - y[:, None])[np.triu_indices(len(y), 1)]
+        assert batch['mk_s'][index] == signs.sum()
+
+
+def test_blocking_does_not_change_results(corpus):
+    values, offsets = corpus
+    whole = rank_trend_batch(values, offsets)
+    blocked = rank_trend_batch(values, offsets, block_pairs=1)
+    for key in whole:
+        np.testing.assert_array_equal(blocked[key], whole[key])
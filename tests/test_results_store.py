@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+import cli.pipeline as pipeline
+from analysis.bur_surge_analysis import linear_trend_analysis_batch
+from utils.results_store import (cached_phrase_results, load_stage, phrase_hashes, prune_store, resolve_store_dir,
+                                 DEFAULT_STORE_DIR)
+
+PARAMS = {'stage_version': 1}
+
+
+def compute(values, offsets):
+    fit = linear_trend_analysis_batch(values, offsets)
+    return {'slope': fit['slope'], 'n_values': fit['n_values']}
+
+
+def test_hashes_depend_on_order_and_length():
+    values = np.array([1.0, 2.0, 2.0, 1.0, 1.0, 2.0, 1.0, 2.0])
+    keys = phrase_hashes(values, [0, 2, 4, 6, 8])
+    assert keys[0] != keys[1] and keys[0] == keys[3] and keys[0] != phrase_hashes(values[:3], [0, 3])[0]
+
+
+def test_store_reuses_and_recomputes_only_changed_phrases(tmp_path, corpus):
+    values, offsets = corpus
+    store = str(tmp_path / 'store')
+    first, n_first = cached_phrase_results('trend', compute, values, offsets, PARAMS, store)
+    again, n_again = cached_phrase_results('trend', compute, values, offsets, PARAMS, store)
+    assert n_first == len(offsets) - 1 and n_again == 0
+    np.testing.assert_array_equal(first['slope'], again['slope'])
+
+    edited = values.copy()
+    edited[offsets[3]] += 0.5
+    results, n_computed = cached_phrase_results('trend', compute, edited, offsets, PARAMS, store)
+    assert n_computed == 1
+    np.testing.assert_array_equal(results['slope'], compute(edited, offsets)['slope'])
+
+
+def test_prune_drops_phrases_no_longer_in_the_corpus(tmp_path, corpus):
+    values, offsets = corpus
+    store = str(tmp_path / 'store')
+    cached_phrase_results('trend', compute, values, offsets, PARAMS, store)
+    edited = values.copy()
+    edited[offsets[3]:offsets[5]] += 0.5
+    cached_phrase_results('trend', compute, edited, offsets, PARAMS, store)
+    assert len(load_stage(store, 'trend', PARAMS)['key']) == len(offsets) + 1
+
+    counts = prune_store(store, phrase_hashes(edited, offsets))
+    assert counts == {'files': 1, 'kept': len(offsets) - 1, 'removed': 2}
+    results, n_computed = cached_phrase_results('trend', compute, edited, offsets, PARAMS, store)
+    assert n_computed == 0
+    np.testing.assert_array_equal(results['slope'], compute(edited, offsets)['slope'])
+    assert prune_store(str(tmp_path / 'missing'), []) == {'files': 0, 'kept': 0, 'removed': 0}
+
+
+def test_default_store_follows_output_dir():
+    assert resolve_store_dir(DEFAULT_STORE_DIR, '/tmp/x') == os.path.join('/tmp/x', '.phrase_results')
+    assert resolve_store_dir('elsewhere', '/tmp/x') == 'elsewhere'
+    assert resolve_store_dir(None, '/tmp/x') is None
+
+
+def test_pipeline_keeps_store_in_output_dir(tmp_path, monkeypatch, corpus_csv):
+    monkeypatch.chdir(tmp_path)
+    output_dir = tmp_path / 'results'
+    pipeline.main(['run', 'surge', 'variation', '--input', corpus_csv, '--output-dir', str(output_dir),
+                   '--bootstrap', '0', '--jobs', '1', '--prune-store'])
+    store = output_dir / '.phrase_results'
+    assert sorted(name.split('-')[0] for name in os.listdir(store)) == ['trend', 'variation']
+    assert not (tmp_path / 'outputs').exists()
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from analysis.bur_sensitivity import sensitivity_sweep
+from analysis.bur_surge_analysis import hac_trend_analysis_batch, linear_trend_analysis_batch
+from utils.data_utils import group_phrases, phrase_artist_codes
+
+MIN_LENGTHS = (3, 6, 12)
+ALPHAS = (0.01, 0.05, 0.2)
+CONFIDENCE_LEVELS = (0.9, 0.95)
+
+
+@pytest.fixture
+def phrases(corpus_frame):
+    return group_phrases(corpus_frame)
+
+
+def refit_counts(phrases, artist_code, min_length, alpha, confidence_level):
+    """Headline counts from fresh linregress fits of the selected phrases."""
+    offsets = phrases['offsets']
+    selected, fits = [], []
+    for index, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+        if stop - start >= min_length:
+            selected.append(index)
+            fits.append(stats.linregress(np.arange(stop - start), phrases['values'][start:stop]))
+    slope = np.array([fit.slope for fit in fits])
+    reject = multipletests([fit.pvalue for fit in fits], alpha=alpha, method='fdr_bh')[0]
+    t_critical = np.array([stats.t.ppf(1 - (1 - confidence_level) / 2, offsets[i + 1] - offsets[i] - 2)
+                           for i in selected])
+    half_width = t_critical * np.array([fit.stderr for fit in fits])
+    ci_increase, ci_decrease = slope - half_width > 0, slope + half_width < 0
+    return {
+        'n_phrases': len(selected),
+        'n_solos': len(set(phrases['solo_code'][selected])),
+        'n_artists': len(set(artist_code[selected])),
+        'n_significant': int(reject.sum()),
+        'n_increase': int((reject & (slope > 0)).sum()),
+        'n_decrease': int((reject & (slope < 0)).sum()),
+        'n_artists_increase': len(set(artist_code[selected][reject & (slope > 0)])),
+        'n_ci_excludes_zero': int((ci_increase | ci_decrease).sum()),
+        'n_ci_increase': int(ci_increase.sum()),
+        'n_ci_decrease': int(ci_decrease.sum())
+    }
+
+
+def test_sweep_matches_refitting_each_setting(phrases):
+    artist_code = phrase_artist_codes(phrases)
+    trends = linear_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=min(MIN_LENGTHS))
+    sweep = sensitivity_sweep(trends, phrases['solo_code'], artist_code, MIN_LENGTHS, ALPHAS, CONFIDENCE_LEVELS)
+
+    grid = [(m, a, c) for m in MIN_LENGTHS for a in ALPHAS for c in CONFIDENCE_LEVELS]
+    assert len(sweep['min_length']) == len(grid)
+    for row, (min_length, alpha, confidence_level) in enumerate(grid):
+        assert (sweep['min_length'][row], sweep['alpha'][row], sweep['confidence_level'][row]) == \
+            (min_length, alpha, confidence_level)
+        expected = refit_counts(phrases, artist_code, min_length, alpha, confidence_level)
+        assert {key: sweep[key][row] for key in expected} == expected
+        assert sweep['pct_significant'][row] == pytest.approx(100 * expected['n_significant'] / expected['n_phrases'])
+    assert sweep['n_significant'].max() > 0
+
+
+def test_robust_sweep_uses_hac_columns(phrases):
+    artist_code = phrase_artist_codes(phrases)
+    trends = linear_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=3)
+    hac = hac_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=3)
+    robust = sensitivity_sweep({**trends, **hac}, phrases['solo_code'], artist_code, (4, 8), ALPHAS, CONFIDENCE_LEVELS,
+                               robust=True)
+    swapped = sensitivity_sweep({**trends, 'p_value': hac['hac_p_value'], 'std_err': hac['hac_std_err']},
+                                phrases['solo_code'], artist_code, (4, 8), ALPHAS, CONFIDENCE_LEVELS)
+    for key in robust:
+        np.testing.assert_array_equal(robust[key], swapped[key])
+
+
+def test_min_length_below_regression_rejected(phrases):
+    trends = linear_trend_analysis_batch(phrases['values'], phrases['offsets'], min_values=3)
+    with pytest.raises(ValueError):
+        sensitivity_sweep(trends, phrases['solo_code'], phrase_artist_codes(phrases), (2, 6), ALPHAS, CONFIDENCE_LEVELS)
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from service import server
+from service.queries import load_corpus_state
+from service.server import QueryService, parse_query
+
+
+@pytest.fixture
+def service(corpus_csv):
+    query_service = QueryService(load_corpus_state(corpus_csv, store_dir=None), workers=2)
+    yield query_service
+    query_service.close()
+
+
+def ask(service, path, query=''):
+    async def request():
+        return await service.answer(path, query)
+
+    status, body = asyncio.run(request())
+    return status, json.loads(body)
+
+
+@pytest.mark.parametrize('path, query', [
+    ('/artists', 'alpha=0'),
+    ('/artists', 'alpha=1'),
+    ('/artists', 'alpha=1.5'),
+    ('/artists', 'alpha=nan'),
+    ('/artists', 'alpha=-0.1'),
+    ('/artists', 'top=-1'),
+    ('/artists', 'min_phrases=-2'),
+    ('/phrases', 'limit=-1'),
+    ('/phrases', 'min_length=-6'),
+    ('/artist_trends', 'alpha=inf'),
+    ('/histogram', 'artist=ArtPepper&min_length=-1')
+])
+def test_out_of_range_parameters_are_rejected(service, path, query):
+    status, body = ask(service, path, query)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert 'error' in body
+    with pytest.raises(ValueError):
+        parse_query(path, query)
+
+
+@pytest.mark.parametrize('path, query', [
+    ('/artists', 'alpha=0.5&top=0&min_length=0'),
+    ('/phrases', 'limit=0&alpha=0.01'),
+    ('/phrases', 'limit=all'),
+    ('/artist_trends', 'alpha=0.2'),
+    ('/histogram', 'artist=ArtPepper')
+])
+def test_valid_parameters_are_answered(service, path, query):
+    status, body = ask(service, path, query)
+    assert status == HTTPStatus.OK, body
+
+
+def test_unexpected_errors_return_json_500(service, monkeypatch):
+    def broken(state, **kwargs):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(server.ROUTES, '/histogram', (broken, server.ROUTES['/histogram'][1]))
+    status, body = ask(service, '/histogram', 'artist=ArtPepper')
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert body == {'error': 'RuntimeError: boom'}
+    assert not service.pending and service.errors == 1
+    # Failures are not cached
+    assert ask(service, '/histogram', 'artist=ArtPepper')[0] == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def test_non_finite_results_are_not_encoded(service, monkeypatch):
+    monkeypatch.setitem(server.ROUTES, '/histogram',
+                        (lambda state, **kwargs: {'value': float('nan')}, server.ROUTES['/histogram'][1]))
+    status, body = ask(service, '/histogram', 'artist=ArtPepper')
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert 'error' in body
+
+
+def test_other_methods_get_405_with_allow_header(service):
+    async def request():
+        server_socket = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+        async with server_socket:
+            reader, writer = await asyncio.open_connection(*server_socket.sockets[0].getsockname()[:2])
+            writer.write(b'DELETE /corpus HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    head, _, body = asyncio.run(request()).partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    assert lines[0] == 'HTTP/1.1 405 Method Not Allowed'
+    assert 'Allow: GET, HEAD' in lines[1:]
+    assert json.loads(body) == {'error': 'Only GET and HEAD are supported'}
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.bur_sharding import shard_bounds, sharded_fdr_correction, sharded_phrase_trend_stats
+from analysis.bur_surge_analysis import fdr_correction, phrase_trend_stats
+from cli.bur_shard_cli import run_shard_map, run_shard_reduce
+from utils.config import FDR_ALPHA, MIN_BUR_VALUES
+from utils.data_utils import group_phrases
+
+
+@pytest.fixture
+def phrases(corpus_frame):
+    return group_phrases(corpus_frame)
+
+
+@pytest.mark.parametrize('n_shards', [1, 3, 40])
+def test_shards_cut_on_solo_boundaries(phrases, n_shards):
+    bounds = shard_bounds(phrases, n_shards)
+    assert len(bounds) == n_shards + 1 and bounds[0] == 0 and bounds[-1] == len(phrases['seg_id'])
+    assert (np.diff(bounds) >= 0).all()
+    solo_code = phrases['solo_code']
+    for cut in bounds[1:-1]:
+        assert cut in (0, len(solo_code)) or solo_code[cut] != solo_code[cut - 1]
+
+
+@pytest.mark.parametrize('n_shards, n_workers', [(3, 1), (5, 2)])
+def test_sharded_stats_are_bit_identical(phrases, n_shards, n_workers):
+    whole = phrase_trend_stats(phrases['values'], phrases['offsets'])
+    sharded = sharded_phrase_trend_stats(phrases, n_shards=n_shards, n_workers=n_workers)
+    assert sharded.keys() == whole.keys()
+    for key in whole:
+        np.testing.assert_array_equal(sharded[key], whole[key])
+
+
+def test_sharded_fdr_matches_global_correction():
+    p_values = np.random.default_rng(2).uniform(0, 1, 300) ** 3
+    p_values[::17] = np.nan
+    reject, p_corrected = fdr_correction(p_values, alpha=FDR_ALPHA)
+    parts = sharded_fdr_correction(np.split(p_values, [0, 40, 41, 200]), alpha=FDR_ALPHA)
+    np.testing.assert_array_equal(np.concatenate([part[0] for part in parts]), reject)
+    np.testing.assert_array_equal(np.concatenate([part[1] for part in parts]), p_corrected)
+
+
+def test_map_reduce_matches_single_shard(tmp_path, corpus_csv, capsys):
+    def map_reduce(n_shards):
+        shard_dir = tmp_path / f'shards-{n_shards}'
+        files = [run_shard_map(corpus_csv, shard, n_shards, output_dir=str(shard_dir)) for shard in range(n_shards)]
+        return run_shard_reduce(files[::-1], output_dir=str(tmp_path / f'reduce-{n_shards}'), output_format='npz')
+
+    single, sharded = map_reduce(1), map_reduce(4)
+    pd.testing.assert_frame_equal(sharded, single)
+
+    phrases = group_phrases(pd.read_csv(corpus_csv, sep=';'))
+    trends = phrase_trend_stats(phrases['values'], phrases['offsets'])
+    keep = trends['n_values'] >= MIN_BUR_VALUES
+    reject, p_corrected = fdr_correction(trends['p_value'][keep], alpha=FDR_ALPHA)
+    np.testing.assert_array_equal(sharded['p_value_corrected'].to_numpy(), p_corrected)
+    np.testing.assert_array_equal(sharded['significant_fdr'].to_numpy(), reject)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from scipy import stats
+from statsmodels.stats.stattools import durbin_watson
+from statsmodels.stats.multitest import multipletests
+
+from analysis.bur_surge_analysis import (
+    linear_trend_analysis, linear_trend_analysis_batch, fdr_correction, hac_lags, hac_trend_analysis_batch
+)
+from utils.config import CONFIDENCE_LEVEL, MIN_BUR_VALUES
+
+
+def test_batch_matches_linregress(corpus, phrase_list):
+    values, offsets = corpus
+    batch = linear_trend_analysis_batch(values, offsets)
+
+    for index, y in enumerate(phrase_list):
+        assert batch['n_values'][index] == len(y)
+        if len(y) < MIN_BUR_VALUES:
+            assert np.isnan(batch['slope'][index])
+            assert batch['direction'][index] == 'none'
+            continue
+        if np.ptp(y) == 0:
+            continue  # constant phrase: correlation and Durbin-Watson undefined
+        fit = stats.linregress(np.arange(len(y)), y)
+        t_critical = stats.t.ppf(1 - (1 - CONFIDENCE_LEVEL) / 2, len(y) - 2)
+        residuals = y - (fit.slope * np.arange(len(y)) + fit.intercept)
+        np.testing.assert_allclose(batch['slope'][index], fit.slope, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['intercept'][index], fit.intercept, rtol=1e-9)
+        np.testing.assert_allclose(batch['r2'][index], fit.rvalue ** 2, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['p_value'][index], fit.pvalue, rtol=1e-7)
+        np.testing.assert_allclose(batch['std_err'][index], fit.stderr, rtol=1e-9)
+        np.testing.assert_allclose(batch['ci_lower'][index], fit.slope - t_critical * fit.stderr, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['ci_upper'][index], fit.slope + t_critical * fit.stderr, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['durbin_watson'][index], durbin_watson(residuals), rtol=1e-7)
+
+
+def test_batch_matches_scalar(phrase_list):
+    for y in phrase_list:
+        if len(y) < MIN_BUR_VALUES or np.ptp(y) == 0:
+            continue
+        scalar = linear_trend_analysis(y)
+        batch = linear_trend_analysis_batch(y, [0, len(y)])
+        assert batch['direction'][0] == scalar['direction']
+        np.testing.assert_allclose(batch['slope'][0], scalar['slope'], rtol=1e-12)
+        np.testing.assert_allclose(batch['p_value'][0], scalar['p_value'], rtol=1e-9)
+
+
+def test_min_values_masks_short_phrases(corpus):
+    values, offsets = corpus
+    batch = linear_trend_analysis_batch(values, offsets, min_values=10)
+    short = batch['n_values'] < 10
+    assert np.isnan(batch['slope'][short]).all()
+    assert not np.isnan(batch['slope'][~short]).any()
+
+
+@pytest.mark.parametrize('alpha', [0.01, 0.05, 0.2])
+def test_fdr_correction_matches_benjamini_hochberg(alpha):
+    p_values = np.random.default_rng(1).uniform(0, 0.2, 200) ** 2
+    reject, corrected = fdr_correction(p_values, alpha=alpha)
+    expected_reject, expected, _, _ = multipletests(p_values, alpha=alpha, method='fdr_bh')
+    np.testing.assert_array_equal(reject, expected_reject)
+    np.testing.assert_allclose(corrected, expected)
+
+
+@pytest.mark.parametrize('max_lags', [None, 1, 4])
+def test_hac_matches_statsmodels(corpus, phrase_list, max_lags):
+    values, offsets = corpus
+    batch = hac_trend_analysis_batch(values, offsets, max_lags=max_lags)
+
+    for index, y in enumerate(phrase_list):
+        if len(y) < MIN_BUR_VALUES:
+            assert np.isnan(batch['hac_std_err'][index]) and batch['hac_lags'][index] == 0
+            continue
+        if np.ptp(y) == 0:
+            continue
+        lags = hac_lags([len(y)], max_lags)[0]
+        assert batch['hac_lags'][index] == lags
+        fit = sm.OLS(y, sm.add_constant(np.arange(len(y), dtype=float))).fit(
+            cov_type='HAC', cov_kwds={'maxlags': int(lags), 'use_correction': False}, use_t=True
+        )
+        np.testing.assert_allclose(batch['hac_std_err'][index], fit.bse[1], rtol=1e-8)
+        np.testing.assert_allclose(batch['hac_p_value'][index], fit.pvalues[1], rtol=1e-6, atol=1e-14)
+
+        residuals = fit.resid
+        rho = np.sum(residuals[1:] * residuals[:-1]) / np.sum(residuals ** 2)
+        np.testing.assert_allclose(batch['ar1_rho'][index], rho, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(batch['n_effective'][index], min(len(y) * (1 - rho) / (1 + rho), len(y)), rtol=1e-8)
+
+
+def test_hac_lags_follow_newey_west_rule():
+    n = np.array([1, 2, 6, 27, 28, 100, 1000])
+    np.testing.assert_array_equal(hac_lags(n), [0, 1, 2, 2, 3, 4, 6])
+    np.testing.assert_array_equal(hac_lags(n, max_lags=5), [0, 1, 5, 5, 5, 5, 5])
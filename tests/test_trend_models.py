@@ -0,0 +1,39 @@
+import numpy as np
+import statsmodels.api as sm
+from scipy import stats
+
+from analysis.bur_surge_analysis import trend_model_comparison_batch
+from utils.config import MIN_BUR_VALUES
+
+
+def test_model_fits_match_linregress_and_ols_aic(corpus, phrase_list):
+    values, offsets = corpus
+    batch = trend_model_comparison_batch(values, offsets)
+
+    for index, y in enumerate(phrase_list):
+        if len(y) < MIN_BUR_VALUES:
+            assert np.isnan(batch['exp_rate'][index]) and batch['best_model'][index] == 'none'
+            continue
+        if np.ptp(y) == 0:
+            continue
+        x = np.arange(len(y), dtype=float)
+        exp_fit = stats.linregress(x, np.log(y))
+        log_fit = stats.linregress(np.log1p(x), y)
+        np.testing.assert_allclose(batch['exp_rate'][index], exp_fit.slope, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['exp_r2'][index], exp_fit.rvalue ** 2, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(batch['exp_p_value'][index], exp_fit.pvalue, rtol=1e-7)
+        np.testing.assert_allclose(batch['log_slope'][index], log_fit.slope, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(batch['log_r2'][index], log_fit.rvalue ** 2, rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(batch['log_p_value'][index], log_fit.pvalue, rtol=1e-7)
+
+        # statsmodels' Gaussian AIC differs by a constant per phrase, so compare differences;
+        # the exponential model's likelihood moves to the BUR scale with the log Jacobian
+        linear = sm.OLS(y, sm.add_constant(x)).fit().aic
+        exponential = sm.OLS(np.log(y), sm.add_constant(x)).fit().aic + 2 * np.log(y).sum()
+        logarithmic = sm.OLS(y, sm.add_constant(np.log1p(x))).fit().aic
+        np.testing.assert_allclose(batch['aic_exponential'][index] - batch['aic_linear'][index],
+                                   exponential - linear, rtol=1e-7, atol=1e-8)
+        np.testing.assert_allclose(batch['aic_logarithmic'][index] - batch['aic_linear'][index],
+                                   logarithmic - linear, rtol=1e-7, atol=1e-8)
+        expected_best = ('linear', 'exponential', 'logarithmic')[int(np.argmin([linear, exponential, logarithmic]))]
+        assert batch['best_model'][index] == expected_best
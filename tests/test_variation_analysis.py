@@ -0,0 +1,49 @@
+import numpy as np
+from scipy import stats
+from statsmodels.tsa.stattools import acf
+
+from analysis.bur_variation_analysis import VARIATION_STATS, phrase_variation_stats, phrase_variation_stats_batch
+from utils.config import MIN_BUR_VALUES
+
+
+def test_std_is_bit_identical_to_numpy(corpus, phrase_list):
+    batch = phrase_variation_stats_batch(*corpus)
+    for index, y in enumerate(phrase_list):
+        if len(y) < MIN_BUR_VALUES:
+            assert all(np.isnan(batch[key][index]) for key in VARIATION_STATS)
+            continue
+        assert batch['std_bur'][index] == np.std(y, ddof=1)
+        assert batch['mean_bur'][index] == np.mean(y)
+
+
+def test_batch_equals_scalar(corpus, phrase_list):
+    batch = phrase_variation_stats_batch(*corpus)
+    np.testing.assert_array_equal(batch['n_values'], [len(y) for y in phrase_list])
+    for index, y in enumerate(phrase_list):
+        scalar = phrase_variation_stats(y)
+        if scalar is None:
+            continue
+        for key in VARIATION_STATS:
+            np.testing.assert_array_equal(batch[key][index], scalar[key])
+
+
+def test_stats_match_scipy_and_statsmodels(phrase_list):
+    for y in phrase_list:
+        if len(y) < MIN_BUR_VALUES or np.ptp(y) == 0:
+            continue
+        result = phrase_variation_stats(y)
+        np.testing.assert_allclose(result['cv_bur'], stats.variation(y, ddof=1), rtol=1e-12)
+        np.testing.assert_allclose(result['mad_bur'], stats.median_abs_deviation(y), rtol=1e-12)
+        np.testing.assert_allclose(result['iqr_bur'], stats.iqr(y), rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(
+            [result['q25_bur'], result['median_bur'], result['q75_bur']],
+            np.percentile(y, [25, 50, 75]), rtol=1e-12
+        )
+        assert (result['min_bur'], result['max_bur']) == (y.min(), y.max())
+        np.testing.assert_allclose(result['lag1_autocorr'], acf(y, nlags=1, fft=False)[1], rtol=1e-10, atol=1e-14)
+
+
+def test_constant_phrase_has_undefined_autocorrelation():
+    result = phrase_variation_stats(np.full(8, 1.25))
+    assert result['std_bur'] == 0 and result['mad_bur'] == 0 and result['iqr_bur'] == 0
+    assert np.isnan(result['lag1_autocorr'])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from analysis.bur_window_trends import window_trend_scan
+
+
+def linregress_fit(y):
+    """Slope and p-value, or None for a constant window."""
+    if np.ptp(y) == 0:
+        return None
+    fit = stats.linregress(np.arange(len(y)), y)
+    return fit.slope, fit.pvalue
+
+
+def assert_fit(slope, p_value, expected):
+    if expected is None:
+        return
+    np.testing.assert_allclose(slope, expected[0], rtol=1e-7, atol=1e-10)
+    np.testing.assert_allclose(p_value, expected[1], rtol=1e-6, atol=1e-12)
+
+
+@pytest.mark.parametrize('window, edge', [(6, None), (4, 8)])
+def test_scan_matches_linregress_per_window(corpus, phrase_list, window, edge):
+    values, offsets = corpus
+    edge_width = window if edge is None else edge
+    alpha = 0.2
+    scan = window_trend_scan(values, offsets, window=window, edge=edge, alpha=alpha)
+
+    for index, y in enumerate(phrase_list):
+        if len(y) < edge_width:
+            assert np.isnan(scan['onset_slope'][index]) and np.isnan(scan['close_p_value'][index])
+        else:
+            assert_fit(scan['onset_slope'][index], scan['onset_p_value'][index], linregress_fit(y[:edge_width]))
+            assert_fit(scan['close_slope'][index], scan['close_p_value'][index], linregress_fit(y[-edge_width:]))
+
+        fits = [linregress_fit(y[start:start + window]) for start in range(len(y) - window + 1)]
+        assert scan['n_windows'][index] == len(fits)
+        significant = [(fit[0], start) for start, fit in enumerate(fits)
+                       if fit is not None and fit[1] < alpha and fit[0] > 0]
+        if not significant:
+            assert scan['best_window_start'][index] == -1
+            assert np.isnan(scan['best_window_slope'][index])
+            continue
+        best_slope, best_start = max(significant, key=lambda item: (item[0], -item[1]))
+        assert scan['best_window_start'][index] == best_start
+        assert_fit(scan['best_window_slope'][index], scan['best_window_p_value'][index], fits[best_start])
+
+
+def test_window_narrower_than_regression_rejected(corpus):
+    values, offsets = corpus
+    with pytest.raises(ValueError):
+        window_trend_scan(values, offsets, window=2)
@@ -1,15 +1,26 @@
 """
 Utility functions for data loading, file I/O, and common helpers.
+
+Submodules are imported on first use of one of their names, so importing
+the package itself does not load numpy, pandas, scipy or statsmodels.
 """
 
-from .data_utils import (
-    get_artist_from_id,
-    ensure_output_dir,
-    load_phrasebur_csv
-)
-
-__all__ = [
-    'get_artist_from_id',
-    'ensure_output_dir',
-    'load_phrasebur_csv'
-]
+from .lazy import lazy_exports
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    'get_artist_from_id': 'data_utils',
+    'ensure_output_dir': 'data_utils',
+    'load_phrasebur_csv': 'data_utils',
+    'load_phrasebur_phrases': 'data_utils',
+    'group_phrases': 'data_utils',
+    'phrases_to_frame': 'data_utils',
+    'iter_phrase_values': 'data_utils',
+    'phrase_artist_codes': 'data_utils',
+    'write_results': 'results_io',
+    'load_results': 'results_io'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -5,11 +5,16 @@ Filters phrases to include only those with at least 6 BUR values,
 ensuring statistical validity for regression and variation analyses.
 """
 
-import pandas as pd
+import numpy as np
 from pathlib import Path
 from utils.config import MIN_BUR_VALUES
+from utils.profiling import profiled
 
+# Rows parsed per chunk by the streaming cleaner
+DEFAULT_CHUNKSIZE = 100_000
 
+
+@profiled(rows=lambda stats: stats['original_rows'])
 def clean_phrasebur_data(input_csv='data/phrasebur_raw.csv', output_csv='data/phrasebur_filtered.csv', min_bur_values=MIN_BUR_VALUES):
     """
     Clean PhraseBur dataset by filtering phrases with insufficient data points.
@@ -22,6 +27,8 @@ def clean_phrasebur_data(input_csv='data/phrasebur_raw.csv', output_csv='data/ph
     Returns:
         Dictionary with cleaning statistics
     """
+    import pandas as pd
+
     # Load the data
     df = pd.read_csv(input_csv, sep=';')
     
@@ -43,20 +50,182 @@ def clean_phrasebur_data(input_csv='data/phrasebur_raw.csv', output_csv='data/ph
     # Save cleaned data
     df_cleaned.to_csv(output_csv, sep=';', index=False)
     
-    # Compute statistics
-    stats = {
+    return _cleaning_stats(original_rows, cleaned_rows, original_phrases, cleaned_phrases, min_bur_values)
+
+
+@profiled(rows=lambda stats: stats['original_rows'])
+def clean_phrasebur_data_streaming(input_csv='data/phrasebur_raw.csv', output_csv='data/phrasebur_filtered.csv',
+                                   min_bur_values=MIN_BUR_VALUES, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Clean PhraseBur dataset in fixed-size chunks with bounded memory.
+    
+    Args:
+        input_csv: Path to input CSV file (default: 'data/phrasebur_raw.csv')
+        output_csv: Path to output CSV file (default: 'data/phrasebur_filtered.csv')
+        min_bur_values: Minimum number of BUR values per phrase (default: 6)
+        chunksize: Number of CSV rows parsed per chunk (default: 100,000)
+    
+    Returns:
+        Dictionary with cleaning statistics (same keys as clean_phrasebur_data)
+        
+    Note:
+        - MeloSpyGUI exports list phrases in (id, seg_id) order, so a single
+          pass only holds one chunk plus the phrase spanning the chunk
+          boundary, and checks the order against the previous phrase only
+        - Ids may be sorted by code point or case-insensitively (MeloSpyGUI's
+          database order); any other order, which could repeat a finished
+          phrase, falls back to a two-pass count that rewrites the output
+        - Output rows keep their input order, as in clean_phrasebur_data
+    """
+    try:
+        return _clean_grouped_stream(input_csv, output_csv, min_bur_values, chunksize)
+    except _UngroupedInputError:
+        return _clean_two_pass_stream(input_csv, output_csv, min_bur_values, chunksize)
+
+
+class _UngroupedInputError(Exception):
+    """Raised when the input's phrases are not in sorted (id, seg_id) order."""
+
+
+# Id orders accepted by the single-pass cleaner
+_ID_ORDERS = {
+    'code point': lambda ids: ids,
+    'case-insensitive': lambda ids: np.array([solo_id.casefold() for solo_id in ids], dtype=object)
+}
+
+
+def _phrase_keys(chunk):
+    """64-bit hash of (id, seg_id) for every row of a chunk."""
+    import pandas as pd
+
+    return pd.util.hash_pandas_object(chunk[['id', 'seg_id']], index=False).to_numpy()
+
+
+def _read_chunks(input_csv, chunksize):
+    import pandas as pd
+
+    return pd.read_csv(input_csv, sep=';', chunksize=chunksize)
+
+
+def _sorted_orders(ids, seg_ids, orders):
+    """
+    Id orders under which consecutive phrases strictly increase.
+
+    Args:
+        ids, seg_ids: (id, seg_id) of consecutive phrases (object and integer arrays)
+        orders: Names from _ID_ORDERS still consistent with earlier phrases
+
+    Returns:
+        The subset of orders consistent with these phrases too
+    """
+    same_id = ids[1:] == ids[:-1]
+    later_id = ids[1:] > ids[:-1]
+    seg_increases = seg_ids[1:] > seg_ids[:-1]
+    consistent = []
+    for name in orders:
+        primary = _ID_ORDERS[name](ids)
+        increases = (primary[1:] > primary[:-1]) | (
+            (primary[1:] == primary[:-1]) & (later_id | (same_id & seg_increases))
+        )
+        if increases.all():
+            consistent.append(name)
+    return consistent
+
+
+def _clean_grouped_stream(input_csv, output_csv, min_bur_values, chunksize):
+    """Single pass over input whose phrases come in sorted (id, seg_id) order."""
+    import pandas as pd
+
+    counts = {'original_rows': 0, 'cleaned_rows': 0, 'original_phrases': 0, 'cleaned_phrases': 0}
+    # Only the last phrase flushed and the id orders it is consistent with
+    state = {'last_id': None, 'last_seg_id': None, 'orders': list(_ID_ORDERS)}
+    carry = None
+
+    def flush(rows, keys, out):
+        # rows holds whole phrases only; filter each run of equal keys by length
+        is_start = np.ones(len(keys), dtype=bool)
+        is_start[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(is_start)
+        lengths = np.diff(np.append(starts, len(keys)))
+
+        run_ids = rows['id'].to_numpy(dtype=object)[starts]
+        run_seg_ids = rows['seg_id'].to_numpy()[starts]
+        if state['last_id'] is not None:
+            run_ids = np.append(np.array([state['last_id']], dtype=object), run_ids)
+            run_seg_ids = np.append(state['last_seg_id'], run_seg_ids)
+        state['orders'] = _sorted_orders(run_ids, run_seg_ids, state['orders'])
+        if not state['orders']:
+            raise _UngroupedInputError(input_csv)
+        state['last_id'], state['last_seg_id'] = run_ids[-1], run_seg_ids[-1]
+
+        valid = lengths >= min_bur_values
+        kept = rows[np.repeat(valid, lengths)]
+        kept.to_csv(out, sep=';', index=False, header=False)
+
+        counts['original_rows'] += len(rows)
+        counts['cleaned_rows'] += len(kept)
+        counts['original_phrases'] += len(starts)
+        counts['cleaned_phrases'] += int(valid.sum())
+
+    with open(output_csv, 'w', newline='') as out:
+        for chunk in _read_chunks(input_csv, chunksize):
+            if carry is None:
+                chunk.iloc[:0].to_csv(out, sep=';', index=False)
+            else:
+                chunk = pd.concat([carry, chunk], ignore_index=True)
+            keys = _phrase_keys(chunk)
+
+            # The last phrase may continue in the next chunk; hold it back
+            is_start = np.ones(len(keys), dtype=bool)
+            is_start[1:] = keys[1:] != keys[:-1]
+            last_start = np.flatnonzero(is_start)[-1]
+            if last_start > 0:
+                flush(chunk.iloc[:last_start], keys[:last_start], out)
+            carry = chunk.iloc[last_start:]
+
+        if carry is not None and len(carry) > 0:
+            flush(carry, _phrase_keys(carry), out)
+
+    return _cleaning_stats(counts['original_rows'], counts['cleaned_rows'],
+                           counts['original_phrases'], counts['cleaned_phrases'], min_bur_values)
+
+
+def _clean_two_pass_stream(input_csv, output_csv, min_bur_values, chunksize):
+    """Count phrase lengths in a first pass, then filter rows in a second."""
+    import pandas as pd
+
+    phrase_counts = pd.Series(dtype=np.int64)
+    original_rows = 0
+    for chunk in _read_chunks(input_csv, chunksize):
+        chunk_counts = pd.Series(_phrase_keys(chunk)).value_counts()
+        phrase_counts = phrase_counts.add(chunk_counts, fill_value=0).astype(np.int64)
+        original_rows += len(chunk)
+
+    valid_keys = phrase_counts.index[phrase_counts.to_numpy() >= min_bur_values]
+
+    cleaned_rows = 0
+    with open(output_csv, 'w', newline='') as out:
+        for i, chunk in enumerate(_read_chunks(input_csv, chunksize)):
+            kept = chunk[np.isin(_phrase_keys(chunk), valid_keys)]
+            kept.to_csv(out, sep=';', index=False, header=(i == 0))
+            cleaned_rows += len(kept)
+
+    return _cleaning_stats(original_rows, cleaned_rows, len(phrase_counts), len(valid_keys), min_bur_values)
+
+
+def _cleaning_stats(original_rows, cleaned_rows, original_phrases, cleaned_phrases, min_bur_values):
+    """Summary statistics reported by both cleaning modes."""
+    return {
         'original_rows': original_rows,
         'cleaned_rows': cleaned_rows,
         'rows_removed': original_rows - cleaned_rows,
-        'rows_removed_pct': 100 * (original_rows - cleaned_rows) / original_rows,
+        'rows_removed_pct': 100 * (original_rows - cleaned_rows) / max(original_rows, 1),
         'original_phrases': original_phrases,
         'cleaned_phrases': cleaned_phrases,
         'phrases_removed': original_phrases - cleaned_phrases,
-        'phrases_removed_pct': 100 * (original_phrases - cleaned_phrases) / original_phrases,
+        'phrases_removed_pct': 100 * (original_phrases - cleaned_phrases) / max(original_phrases, 1),
         'min_bur_values': min_bur_values
     }
-    
-    return stats
 
 
 def main():
@@ -82,6 +251,17 @@ def main():
         default=MIN_BUR_VALUES,
         help=f'Minimum number of BUR values per phrase (default: {MIN_BUR_VALUES})'
     )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Process the input in chunks with bounded memory (for large exports)'
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help=f'Rows per chunk in --stream mode (default: {DEFAULT_CHUNKSIZE:,})'
+    )
     
     args = parser.parse_args()
     
@@ -89,11 +269,19 @@ def main():
     print(f"Minimum BUR values per phrase: {args.min_values}")
     print()
     
-    stats = clean_phrasebur_data(
-        input_csv=args.input,
-        output_csv=args.output,
-        min_bur_values=args.min_values
-    )
+    if args.stream:
+        stats = clean_phrasebur_data_streaming(
+            input_csv=args.input,
+            output_csv=args.output,
+            min_bur_values=args.min_values,
+            chunksize=args.chunksize
+        )
+    else:
+        stats = clean_phrasebur_data(
+            input_csv=args.input,
+            output_csv=args.output,
+            min_bur_values=args.min_values
+        )
     
     print("=" * 60)
     print("DATA CLEANING SUMMARY")
@@ -28,6 +28,16 @@ FDR_ALPHA = 0.05
 # DW > 2.0 = negative autocorrelation (adjacent values alternate)
 DW_AUTOCORR_THRESHOLD = 1.5
 
+# Maximum lag for Newey-West (HAC) slope standard errors
+# None = per-phrase Newey-West rule floor(4 * (n / 100) ** (2 / 9)),
+#        which gives 2 lags for n = 6 and 3 lags from n = 28
+# An integer uses the same lag for every phrase (capped at n - 1)
+HAC_MAX_LAGS = None
+
 # Default number of top performers to display in CLI output
 # Can be overridden by user input at runtime
 DEFAULT_TOP_N = 20
+
+# Fewest BUR values per segment in the changepoint analysis
+# 3 leaves one residual degree of freedom for each segment's line
+CHANGEPOINT_MIN_SEGMENT = 3
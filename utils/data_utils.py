@@ -1,9 +1,26 @@
 import re
-import pandas as pd
+import numpy as np
 import os
 
+from .phrase_cache import load_phrase_cache, write_phrase_cache
+from .profiling import profiled, profile_stage
+
+# Column types used to parse PhraseBur CSVs: ids and the (constant) segment
+# type are stored once per distinct value, segment numbers fit in 32 bits
+PHRASEBUR_CSV_DTYPES = {
+    'id': 'category',
+    'seg_type': 'category',
+    'seg_id': np.int32,
+    'swing_ratios': np.float64
+}
+
 def get_artist_from_id(id_str):
-    """Extract and format artist name from id string."""
+    """
+    Extract and format artist name from id string.
+
+    Called once per unique solo by group_phrases; per-phrase code should use
+    the 'artists' table and phrase_artist_codes instead.
+    """
     artist = id_str.split('_')[0]
     artist = re.sub(r'(?<!^)([A-Z])', r' \1', artist)
     return artist
@@ -12,6 +29,145 @@ def ensure_output_dir(path="outputs"):
     """Create output directory if it doesn't exist."""
     os.makedirs(path, exist_ok=True)
 
-def load_phrasebur_csv(filename="data/phrasebur_filtered.csv"):
-    """Load filtered PhraseBur data with correct separator."""
-    return pd.read_csv(filename, sep=';')
+def load_phrasebur_csv(filename="data/phrasebur_filtered.csv", use_cache=False):
+    """
+    Load PhraseBur data as a DataFrame with the CSV's rows in file order.
+
+    Columns follow PHRASEBUR_CSV_DTYPES (categorical 'id' and 'seg_type',
+    int32 'seg_id'). With use_cache=True the frame is instead rebuilt from
+    the columnar phrase cache (see load_phrasebur_phrases), which writes the
+    cache next to the CSV: rows come in df.groupby(['id', 'seg_id']) order,
+    with an added 'artist' column.
+    """
+    import pandas as pd
+
+    if not use_cache:
+        return pd.read_csv(filename, sep=';', dtype=PHRASEBUR_CSV_DTYPES)
+    return phrases_to_frame(load_phrasebur_phrases(filename))
+
+@profiled(rows=lambda phrases: len(phrases['values']))
+def load_phrasebur_phrases(filename="data/phrasebur_filtered.csv", use_cache=True, bur_dtype=None):
+    """
+    Load PhraseBur data as grouped phrases (see group_phrases).
+
+    Memory-maps the cache next to the CSV when it is up to date; otherwise
+    parses the CSV and (re)writes the cache. An unwritable data directory
+    just skips the cache.
+
+    Args:
+        filename: PhraseBur CSV
+        use_cache: Read and write the phrase cache next to the CSV
+        bur_dtype: Optional dtype for the flat BUR array, e.g. np.float32 to
+                   halve its resident size (default: float64 as cached)
+
+    Note:
+        The cache always holds float64 BUR values; a narrower bur_dtype is an
+        in-memory copy. The analyses compute in float64 either way, so
+        float32 values shift results at the 1e-7 level.
+    """
+    phrases = load_phrase_cache(filename) if use_cache else None
+    if phrases is None:
+        # pandas is only needed to parse the CSV, not for cache hits
+        import pandas as pd
+
+        with profile_stage('read_csv') as stage:
+            df = pd.read_csv(filename, sep=';', dtype=PHRASEBUR_CSV_DTYPES)
+            stage.add_rows(len(df))
+        phrases = group_phrases(df)
+        del df
+
+        if use_cache:
+            try:
+                write_phrase_cache(filename, phrases)
+            except OSError:
+                pass
+
+    if bur_dtype is not None:
+        phrases['values'] = phrases['values'].astype(bur_dtype, copy=False)
+    return phrases
+
+@profiled(rows=lambda phrases: len(phrases['values']))
+def group_phrases(df):
+    """
+    Group PhraseBur rows into phrases stored as one flat BUR array.
+
+    Phrases follow df.groupby(['id', 'seg_id']) order and keep their BUR order.
+    Returns a dict with:
+        - values: flat float64 BUR array
+        - offsets: CSR-style boundaries (phrase i is values[offsets[i]:offsets[i + 1]])
+        - seg_id (int32), solo_code, seg_type_code: per-phrase arrays
+        - solo_ids, seg_types: lookup tables for the per-phrase codes
+        - solo_artist_code, artists: per-solo artist code and artist name table
+
+    Note:
+        Rows are ordered by integer codes into the sorted distinct ids, so
+        'id' and 'seg_type' may be object or categorical columns and no
+        per-row string array is built.
+    """
+    import pandas as pd
+
+    id_code, solo_ids = pd.factorize(df['id'], sort=True)
+    seg_ids = df['seg_id'].to_numpy(dtype=np.int32)
+    order = np.lexsort((seg_ids, id_code))
+    id_code = id_code[order]
+    seg_ids = seg_ids[order]
+    is_start = np.ones(len(order), dtype=bool)
+    is_start[1:] = (id_code[1:] != id_code[:-1]) | (seg_ids[1:] != seg_ids[:-1])
+    starts = np.flatnonzero(is_start)
+
+    seg_type_code, seg_types = pd.factorize(df['seg_type'], sort=True)
+    solo_ids = np.asarray(solo_ids, dtype=str)
+    artists, solo_artist_code = np.unique(
+        [get_artist_from_id(solo_id) for solo_id in solo_ids], return_inverse=True
+    )
+
+    return {
+        'values': df['swing_ratios'].to_numpy(dtype=float)[order],
+        'offsets': np.append(starts, len(order)).astype(np.int64),
+        'seg_id': seg_ids[starts],
+        'solo_code': id_code[starts].astype(np.int32),
+        'seg_type_code': seg_type_code[order][starts].astype(np.int32),
+        'solo_ids': solo_ids,
+        'seg_types': np.asarray(seg_types, dtype=str),
+        'solo_artist_code': solo_artist_code.astype(np.int32),
+        'artists': np.asarray(artists, dtype=str)
+    }
+
+def iter_phrase_values(phrases):
+    """
+    Yield every phrase's BUR values as a view into phrases['values'].
+
+    The views share the flat (possibly memory-mapped) buffer, so per-phrase
+    code gets arrays without copying; copy one before modifying it.
+    """
+    values = phrases['values']
+    offsets = np.asarray(phrases['offsets'], dtype=np.int64).tolist()
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        yield values[start:end]
+
+def phrase_artist_codes(phrases):
+    """Artist code (index into phrases['artists']) for every phrase."""
+    return np.asarray(phrases['solo_artist_code'])[phrases['solo_code']]
+
+def phrases_to_frame(phrases):
+    """
+    Expand grouped phrases back into a PhraseBur DataFrame (one row per BUR value).
+
+    'id', 'seg_type' and the derived 'artist' column are categoricals built
+    from the cached lookup tables, so each name is stored once.
+    """
+    import pandas as pd
+
+    lengths = np.diff(phrases['offsets'])
+    solo_code = np.repeat(np.asarray(phrases['solo_code']), lengths)
+    return pd.DataFrame({
+        'id': pd.Categorical.from_codes(solo_code, categories=np.asarray(phrases['solo_ids'])),
+        'seg_type': pd.Categorical.from_codes(
+            np.repeat(np.asarray(phrases['seg_type_code']), lengths), categories=np.asarray(phrases['seg_types'])
+        ),
+        'seg_id': np.repeat(np.asarray(phrases['seg_id'], dtype=np.int32), lengths),
+        'swing_ratios': np.array(phrases['values'], dtype=float),
+        'artist': pd.Categorical.from_codes(
+            np.asarray(phrases['solo_artist_code'])[solo_code], categories=np.asarray(phrases['artists'])
+        )
+    })
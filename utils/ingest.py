@@ -0,0 +1,260 @@
+"""
+Directory ingest of MeloSpyGUI exports.
+
+Merges many PhraseBur export CSVs (one per database or batch of solos) into
+one filtered corpus file:
+
+- Discovers export CSVs in the given files and directories
+- Parses and validates them in a process pool; each worker applies the
+  clean_phrasebur_data minimum-length filter before returning, so the
+  merged corpus never exists unfiltered in memory
+- Drops solos already seen in an earlier file
+- Writes the corpus (and optionally its phrase cache) in a deterministic
+  order: files sorted by path, rows in their input order
+"""
+
+import glob
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from utils.config import MIN_BUR_VALUES
+from utils.clean_data import _cleaning_stats
+from utils.data_utils import PHRASEBUR_CSV_DTYPES, group_phrases
+from utils.phrase_cache import write_phrase_cache
+from utils.profiling import profiled
+
+# Columns every export must have, in this order
+EXPORT_COLUMNS = tuple(PHRASEBUR_CSV_DTYPES)
+
+
+def discover_exports(paths, pattern='*.csv'):
+    """
+    Export CSVs named by paths, sorted for a deterministic merge order.
+
+    Args:
+        paths: Files and/or directories; directories are searched recursively
+        pattern: File name pattern matched inside directories (default: *.csv)
+
+    Returns:
+        List of file paths, each directory's matches sorted by relative path
+        and given in the order of paths (repeats dropped)
+
+    Raises:
+        FileNotFoundError: If a path does not exist
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(glob.escape(path), '**', pattern), recursive=True)
+            matches = [match for match in matches if os.path.isfile(match)]
+            found.extend(sorted(matches, key=lambda match: os.path.relpath(match, path)))
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return list(dict.fromkeys(os.path.normpath(path) for path in found))
+
+
+def _solo_digests(df):
+    """SHA-256 of every solo's rows, to tell identical duplicates from conflicting ones."""
+    import pandas as pd
+
+    row_hashes = pd.util.hash_pandas_object(df[list(EXPORT_COLUMNS[1:])], index=False).to_numpy()
+    codes, solos = pd.factorize(df['id'])
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(solos) + 1))
+    return {
+        str(solo): hashlib.sha256(row_hashes[order[start:stop]].tobytes()).hexdigest()
+        for solo, start, stop in zip(solos, bounds[:-1], bounds[1:])
+    }
+
+
+def _ingest_file(task):
+    """
+    Worker entry point: parse, validate and filter one export.
+
+    Returns:
+        Dictionary with path and either error, or rows (filtered DataFrame),
+        per-solo digests, the original row and phrase counts, and
+        solo_counts (solo -> (original rows, original phrases))
+    """
+    import pandas as pd
+
+    path, min_bur_values = task
+    try:
+        with open(path, newline='') as f:
+            header = f.readline().rstrip('\r\n').split(';')
+        if tuple(header) != EXPORT_COLUMNS:
+            raise ValueError(f"expected columns {';'.join(EXPORT_COLUMNS)}, found {';'.join(header)}")
+        df = pd.read_csv(path, sep=';', dtype=PHRASEBUR_CSV_DTYPES)
+        missing = [name for name in EXPORT_COLUMNS if df[name].isna().any()]
+        if missing:
+            raise ValueError(f"missing values in {', '.join(missing)}")
+    except (OSError, UnicodeDecodeError, ValueError) as error:
+        return {'path': path, 'error': str(error)}
+
+    # Same filter as clean_phrasebur_data: drop phrases with too few BUR values
+    phrases = df.groupby(['id', 'seg_id'], observed=True, sort=False)['seg_id']
+    valid = phrases.transform('size').to_numpy() >= min_bur_values
+    solo_rows = df.groupby('id', observed=True, sort=False).size()
+    solo_phrases = df.groupby('id', observed=True, sort=False)['seg_id'].nunique()
+    return {
+        'path': path,
+        'rows': df[valid].reset_index(drop=True),
+        'digests': _solo_digests(df),
+        'original_rows': len(df),
+        'original_phrases': phrases.ngroups,
+        'solo_counts': {str(solo): (int(solo_rows[solo]), int(solo_phrases[solo])) for solo in solo_rows.index}
+    }
+
+
+@profiled(rows=lambda stats: stats['original_rows'])
+def ingest_exports(paths, output_csv='data/phrasebur_filtered.csv', min_bur_values=MIN_BUR_VALUES,
+                   n_workers=None, pattern='*.csv', skip_invalid=False, write_cache=False):
+    """
+    Merge directories of PhraseBur exports into one filtered corpus CSV.
+
+    Args:
+        paths: Export files and/or directories (searched recursively)
+        output_csv: Merged corpus file (default: data/phrasebur_filtered.csv)
+        min_bur_values: Minimum number of BUR values per phrase (default: 6)
+        n_workers: Worker processes parsing exports (default: os.cpu_count(); 1 = inline)
+        pattern: File name pattern inside directories (default: *.csv)
+        skip_invalid: Skip exports that fail validation instead of raising
+        write_cache: Also write the phrase cache for output_csv
+
+    Returns:
+        Dictionary with the clean_phrasebur_data statistics over the kept
+        solos plus n_files, invalid_files (path -> reason), duplicate_solos,
+        conflicting_solos (duplicates whose rows differ) and duplicate_rows
+        (rows of the dropped copies, before the length filter)
+
+    Raises:
+        ValueError: If no exports are found, or an export has the wrong
+                    columns or unparseable values (unless skip_invalid)
+
+    Note:
+        - A solo found in several exports is kept from the first file in
+          merge order; later copies are dropped whether or not they match
+        - Dropped copies count only towards duplicate_rows, so original_rows
+          and rows_removed describe the same corpus clean_phrasebur_data
+          would see after deduplication
+        - Output rows follow the merge order, so the same inputs always
+          give the same file
+    """
+    import pandas as pd
+
+    files = discover_exports(paths, pattern=pattern)
+    if not files:
+        raise ValueError(f"No export files matching {pattern} in {', '.join(paths)}")
+    tasks = [(path, min_bur_values) for path in files]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers == 1:
+        results = [_ingest_file(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_ingest_file, tasks))
+
+    invalid_files = {result['path']: result['error'] for result in results if 'error' in result}
+    if invalid_files and not skip_invalid:
+        details = '\n'.join(f"  {path}: {reason}" for path, reason in invalid_files.items())
+        raise ValueError(f"{len(invalid_files)} export(s) failed validation:\n{details}")
+    results = [result for result in results if 'error' not in result]
+
+    # Keep each solo from the first export that has it
+    seen = {}
+    conflicting = set()
+    kept_frames = []
+    duplicate_rows = 0
+    duplicate_phrases = 0
+    for result in results:
+        duplicates = [solo for solo in result['digests'] if solo in seen]
+        conflicting.update(solo for solo in duplicates if seen[solo] != result['digests'][solo])
+        for solo in result['digests']:
+            seen.setdefault(solo, result['digests'][solo])
+        rows = result['rows']
+        if duplicates:
+            duplicate_rows += sum(result['solo_counts'][solo][0] for solo in duplicates)
+            duplicate_phrases += sum(result['solo_counts'][solo][1] for solo in duplicates)
+            rows = rows[~rows['id'].isin(duplicates).to_numpy()]
+        kept_frames.append(rows)
+    n_duplicate_solos = sum(len(result['digests']) for result in results) - len(seen)
+
+    if kept_frames:
+        merged = pd.concat(kept_frames, ignore_index=True)
+    else:
+        merged = pd.DataFrame({name: pd.Series(dtype=object) for name in EXPORT_COLUMNS})
+    merged = merged.astype({'id': str, 'seg_type': str})
+    output_dir = os.path.dirname(output_csv)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    merged.to_csv(output_csv, sep=';', index=False)
+    if write_cache and len(merged):
+        write_phrase_cache(output_csv, group_phrases(merged))
+
+    original_rows = sum(result['original_rows'] for result in results) - duplicate_rows
+    original_phrases = sum(result['original_phrases'] for result in results) - duplicate_phrases
+    cleaned_phrases = int(merged.groupby(['id', 'seg_id']).ngroups) if len(merged) else 0
+    return {
+        **_cleaning_stats(original_rows, len(merged), original_phrases, cleaned_phrases, min_bur_values),
+        'n_files': len(files),
+        'invalid_files': invalid_files,
+        'duplicate_solos': n_duplicate_solos,
+        'conflicting_solos': len(conflicting),
+        'duplicate_rows': duplicate_rows
+    }
+
+
+def main():
+    """Command-line interface for directory ingest."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Merge directories of PhraseBur exports into one filtered corpus'
+    )
+    parser.add_argument('paths', nargs='+', help='Export CSVs and/or directories of exports')
+    parser.add_argument('--output', '-o', default='data/phrasebur_filtered.csv',
+                        help='Merged corpus CSV (default: data/phrasebur_filtered.csv)')
+    parser.add_argument('--min-values', '-n', type=int, default=MIN_BUR_VALUES,
+                        help=f'Minimum number of BUR values per phrase (default: {MIN_BUR_VALUES})')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--pattern', default='*.csv',
+                        help='File name pattern inside directories (default: *.csv)')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='Skip exports that fail validation instead of stopping')
+    parser.add_argument('--cache', action='store_true',
+                        help='Also write the phrase cache next to the output')
+    args = parser.parse_args()
+
+    stats = ingest_exports(
+        args.paths,
+        output_csv=args.output,
+        min_bur_values=args.min_values,
+        n_workers=args.workers,
+        pattern=args.pattern,
+        skip_invalid=args.skip_invalid,
+        write_cache=args.cache
+    )
+
+    print("=" * 60)
+    print("INGEST SUMMARY")
+    print("=" * 60)
+    print(f"Export files:            {stats['n_files']:,}")
+    for path, reason in stats['invalid_files'].items():
+        print(f"  Skipped {path}: {reason}")
+    print(f"Duplicate solos dropped: {stats['duplicate_solos']:,} "
+          f"({stats['conflicting_solos']:,} with differing rows; {stats['duplicate_rows']:,} rows)")
+    print(f"Original rows:           {stats['original_rows']:,} ({stats['original_phrases']:,} phrases)")
+    print(f"Rows removed:            {stats['rows_removed']:,} ({stats['rows_removed_pct']:.1f}%)")
+    print(f"Corpus (n >= {stats['min_bur_values']}):         "
+          f"{stats['cleaned_rows']:,} rows, {stats['cleaned_phrases']:,} phrases")
+    print()
+    print(f"Output saved to: {args.output}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
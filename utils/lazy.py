@@ -0,0 +1,39 @@
+"""
+Lazy package exports.
+
+Package __init__ modules list their public names and the submodule that
+defines each one; the submodule (and its numpy/pandas/scipy imports) is only
+imported when one of its names is first used.
+
+    __getattr__, __dir__ = lazy_exports(__name__, {'load_results': 'results_io', ...})
+"""
+
+import importlib
+
+
+def lazy_exports(package, exports):
+    """
+    Module-level __getattr__ and __dir__ for a package with lazily imported exports.
+
+    Args:
+        package: The package's __name__
+        exports: Dictionary mapping each exported name to the submodule
+                 (relative to the package) that defines it
+
+    Returns:
+        Tuple of (__getattr__, __dir__) to assign in the package namespace
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f'.{exports[name]}', package), name)
+        # Cache on the package so later lookups skip __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,178 @@
+"""
+Columnar phrase cache for PhraseBur CSV exports.
+
+Stores grouped phrases as plain .npy files in a directory next to the CSV
+(e.g. data/phrasebur_filtered.cache/) so analyses can memory-map them instead
+of re-parsing the CSV:
+
+- values.npy:           flat float64 BUR array, phrases stored back to back
+- offsets.npy:          int64 phrase boundaries (CSR-style, n_phrases + 1)
+- seg_id.npy:           per-phrase segment id
+- solo_code.npy:        per-phrase index into solo_ids.npy
+- seg_type_code.npy:    per-phrase index into seg_types.npy
+- solo_artist_code.npy: per-solo index into artists.npy
+- meta.json:            source size, mtime and SHA-256 used for invalidation
+
+Arrays are loaded with np.load(mmap_mode='r'), so processes reading the same
+cache share its pages through the OS page cache.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .profiling import profiled
+
+CACHE_FORMAT_VERSION = 2
+
+# Arrays making up a cached phrase table (keys of the grouped phrase dict)
+CACHE_ARRAYS = (
+    'values',
+    'offsets',
+    'seg_id',
+    'solo_code',
+    'seg_type_code',
+    'solo_ids',
+    'seg_types',
+    'solo_artist_code',
+    'artists'
+)
+
+
+def cache_dir_for(csv_path):
+    """Cache directory for a CSV file: same folder, '.cache' instead of '.csv'."""
+    root, _ = os.path.splitext(csv_path)
+    return root + '.cache'
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    path = os.path.join(cache_dir, 'meta.json')
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_cache_valid(csv_path, cache_dir=None):
+    """
+    Check whether the cache for csv_path matches the current source file.
+
+    Args:
+        csv_path: Path to the source CSV
+        cache_dir: Cache directory (default: cache_dir_for(csv_path))
+
+    Returns:
+        True if the cache can be used as-is
+
+    Note:
+        - Size and mtime are compared first (cheap)
+        - If only the mtime changed, the file is re-hashed; an unchanged hash
+          keeps the cache and records the new mtime
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    meta = _read_meta(cache_dir)
+    if meta is None or meta.get('format_version') != CACHE_FORMAT_VERSION:
+        return False
+    if not all(os.path.exists(os.path.join(cache_dir, f"{name}.npy")) for name in CACHE_ARRAYS):
+        return False
+
+    source = os.stat(csv_path)
+    if source.st_size != meta['source_size']:
+        return False
+    if source.st_mtime_ns == meta['source_mtime_ns']:
+        return True
+
+    if file_sha256(csv_path) != meta['source_sha256']:
+        return False
+    meta['source_mtime_ns'] = source.st_mtime_ns
+    try:
+        _write_meta(cache_dir, meta)
+    except OSError:
+        pass
+    return True
+
+
+@profiled()
+def write_phrase_cache(csv_path, phrases, cache_dir=None):
+    """
+    Write grouped phrases as a columnar cache next to the source CSV.
+
+    Args:
+        csv_path: Path to the source CSV (used for invalidation metadata)
+        phrases: Grouped phrase dict as returned by utils.data_utils.group_phrases
+        cache_dir: Cache directory (default: cache_dir_for(csv_path))
+
+    Returns:
+        str: Path to the cache directory
+
+    Note:
+        Each array is written to a temporary file and moved into place, and
+        meta.json is written last, so concurrent readers never see a
+        half-written cache as valid.
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    source = os.stat(csv_path)
+    source_sha256 = file_sha256(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Drop stale metadata first so readers fall back to the CSV mid-write
+    try:
+        os.remove(os.path.join(cache_dir, 'meta.json'))
+    except FileNotFoundError:
+        pass
+
+    for name in CACHE_ARRAYS:
+        path = os.path.join(cache_dir, f"{name}.npy")
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.asarray(phrases[name]))
+        os.replace(tmp_path, path)
+
+    _write_meta(cache_dir, {
+        'format_version': CACHE_FORMAT_VERSION,
+        'source_size': source.st_size,
+        'source_mtime_ns': source.st_mtime_ns,
+        'source_sha256': source_sha256
+    })
+    return cache_dir
+
+
+@profiled(rows=lambda phrases: len(phrases['values']))
+def load_phrase_cache(csv_path, cache_dir=None):
+    """
+    Memory-map the cached phrase table for csv_path.
+
+    Args:
+        csv_path: Path to the source CSV
+        cache_dir: Cache directory (default: cache_dir_for(csv_path))
+
+    Returns:
+        Grouped phrase dict of read-only memory-mapped arrays, or None if the
+        cache is missing or stale
+    """
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    if not is_cache_valid(csv_path, cache_dir):
+        return None
+    return {
+        name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode='r')
+        for name in CACHE_ARRAYS
+    }
@@ -0,0 +1,335 @@
+"""
+Opt-in stage profiling for loaders, analyses and writers.
+
+Pipeline stages are wrapped with @profiled or profile_stage(). While
+profiling is off, a wrapped call costs one global lookup and the stage
+context is a shared no-op object, so the hooks stay in production code.
+
+When enabled, every stage records wall time, call count, rows processed
+(CSV rows or BUR values for loaders and writers, phrases for per-phrase
+analyses), peak RSS and optionally the tracemalloc peak.
+A summary table is printed to stderr at exit; a JSON trace and a cProfile
+file can be written as well.
+
+Enable with environment variables (any CLI):
+    PHRASEBUR_PROFILE=1               summary table at exit
+    PHRASEBUR_PROFILE_JSON=trace.json also write every stage event as JSON
+    PHRASEBUR_CPROFILE=run.prof       also run cProfile and dump its stats
+    PHRASEBUR_PROFILE_MEMORY=1        also track the tracemalloc peak (slower)
+
+or with the pipeline flags --profile, --profile-json, --cprofile and
+--profile-memory.
+"""
+
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+PROFILE_ENV_VAR = 'PHRASEBUR_PROFILE'
+PROFILE_JSON_ENV_VAR = 'PHRASEBUR_PROFILE_JSON'
+CPROFILE_ENV_VAR = 'PHRASEBUR_CPROFILE'
+PROFILE_MEMORY_ENV_VAR = 'PHRASEBUR_PROFILE_MEMORY'
+
+# Active profiler, or None while profiling is off
+_profiler = None
+
+
+class _NullStage:
+    """Stage stand-in used while profiling is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_rows(self, n_rows):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _read_peak_rss_mb():
+    """Peak RSS since the last reset (VmHWM), or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark; returns False if not supported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class _Stage:
+    """One timed call of a stage."""
+
+    __slots__ = ('profiler', 'name', 'rows', 'start', 'peak_rss_mb', 'peak_traced_mb')
+
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.peak_rss_mb = None
+        self.peak_traced_mb = None
+
+    def add_rows(self, n_rows):
+        self.rows = (self.rows or 0) + int(n_rows)
+
+    def __enter__(self):
+        self.profiler._start(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._finish(self)
+        return False
+
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class _Profiler:
+    """Collects stage events for one process."""
+
+    def __init__(self, json_path=None, cprofile_path=None, trace_memory=False):
+        self.json_path = json_path
+        self.cprofile_path = cprofile_path
+        self.trace_memory = trace_memory
+        self.events = []
+        self.stack = []
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.rss_resettable = _reset_peak_rss()
+        self.cprofile = None
+
+        if trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        if cprofile_path:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def _sample_peaks(self):
+        """Current peaks; each stage resets them, so a parent folds in its children's."""
+        peak_traced = None
+        if self.trace_memory:
+            import tracemalloc
+            peak_traced = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        return _read_peak_rss_mb(), peak_traced
+
+    def _reset_peaks(self):
+        if self.rss_resettable:
+            _reset_peak_rss()
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.reset_peak()
+
+    def _start(self, stage):
+        if self.stack:
+            parent = self.stack[-1]
+            peak_rss, peak_traced = self._sample_peaks()
+            parent.peak_rss_mb = _max(parent.peak_rss_mb, peak_rss)
+            parent.peak_traced_mb = _max(parent.peak_traced_mb, peak_traced)
+        self._reset_peaks()
+        self.stack.append(stage)
+        stage.start = time.perf_counter()
+
+    def _finish(self, stage):
+        seconds = time.perf_counter() - stage.start
+        peak_rss, peak_traced = self._sample_peaks()
+        stage.peak_rss_mb = _max(stage.peak_rss_mb, peak_rss)
+        stage.peak_traced_mb = _max(stage.peak_traced_mb, peak_traced)
+        self.stack.pop()
+        if self.stack:
+            parent = self.stack[-1]
+            parent.peak_rss_mb = _max(parent.peak_rss_mb, stage.peak_rss_mb)
+            parent.peak_traced_mb = _max(parent.peak_traced_mb, stage.peak_traced_mb)
+
+        self.events.append({
+            'name': stage.name,
+            'depth': len(self.stack),
+            'start': stage.start - self.origin,
+            'seconds': seconds,
+            'rows': stage.rows,
+            'peak_rss_mb': stage.peak_rss_mb,
+            'peak_traced_mb': stage.peak_traced_mb,
+            'pid': os.getpid()
+        })
+
+    def finish(self):
+        """Stop cProfile and write the summary table, JSON trace and cProfile stats."""
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_path)
+        print_profile_summary(file=sys.stderr)
+        if self.json_path:
+            with open(self.json_path, 'w') as f:
+                json.dump({'summary': profile_summary(), 'events': self.events}, f, indent=2)
+        if self.cprofile is not None:
+            print(f"cProfile stats saved to: {self.cprofile_path}", file=sys.stderr)
+        if self.json_path:
+            print(f"Profile trace saved to: {self.json_path}", file=sys.stderr)
+
+
+def _finish_at_exit():
+    # Only the process that enabled profiling reports (not pool workers)
+    if _profiler is not None and _profiler.pid == os.getpid() and multiprocessing.parent_process() is None:
+        _profiler.finish()
+
+
+def enable_profiling(json_path=None, cprofile_path=None, trace_memory=False):
+    """
+    Turn stage profiling on for this process.
+
+    Args:
+        json_path: Also write the stage events and summary to this JSON file
+        cprofile_path: Also run cProfile and dump its stats to this file
+        trace_memory: Also record the tracemalloc peak per stage (slower)
+
+    Note:
+        The summary is printed to stderr at exit. Calling this again keeps
+        the events recorded so far.
+    """
+    global _profiler
+    events = _profiler.events if _profiler is not None else []
+    if _profiler is None:
+        atexit.register(_finish_at_exit)
+    elif _profiler.cprofile is not None:
+        _profiler.cprofile.disable()
+    _profiler = _Profiler(json_path, cprofile_path, trace_memory)
+    _profiler.events = events
+
+
+def profiling_enabled():
+    """True if stage profiling is on in this process."""
+    return _profiler is not None
+
+
+def profile_stage(name, rows=None):
+    """
+    Context manager timing one stage; use .add_rows(n) inside for counts known later.
+
+    Args:
+        name: Stage name shown in the summary
+        rows: Rows processed, if known up front
+    """
+    if _profiler is None:
+        return _NULL_STAGE
+    return _Stage(_profiler, name, rows)
+
+
+def profiled(name=None, rows=None):
+    """
+    Decorator timing every call of a function as a stage.
+
+    Args:
+        name: Stage name (default: the function name)
+        rows: Optional function mapping the call's result to rows processed
+    """
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _Stage(_profiler, stage_name, None) as stage:
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    stage.add_rows(rows(result))
+                return result
+        return wrapper
+    return decorate
+
+
+def profile_events(since=0):
+    """Stage events recorded so far in this process (from index since)."""
+    if _profiler is None:
+        return []
+    return _profiler.events[since:]
+
+
+def record_profile_events(events):
+    """Add stage events recorded in another process (e.g. a pool worker)."""
+    if _profiler is not None:
+        _profiler.events.extend(events)
+
+
+def profile_summary():
+    """
+    Stage events aggregated by name, in order of first completion.
+
+    Returns:
+        List of dictionaries with name, calls, seconds (total), rows (total
+        or None), peak_rss_mb and peak_traced_mb (largest over calls)
+    """
+    summary = {}
+    for event in profile_events():
+        row = summary.setdefault(event['name'], {
+            'name': event['name'],
+            'calls': 0,
+            'seconds': 0.0,
+            'rows': None,
+            'peak_rss_mb': None,
+            'peak_traced_mb': None
+        })
+        row['calls'] += 1
+        row['seconds'] += event['seconds']
+        if event['rows'] is not None:
+            row['rows'] = (row['rows'] or 0) + event['rows']
+        row['peak_rss_mb'] = _max(row['peak_rss_mb'], event['peak_rss_mb'])
+        row['peak_traced_mb'] = _max(row['peak_traced_mb'], event['peak_traced_mb'])
+    return list(summary.values())
+
+
+def print_profile_summary(file=None):
+    """Print the per-stage summary table (default: stdout)."""
+    file = file or sys.stdout
+    rows = profile_summary()
+    if not rows:
+        return
+    width = max(len(row['name']) for row in rows)
+    print("=" * (width + 56), file=file)
+    print(f"{'stage':<{width}} {'calls':>6} {'seconds':>9} {'rows':>12} {'peak RSS':>10} {'peak traced':>12}",
+          file=file)
+    print("-" * (width + 56), file=file)
+    for row in sorted(rows, key=lambda row: -row['seconds']):
+        rows_text = f"{row['rows']:,}" if row['rows'] is not None else '-'
+        rss_text = f"{row['peak_rss_mb']:.1f} MiB" if row['peak_rss_mb'] is not None else '-'
+        traced_text = f"{row['peak_traced_mb']:.1f} MiB" if row['peak_traced_mb'] is not None else '-'
+        print(f"{row['name']:<{width}} {row['calls']:>6} {row['seconds']:>9.3f} {rows_text:>12} "
+              f"{rss_text:>10} {traced_text:>12}", file=file)
+    print("=" * (width + 56), file=file)
+
+
+def _enable_from_environment():
+    json_path = os.environ.get(PROFILE_JSON_ENV_VAR) or None
+    cprofile_path = os.environ.get(CPROFILE_ENV_VAR) or None
+    trace_memory = os.environ.get(PROFILE_MEMORY_ENV_VAR, '') not in ('', '0')
+    if os.environ.get(PROFILE_ENV_VAR, '') not in ('', '0') or json_path or cprofile_path or trace_memory:
+        enable_profiling(json_path, cprofile_path, trace_memory)
+
+
+_enable_from_environment()
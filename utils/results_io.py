@@ -0,0 +1,164 @@
+"""
+Typed columnar result files.
+
+The analysis CLIs write CSV by default. For downstream tools that load the
+results repeatedly, the same tables can be written as:
+
+- npz:     one .npz archive; numeric and boolean columns keep their dtype,
+           string columns (id, artist, direction, ...) are stored as int32
+           codes plus a categories array
+- feather: Arrow IPC file with dictionary-encoded string columns (needs pyarrow)
+- parquet: Parquet file with dictionary-encoded string columns (needs pyarrow)
+
+load_results() reads any of these back as a DataFrame with categorical
+string columns, without re-parsing floats.
+"""
+
+import os
+
+import numpy as np
+
+from utils.profiling import profile_stage
+
+RESULT_FORMATS = ('csv', 'npz', 'feather', 'parquet')
+
+RESULT_EXTENSIONS = {
+    'csv': '.csv',
+    'npz': '.npz',
+    'feather': '.feather',
+    'parquet': '.parquet'
+}
+
+# Names of the npz members holding column order and dictionary encoding
+_NPZ_COLUMNS = '__columns__'
+_NPZ_CODES = '.codes'
+_NPZ_CATEGORIES = '.categories'
+
+
+def results_path(output_dir, name, output_format='csv'):
+    """Path of a result table, e.g. results_path('outputs', 'phrase_bur_variation', 'npz')."""
+    if output_format not in RESULT_FORMATS:
+        raise ValueError(f"output_format must be one of {RESULT_FORMATS}, got {output_format!r}")
+    return os.path.join(output_dir, name + RESULT_EXTENSIONS[output_format])
+
+
+def _is_string_column(column):
+    import pandas as pd
+
+    return isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == object or pd.api.types.is_string_dtype(column)
+
+
+def _dictionary_encode(df):
+    """Copy of df with every string column as a categorical."""
+    import pandas as pd
+
+    return df.assign(**{
+        name: df[name].astype('category')
+        for name in df.columns
+        if _is_string_column(df[name]) and not isinstance(df[name].dtype, pd.CategoricalDtype)
+    })
+
+
+def _require_pyarrow(output_format):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            f"Writing or reading {output_format} results needs pyarrow (pip install pyarrow); "
+            f"use output_format='npz' for a typed format without extra dependencies"
+        ) from None
+
+
+def check_results_format(output_format):
+    """Raise before any work is done if output_format is unknown or its dependency is missing."""
+    if output_format not in RESULT_FORMATS:
+        raise ValueError(f"output_format must be one of {RESULT_FORMATS}, got {output_format!r}")
+    if output_format in ('feather', 'parquet'):
+        _require_pyarrow(output_format)
+
+
+def _write_npz(df, path):
+    import pandas as pd
+
+    arrays = {_NPZ_COLUMNS: np.asarray(df.columns, dtype=str)}
+    for name in df.columns:
+        column = df[name]
+        if _is_string_column(column):
+            categorical = pd.Categorical(column)
+            arrays[name + _NPZ_CODES] = categorical.codes.astype(np.int32)
+            arrays[name + _NPZ_CATEGORIES] = np.asarray(categorical.categories, dtype=str)
+        else:
+            arrays[name] = column.to_numpy()
+    np.savez(path, **arrays)
+
+
+def _read_npz(path):
+    import pandas as pd
+
+    with np.load(path, allow_pickle=False) as data:
+        columns = {}
+        for name in data[_NPZ_COLUMNS]:
+            if name + _NPZ_CODES in data.files:
+                columns[name] = pd.Categorical.from_codes(
+                    data[name + _NPZ_CODES], categories=data[name + _NPZ_CATEGORIES]
+                )
+            else:
+                columns[name] = data[name]
+    return pd.DataFrame(columns)
+
+
+def write_results(df, output_dir, name, output_format='csv'):
+    """
+    Write a result table in the requested format.
+
+    Args:
+        df: Result table
+        output_dir: Output directory (created if missing)
+        name: File name without extension, e.g. 'bur_surge_results_fdr'
+        output_format: 'csv' (default), 'npz', 'feather' or 'parquet'
+
+    Returns:
+        str: Path of the written file
+    """
+    path = results_path(output_dir, name, output_format)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with profile_stage(f"write {os.path.basename(path)}", rows=len(df)):
+        if output_format == 'csv':
+            df.to_csv(path, index=False)
+        elif output_format == 'npz':
+            _write_npz(df, path)
+        else:
+            _require_pyarrow(output_format)
+            encoded = _dictionary_encode(df.reset_index(drop=True))
+            if output_format == 'feather':
+                encoded.to_feather(path)
+            else:
+                encoded.to_parquet(path, index=False)
+    return path
+
+
+def load_results(path):
+    """
+    Read a result table written by write_results.
+
+    Args:
+        path: .csv, .npz, .feather or .parquet file
+
+    Returns:
+        DataFrame; string columns are categoricals for the columnar formats
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(path)
+    if extension == '.npz':
+        return _read_npz(path)
+    if extension == '.feather':
+        _require_pyarrow('feather')
+        return pd.read_feather(path)
+    if extension == '.parquet':
+        _require_pyarrow('parquet')
+        return pd.read_parquet(path)
+    raise ValueError(f"Unknown result file type: {path}")
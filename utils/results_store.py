@@ -0,0 +1,240 @@
+"""
+Persistent per-phrase results store for incremental recomputation.
+
+Per-phrase results (trend stats, variation stats, histogram bins) are saved
+in one .npz file per analysis stage and parameter set, keyed by a 64-bit
+hash of each phrase's BUR sequence. On a rerun only phrases whose hash is
+not in the store are computed; everything else is read back, so the cost
+of a corpus update scales with the number of new or changed phrases.
+
+Global steps that depend on all phrases at once (FDR correction, per-artist
+aggregation) are not stored and are always redone on the merged results.
+
+Layout:
+    <store_dir>/<stage>-<params digest>.npz   with a sorted 'key' array plus
+                                              one array per result column
+
+The store lives in the output directory (<output_dir>/.phrase_results)
+unless a store_dir is given. Entries of phrases that are no longer in the
+corpus stay until prune_store drops them.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from utils.profiling import profiled, profile_stage
+
+# Store directory name inside an output directory
+STORE_DIRNAME = '.phrase_results'
+
+# Placeholder default meaning <output_dir>/.phrase_results (see resolve_store_dir)
+DEFAULT_STORE_DIR = os.path.join('<output-dir>', STORE_DIRNAME)
+
+# Bump when the hashing scheme changes so old stores are ignored
+STORE_FORMAT_VERSION = 1
+
+_MIX_1 = np.uint64(0xbf58476d1ce4e5b9)
+_MIX_2 = np.uint64(0x94d049bb133111eb)
+_GOLDEN = np.uint64(0x9e3779b97f4a7c15)
+
+
+def resolve_store_dir(store_dir, output_dir='outputs'):
+    """
+    Store directory to use for an analysis writing to output_dir.
+
+    Args:
+        store_dir: DEFAULT_STORE_DIR, an explicit directory, or None (no store)
+        output_dir: The analysis's output directory (default: outputs)
+
+    Returns:
+        <output_dir>/.phrase_results for DEFAULT_STORE_DIR, otherwise store_dir
+    """
+    if store_dir == DEFAULT_STORE_DIR:
+        return os.path.join(output_dir, STORE_DIRNAME)
+    return store_dir
+
+
+def _mix64(z):
+    """SplitMix64 finalizer on a uint64 array (wrapping arithmetic)."""
+    z = (z ^ (z >> np.uint64(30))) * _MIX_1
+    z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def phrase_hashes(values, offsets):
+    """
+    64-bit content hash of every phrase's BUR sequence.
+
+    Args:
+        values: Flat float64 array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+
+    Returns:
+        uint64 array of length n_phrases
+
+    Note:
+        Each value's bit pattern is mixed with its position in the phrase and
+        the mixes are summed per phrase, so the hash depends on order and
+        length and is computed without a Python loop over phrases.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    positions = np.arange(offsets[-1], dtype=np.uint64) - np.repeat(offsets[:-1], lengths).astype(np.uint64)
+
+    mixed = _mix64(values.view(np.uint64) ^ _mix64(positions + _GOLDEN))
+    sums = np.zeros(len(lengths), dtype=np.uint64)
+    nonempty = lengths > 0
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(mixed, offsets[:-1][nonempty])
+    return _mix64(sums ^ _mix64(lengths.astype(np.uint64)))
+
+
+def params_digest(params):
+    """Short hex digest of a stage's parameters (e.g. the utils.config values it uses)."""
+    payload = json.dumps({'format_version': STORE_FORMAT_VERSION, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _stage_path(store_dir, stage, params):
+    return os.path.join(store_dir, f"{stage}-{params_digest(params)}.npz")
+
+
+def load_stage(store_dir, stage, params):
+    """
+    Load stored results for one stage and parameter set.
+
+    Returns:
+        Dictionary with a sorted uint64 'key' array and one array per
+        column, or None if nothing has been stored yet
+    """
+    path = _stage_path(store_dir, stage, params)
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+
+
+def save_stage(store_dir, stage, params, columns):
+    """
+    Write results for one stage, sorted by 'key' (written atomically).
+
+    Args:
+        store_dir: Store directory
+        stage: Stage name, e.g. 'trend'
+        params: Parameters the results depend on
+        columns: Dictionary with a uint64 'key' array and per-phrase columns
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    order = np.argsort(columns['key'], kind='stable')
+    path = _stage_path(store_dir, stage, params)
+    tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez(tmp_path, **{name: np.asarray(column)[order] for name, column in columns.items()})
+    os.replace(tmp_path, path)
+
+
+def _take_phrases(values, offsets, index):
+    """Pack the selected phrases back to back; returns (values, offsets)."""
+    lengths = np.diff(offsets)
+    selected = np.zeros(len(lengths), dtype=bool)
+    selected[index] = True
+    packed_values = np.asarray(values)[np.repeat(selected, lengths)]
+    packed_offsets = np.concatenate([[0], np.cumsum(lengths[index])]).astype(np.int64)
+    return packed_values, packed_offsets
+
+
+@profiled(rows=lambda result: len(next(iter(result[0].values()), ())))
+def cached_phrase_results(stage, compute, values, offsets, params, store_dir=DEFAULT_STORE_DIR):
+    """
+    Per-phrase results for a stage, computing only phrases missing from the store.
+
+    Args:
+        stage: Stage name used for the store file, e.g. 'trend'
+        compute: Function (values, offsets) -> dict of per-phrase arrays
+        values: Flat float64 array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+        params: Dictionary of parameters the stage depends on (part of the key)
+        store_dir: Store directory (default: outputs/.phrase_results)
+
+    Returns:
+        Tuple of (results, n_computed)
+            - results: dict of per-phrase arrays in the order of offsets
+            - n_computed: number of phrases that were not in the store
+
+    Note:
+        Entries are only added here, so phrases from other corpora or
+        earlier versions of the data stay available until prune_store.
+    """
+    store_dir = resolve_store_dir(store_dir)
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    keys = phrase_hashes(values, offsets)
+    table = load_stage(store_dir, stage, params)
+
+    if table is not None:
+        found = np.isin(keys, table['key'])
+    else:
+        found = np.zeros(len(keys), dtype=bool)
+
+    # Compute each missing phrase once, even if it occurs several times
+    _, first_missing = np.unique(keys[~found], return_index=True)
+    missing_index = np.sort(np.flatnonzero(~found)[first_missing])
+    if len(missing_index):
+        with profile_stage(f'{stage} (new phrases)', rows=len(missing_index)):
+            computed = compute(*_take_phrases(values, offsets, missing_index))
+        computed = {'key': keys[missing_index], **{name: np.asarray(column) for name, column in computed.items()}}
+        if table is not None:
+            computed = {name: np.concatenate([table[name], computed[name]]) for name in table}
+        save_stage(store_dir, stage, params, computed)
+        order = np.argsort(computed['key'], kind='stable')
+        table = {name: column[order] for name, column in computed.items()}
+
+    if table is None:
+        return {}, 0
+
+    position = np.searchsorted(table['key'], keys)
+    results = {name: column[position] for name, column in table.items() if name != 'key'}
+    return results, len(missing_index)
+
+
+@profiled(rows=lambda result: result['kept'])
+def prune_store(store_dir, keys):
+    """
+    Drop stored phrases whose hash is not in keys from every stage file.
+
+    Args:
+        store_dir: Store directory
+        keys: phrase_hashes of the phrases to keep (e.g. of every corpus the
+              store serves, concatenated)
+
+    Returns:
+        Dictionary with the number of stage files, entries kept and entries
+        removed; files with nothing to remove are not rewritten
+    """
+    keys = np.unique(np.asarray(keys, dtype=np.uint64))
+    counts = {'files': 0, 'kept': 0, 'removed': 0}
+    if not os.path.isdir(store_dir):
+        return counts
+    for name in sorted(os.listdir(store_dir)):
+        if not name.endswith('.npz') or '.tmp-' in name:
+            continue
+        path = os.path.join(store_dir, name)
+        try:
+            with np.load(path) as data:
+                table = {column: data[column] for column in data.files}
+        except (OSError, ValueError):
+            continue
+        keep = np.isin(table['key'], keys)
+        counts['files'] += 1
+        counts['kept'] += int(keep.sum())
+        counts['removed'] += int((~keep).sum())
+        if keep.all():
+            continue
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez(tmp_path, **{column: array[keep] for column, array in table.items()})
+        os.replace(tmp_path, path)
+    return counts
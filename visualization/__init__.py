@@ -1,11 +1,17 @@
 """
 Visualization modules for creating plots and histograms.
+
+Submodules are imported on first use of one of their names, so importing
+the package itself does not load numpy, pandas, scipy or statsmodels.
 """
 
-from .bur_histograms import (
-    create_performer_bur_histograms
-)
+from utils.lazy import lazy_exports
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    'create_performer_bur_histograms': 'bur_histograms'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'create_performer_bur_histograms'
-]
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
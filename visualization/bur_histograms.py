@@ -1,75 +1,275 @@
 """
 BUR Histogram Visualization
 
-Creates histogram plots showing the distribution of Beat-Upbeat Ratio (BUR) 
+Creates histogram plots showing the distribution of Beat-Upbeat Ratio (BUR)
 values for each performer. Saves individual PNG files for each performer.
 
 Output:
 - One histogram per performer showing BUR value distribution
 - Bins are optimized for typical jazz swing ratios (1.0-2.5 range)
 - Auto-adjusts if data falls outside typical range
+
+Performance:
+- Per-phrase counts on a fixed 0.1 grid are summed per performer (and cached
+  in the per-phrase results store, so only new phrases are re-binned)
+- Figures are drawn with the object-oriented Agg API in a process pool
+- A manifest of content hashes skips PNGs whose data has not changed
 """
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+import hashlib
+import json
 import os
-from utils.data_utils import load_phrasebur_csv, ensure_output_dir, get_artist_from_id
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from utils.data_utils import load_phrasebur_phrases, ensure_output_dir, get_artist_from_id
+from utils.results_store import cached_phrase_results, resolve_store_dir, DEFAULT_STORE_DIR
+from utils.profiling import profiled, profile_stage
+
+# Bump when the plot style changes so every PNG is redrawn
+HISTOGRAM_STYLE_VERSION = 2
+
+# Fixed grid (in tenths of a BUR unit) that per-phrase counts are binned on
+HISTOGRAM_GRID_MIN = 5   # 0.5
+HISTOGRAM_GRID_MAX = 35  # 3.5
+
+# Parameters the cached per-phrase grid counts depend on
+HISTOGRAM_STORE_PARAMS = {
+    'stage_version': 1,
+    'grid_min': HISTOGRAM_GRID_MIN,
+    'grid_max': HISTOGRAM_GRID_MAX
+}
+
+# Maps each PNG filename to the hash of the data it was drawn from
+MANIFEST_FILENAME = '.histogram_hashes.json'
+
+
+def performer_codes(phrases):
+    """
+    Performer of every phrase.
+
+    Args:
+        phrases: Grouped phrase dict (see utils.data_utils.group_phrases)
+
+    Returns:
+        Tuple of (performers, phrase_performer_code) where performers holds
+        the id prefixes (e.g. 'ArtPepper') and codes index into it
+    """
+    solo_performers = np.array([solo_id.split('_')[0] for solo_id in phrases['solo_ids']])
+    performers, solo_performer_code = np.unique(solo_performers, return_inverse=True)
+    return performers, solo_performer_code[phrases['solo_code']]
+
+
+def phrase_histogram_bins(values, offsets):
+    """
+    Per-phrase BUR counts on the fixed 0.1-wide grid covering 0.5-3.5.
+
+    Args:
+        values: Flat array of BUR values, phrases stored back to back
+        offsets: Integer array of length n_phrases + 1 marking phrase boundaries
+
+    Returns:
+        Dictionary containing:
+            - grid_counts: int32 array (n_phrases, 30); column j counts values in
+              [0.5 + j/10, 0.6 + j/10), with 3.5 itself in the last column
+            - bur_min, bur_max: Smallest and largest BUR value per phrase
+
+    Note:
+        Performer histograms are cut from sums of these rows, so the per-phrase
+        bins can be cached and reused across runs.
+    """
+    values = np.asarray(values, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    n_bins = HISTOGRAM_GRID_MAX - HISTOGRAM_GRID_MIN
+
+    # Round away float noise (2.3 * 10 = 22.999...) before taking the grid cell
+    cell = np.floor(np.round(values * 10, 9)).astype(np.int64) - HISTOGRAM_GRID_MIN
+    cell[values == HISTOGRAM_GRID_MAX / 10] = n_bins - 1
+    in_grid = (cell >= 0) & (cell < n_bins)
+    phrase = np.repeat(np.arange(len(lengths)), lengths)
+    flat_cells = phrase[in_grid] * n_bins + cell[in_grid]
+    grid_counts = np.bincount(flat_cells, minlength=len(lengths) * n_bins).reshape(len(lengths), n_bins)
+
+    bur_min = np.full(len(lengths), np.nan)
+    bur_max = np.full(len(lengths), np.nan)
+    nonempty = lengths > 0
+    if nonempty.any():
+        bur_min[nonempty] = np.minimum.reduceat(values, offsets[:-1][nonempty])
+        bur_max[nonempty] = np.maximum.reduceat(values, offsets[:-1][nonempty])
+
+    return {
+        'grid_counts': grid_counts.astype(np.int32),
+        'bur_min': bur_min,
+        'bur_max': bur_max
+    }
+
+
+def histogram_from_grid(grid_counts, bur_min, bur_max):
+    """
+    Cut one histogram out of summed grid counts.
+
+    Args:
+        grid_counts: Grid counts summed over the phrases to plot (length 30)
+        bur_min, bur_max: Smallest and largest BUR value among those phrases
 
+    Returns:
+        Tuple of (bin_edges, counts)
+    """
+    # Histogram bins: 0.1 increments, typically 1.0 to 2.5 for jazz swing
+    # Auto-adjust range if data falls outside typical range
+    bin_min = max(0.5, np.floor(bur_min * 10) / 10)  # Round down to nearest 0.1
+    bin_max = min(3.5, np.ceil(bur_max * 10) / 10)   # Round up to nearest 0.1
+    lo = int(round(bin_min * 10)) - HISTOGRAM_GRID_MIN
+    hi = int(round(bin_max * 10)) - HISTOGRAM_GRID_MIN
+    bin_edges = (np.arange(lo, hi + 1) + HISTOGRAM_GRID_MIN) / 10
+
+    counts = np.array(grid_counts[lo:hi])
+    if hi < len(grid_counts):
+        # Last bin is closed: values equal to bin_max sit in the next grid cell
+        counts[-1] += grid_counts[hi]
+    return bin_edges, counts
 
-def create_performer_bur_histograms(output_dir="outputs/bur_histograms"):
+
+def histogram_bins(bur_values):
+    """
+    Bin edges and counts for one performer's BUR values.
+
+    Args:
+        bur_values: Array of BUR values
+
+    Returns:
+        Tuple of (bin_edges, counts)
+    """
+    bins = phrase_histogram_bins(bur_values, [0, len(bur_values)])
+    return histogram_from_grid(bins['grid_counts'][0], bins['bur_min'][0], bins['bur_max'][0])
+
+
+def _histogram_hash(title, bin_edges, counts):
+    """Content hash of everything that determines a histogram PNG."""
+    payload = json.dumps({
+        'style': HISTOGRAM_STYLE_VERSION,
+        'title': title,
+        'bin_edges': np.asarray(bin_edges).tolist(),
+        'counts': np.asarray(counts).tolist()
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _render_histogram(task):
+    """Draw one histogram with the Agg canvas (no pyplot global state)."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    filename, title, bin_edges, counts = task
+    fig = Figure(figsize=(8, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.hist(bin_edges[:-1], bins=bin_edges, weights=counts, edgecolor='black', alpha=0.7)
+    ax.set_title(title)
+    ax.set_xlabel("BUR Value")
+    ax.set_ylabel("Count")
+    ax.set_xticks(bin_edges)
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(filename)
+    return filename
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+@profiled()
+def create_performer_bur_histograms(output_dir="outputs/bur_histograms", phrases=None, n_workers=None, force=False,
+                                    store_dir=DEFAULT_STORE_DIR):
     """
     Create BUR histograms for each performer and save as PNG files.
-    
+
     Args:
         output_dir: Directory to save histogram PNG files (default: outputs/bur_histograms)
-        
+        phrases: Pre-loaded grouped phrases (default: load_phrasebur_phrases())
+        n_workers: Rendering processes (default: os.cpu_count(); 1 = render inline)
+        force: Redraw every PNG even if its data hash is unchanged
+        store_dir: Per-phrase results store for the grid counts (default:
+                   .phrase_results next to output_dir; None = always recompute)
+
     Returns:
         str: Path to output directory containing histogram files
-        
+
     Notes:
         - Uses 0.1 bin width for typical jazz swing ratios
         - Default range is 1.0-2.5 (covers most swing timing variations)
         - Automatically expands range if data falls outside defaults
         - Creates one PNG file per performer
+        - Skips performers whose PNG exists and whose bins and counts match
+          the hash recorded in output_dir/.histogram_hashes.json
     """
-    # Load the CSV
-    df = load_phrasebur_csv()
-    
+    if phrases is None:
+        phrases = load_phrasebur_phrases()
+
     # Create output directory for histograms
     ensure_output_dir(output_dir)
-    
-    # Get all unique performers
-    performers = df['id'].apply(lambda x: x.split('_')[0]).unique()
-    
-    # For each performer, collect all BUR values and plot histogram
-    for performer in performers:
-        # Select all rows for this performer
-        performer_rows = df[df['id'].str.startswith(performer)]
-        bur_values = performer_rows['swing_ratios'].astype(float)
-        if bur_values.empty:
+    manifest = _load_manifest(output_dir)
+
+    # Per-phrase grid counts (reused from the results store when possible)
+    store_dir = resolve_store_dir(store_dir, os.path.dirname(os.path.normpath(output_dir)))
+    if store_dir is None:
+        bins = phrase_histogram_bins(phrases['values'], phrases['offsets'])
+    else:
+        bins, _ = cached_phrase_results(
+            'histogram_bins', phrase_histogram_bins, phrases['values'], phrases['offsets'],
+            HISTOGRAM_STORE_PARAMS, store_dir
+        )
+
+    # Sum phrases into one grid row per performer
+    performers, phrase_performer = performer_codes(phrases)
+    performer_grid = np.zeros((len(performers), bins['grid_counts'].shape[1]), dtype=np.int64)
+    np.add.at(performer_grid, phrase_performer, bins['grid_counts'])
+    performer_min = np.full(len(performers), np.inf)
+    performer_max = np.full(len(performers), -np.inf)
+    np.minimum.at(performer_min, phrase_performer, bins['bur_min'])
+    np.maximum.at(performer_max, phrase_performer, bins['bur_max'])
+
+    tasks = []
+    hashes = {}
+    for code, performer in enumerate(performers):
+        if not np.isfinite(performer_min[code]):
             continue
-            
-        # Histogram bins: 0.1 increments, typically 1.0 to 2.5 for jazz swing
-        # Auto-adjust range if data falls outside typical range
-        bin_min = max(0.5, np.floor(bur_values.min() * 10) / 10)  # Round down to nearest 0.1
-        bin_max = min(3.5, np.ceil(bur_values.max() * 10) / 10)   # Round up to nearest 0.1
-        bin_edges = np.arange(bin_min, bin_max + 0.1, 0.1).tolist()
-        
-        plt.figure(figsize=(8, 5))
-        plt.hist(bur_values, bins=bin_edges, edgecolor='black', alpha=0.7)
-        plt.title(f"BUR Histogram for {get_artist_from_id(performer + '_')}")
-        plt.xlabel("BUR Value")
-        plt.ylabel("Count")
-        plt.xticks(bin_edges, rotation=45)
-        plt.tight_layout()
-        # Save to file
+        bin_edges, counts = histogram_from_grid(performer_grid[code], performer_min[code], performer_max[code])
+        title = f"BUR Histogram for {get_artist_from_id(performer + '_')}"
         filename = os.path.join(output_dir, f"{performer}_bur_histogram.png")
-        plt.savefig(filename)
-        plt.close()
-    
+
+        key = os.path.basename(filename)
+        hashes[key] = _histogram_hash(title, bin_edges, counts)
+        if not force and manifest.get(key) == hashes[key] and os.path.exists(filename):
+            continue
+        tasks.append((filename, title, bin_edges, counts))
+
+    n_workers = n_workers or os.cpu_count() or 1
+    with profile_stage('render_histograms', rows=len(tasks)):
+        if n_workers == 1 or len(tasks) <= 1:
+            for task in tasks:
+                _render_histogram(task)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                list(pool.map(_render_histogram, tasks))
+
+    manifest.update(hashes)
+    _save_manifest(output_dir, manifest)
+
     return output_dir
 
 if __name__ == "__main__":
     output_dir = create_performer_bur_histograms()
-    print(f"Histograms saved to {output_dir}/ (one PNG per performer)")
\ No newline at end of file
+    print(f"Histograms saved to {output_dir}/ (one PNG per performer)")